@@ -5,15 +5,25 @@ if __name__ == '__main__':
     def callback():
         from resources.lib.di.requiredfeature import RequiredFeature
         import threading
-        RequiredFeature('core').request().check_script_permissions()
+        from resources.lib.storageengine.vacuumthread import VacuumThread
+        core = RequiredFeature('core').request()
+        core.check_script_permissions()
+        vacuum_thread = VacuumThread(core)
         updater = RequiredFeature('update-service').request()
         update_thread = threading.Thread(target=updater.check_for_update)
         update_thread.start()
         router = RequiredFeature('router').request()
         router.render('main_index')
+        vacuum_thread.stop()
 
         # do some cleanup
         from resources.lib.di import featurebroker
+        game_repository = featurebroker.features.get_initialized('game-repository')
+        if game_repository:
+            game_repository.flush()
+        http_client_service = featurebroker.features.get_initialized('http-client-service')
+        if http_client_service:
+            http_client_service.log_statistics()
         controller_list = featurebroker.features.get_tagged_features('controller')
         for definition in controller_list:
             instance = featurebroker.features.get_initialized(definition.name)
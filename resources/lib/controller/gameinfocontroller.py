@@ -4,8 +4,9 @@ from resources.lib.views.gameinfo import GameInfo
 
 
 class GameInfoController(BaseController):
-    def __init__(self, core):
+    def __init__(self, core, game_manager):
         self.core = core
+        self.game_manager = game_manager
         self.window = None
 
     @route(name='details')
@@ -14,21 +15,21 @@ class GameInfoController(BaseController):
         self.window.doModal()
         del self.window
 
-    def select_cover_art(self, game, list_item):
+    def select_cover_art(self, host, game, list_item):
         browser = xbmcgui.Dialog().browse(2, 'Select Cover Art', 'files', '.jpg|.png', False, False,
                                           game.get_poster(0, ''))
         if browser:
             game.selected_poster = browser
             list_item.setThumbnailImage(browser)
-            self.sync_storage()
+            self.sync_storage(host, game)
 
-    def select_fanart(self, game, list_item):
+    def select_fanart(self, host, game, list_item):
         browser = xbmcgui.Dialog().browse(2, 'Select Fanart', 'files', '.jpg|.png', False, False,
                                           game.get_selected_fanart().get_thumb())
         if browser:
             game.set_selected_fanart(browser)
             list_item.setProperty('fanart', browser)
-            self.sync_storage()
+            self.sync_storage(host, game)
 
-    def sync_storage(self):
-        return self.core.get_storage().sync()
+    def sync_storage(self, host, game):
+        self.game_manager.add_game(host, game)
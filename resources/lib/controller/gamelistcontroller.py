@@ -5,10 +5,12 @@ from resources.lib.views.gamelist import GameList
 
 
 class GameListController(BaseController):
-    def __init__(self, game_manager, game_helper, moonlight_helper, logger):
+    def __init__(self, game_manager, game_helper, moonlight_helper, host_context_service, wake_service, logger):
         self.game_manager = game_manager
         self.game_helper = game_helper
         self.moonlight_helper = moonlight_helper
+        self.host_context_service = host_context_service
+        self.wake_service = wake_service
         self.logger = logger
         self.window = None
 
@@ -20,6 +22,11 @@ class GameListController(BaseController):
 
     @route(name='launch')
     def launch_game(self, game):
+        host = self.host_context_service.get_current_context()
+        if not self.wake_service.is_ready(host):
+            self.logger.info("Host %s doesn't answer, waking it before starting %s" % (host.name, game.name))
+            if not self.render('host_wake', {'host': host}):
+                return
         self.logger.info("Starting game by name: %s" % game.name)
         self.moonlight_helper.launch_game(game.name)
 
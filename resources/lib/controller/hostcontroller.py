@@ -1,4 +1,6 @@
 import importlib
+import socket
+import threading
 
 import xbmc
 import xbmcgui
@@ -11,53 +13,64 @@ from xbmcgui import Dialog, INPUT_IPADDRESS
 
 
 class HostController(BaseController):
-    def __init__(self, logger, core, connection_manager, host_manager, host_context_service):
+    def __init__(self, logger, core, connection_manager, host_manager, host_context_service, discovery_registry,
+                 subnet_scanner, wake_service):
         self.logger = logger
         self.core = core
         self.connection_manager = connection_manager
         self.host_manager = host_manager
         self.host_context_service = host_context_service
+        self.discovery_registry = discovery_registry
+        self.subnet_scanner = subnet_scanner
+        self.wake_service = wake_service
         self.discovery_agent = None
         self._load_agent()
 
     @route(name='wake')
     def wake_host(self, host):
         """
-        This partly taken from Dipl.-Ing. (FH) Georg Kainzbauer http://www.gtkdb.de/index_31_2254.html
-        Magic packets aren't that magic after all, but it's nice to get some fast and working code.
+        Wakes host and shows the progress until it answers
+        :rtype: bool
+        :return: True if the host is ready
         """
-        progress_dialog = xbmcgui.DialogProgress()
-        progress_dialog.create('Luna', 'Preparing to wake host: %s' % host.name)
-        xbmc.sleep(2000)
-        import struct
-        import socket
         self.logger.info(
             "Wake Host called for host: %s (IP: %s / MAC: %s)" % (host.name, host.local_ip, host.mac_address))
-        mac = host.mac_address.replace(':', '')
-        self.logger.info("Cleared MAC: %s" % mac)
-
-        magic_packet = ''.join(['FF' * 6, mac * 16])
-        data = ''
-        self.logger.info('Preparing data stream')
-        for i in range(0, len(magic_packet), 2):
-            data = ''.join([data, struct.pack('B', int(magic_packet[i: i + 2], 16))])
-
-        self.logger.info('Preparing socket')
-        socket_conn = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        socket_conn.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        socket_conn.sendto(data, ('255.255.255.255', 9))
-        self.logger.info('Send data through socket; done')
-        progress_dialog.update(0, line1='Done')
-        xbmc.sleep(2000)
-        progress_dialog.close()
+        progress_dialog = xbmcgui.DialogProgress()
+        progress_dialog.create(self.core.string('name'), 'Waking host: %s' % host.name)
+
+        def progress(elapsed, deadline):
+            progress_dialog.update(int(min(elapsed / deadline, 1) * 100), 'Waking host: %s' % host.name,
+                                   'Waiting for the host to answer (%ss)' % int(elapsed))
+            return not progress_dialog.iscanceled()
+
+        try:
+            ready_after = self.wake_service.wake(host, progress)
+        except (ValueError, socket.error) as e:
+            self.logger.error("Waking host %s failed: %s" % (host.name, e))
+            ready_after = None
+        finally:
+            progress_dialog.close()
+
+        if ready_after is None:
+            xbmcgui.Dialog().notification(self.core.string('name'), "%s didn't wake up" % host.name)
+            return False
+
+        host.state = host.STATE_ONLINE
+        return True
 
     @route(name='add')
     def initiate(self):
         xbmc.executebuiltin("ActivateWindow(busydialog)")
+        hosts = self.discovery_registry.get_hosts()
+        if len(hosts) > 0:
+            self.logger.info("Hosts known to the discovery registry: %s" % len(hosts))
+            xbmc.executebuiltin("Dialog.Close(busydialog)")
+            return self.select_host(hosts)
+
         if self.discovery_agent is not None:
             try:
-                self.discovery_agent.start_discovery()
-                hosts = self.discovery_agent.available_hosts
+                self.discovery_agent.start_discovery(first_only=True)
+                hosts = self.get_computer_details(self.discovery_agent.available_hosts.values())
                 self.logger.info("Hosts discovered via zeroconf: %s" % len(hosts))
                 if len(hosts) > 0:
                     self.logger.info("Passing hosts to select screen.")
@@ -67,7 +80,18 @@ class HostController(BaseController):
                 xbmc.executebuiltin("Dialog.Close(busydialog)")
                 raise e
 
-        self.logger.info("DiscoveryAgent failed to load or no hosts could be found, falling back to IP input.")
+        self.logger.info("DiscoveryAgent failed to load or no hosts could be found, scanning the network.")
+        try:
+            hosts = self.subnet_scanner.scan(self.core.get_setting('scan_network', str) or None)
+        except (ValueError, socket.error) as e:
+            # no route or interface to find the local network on
+            self.logger.error("Scanning the network failed: %s" % e)
+            hosts = {}
+        if len(hosts) > 0:
+            xbmc.executebuiltin("Dialog.Close(busydialog)")
+            return self.select_host(hosts)
+
+        self.logger.info("No hosts could be found, falling back to IP input.")
         xbmc.executebuiltin("Dialog.Close(busydialog)")
         return self.enter_ip()
 
@@ -110,13 +134,32 @@ class HostController(BaseController):
             if confirmed:
                 self.pair_selected_host(host)
 
-    def select_host(self, hosts):
+    def get_computer_details(self, computers):
+        """
+        Asks all discovered computers for their serverinfo at the same time
+        :type computers: list[MdnsComputer]
+        :rtype: dict
+        :return: {host uuid: HostDetails} of the computers which answered
+        """
         host_details = {}
-        for key, host in hosts.iteritems():
-            self.logger.info("Host Address obtained via Zeroconf: %s" % host.address)
-            _host = StaticRequestService.get_static_computer_details(host.address)
-            host_details[_host.uuid] = _host
 
+        def fetch(computer):
+            self.logger.info("Host Address obtained via Zeroconf: %s" % computer.address)
+            try:
+                _host = StaticRequestService.get_static_computer_details(computer.address)
+                host_details[_host.uuid] = _host
+            except (IOError, ValueError) as e:
+                self.logger.info("Getting serverinfo of %s failed: %s" % (computer.address, e))
+
+        threads = [threading.Thread(target=fetch, args=(computer,)) for computer in computers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return host_details
+
+    def select_host(self, host_details):
         window = HostList(host_details)
         window.doModal()
         selected_host = window.selected_host
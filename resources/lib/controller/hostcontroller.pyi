@@ -2,7 +2,7 @@
 #
 # NOTE: This dynamically typed stub was automatically generated by stubgen.
 
-from typing import Dict, AnyStr
+from typing import Dict, AnyStr, List
 
 from resources.lib.core.corefunctions import Core
 from resources.lib.core.logger import Logger
@@ -11,7 +11,10 @@ from resources.lib.model.hostdetails import HostDetails
 from resources.lib.model.mdnscomputer import MdnsComputer
 from resources.lib.nvhttp.connectionmanager.connectionmanager import ConnectionManager
 from resources.lib.nvhttp.mdns.discoveryagent import DiscoveryAgent
+from resources.lib.nvhttp.mdns.discoveryregistry import DiscoveryRegistry
+from resources.lib.nvhttp.scan.subnetscanner import SubnetScanner
 from resources.lib.service.hostcontextservice import HostContextService
+from resources.lib.service.wakeservice import WakeService
 
 
 class HostController:
@@ -21,9 +24,14 @@ class HostController:
     host_manager = ... # type: HostManager
     discovery_agent = ... # type: DiscoveryAgent
     host_context_service = ... # type: HostContextService
-    def __init__(self, logger:Logger, core:Core, connection_manager:ConnectionManager, host_manager:HostManager): ...
+    discovery_registry = ... # type: DiscoveryRegistry
+    subnet_scanner = ... # type: SubnetScanner
+    wake_service = ... # type: WakeService
+    def __init__(self, logger:Logger, core:Core, connection_manager:ConnectionManager, host_manager:HostManager, host_context_service:HostContextService, discovery_registry:DiscoveryRegistry, subnet_scanner:SubnetScanner, wake_service:WakeService): ...
+    def wake_host(self, host:HostDetails) -> bool: ...
     def initiate(self): ...
     def pair_selected_host(self, host:HostDetails): ...
-    def select_host(self, hosts: Dict[MdnsComputer]): ...
+    def get_computer_details(self, computers: List[MdnsComputer]) -> Dict[str, HostDetails]: ...
+    def select_host(self, host_details: Dict[str, HostDetails]): ...
     def enter_ip(self) -> AnyStr: ...
     def _load_agent(self) -> None: ...
@@ -1,24 +1,24 @@
 import threading
 
-from requests import ConnectionError
-
 from resources.lib.controller.basecontroller import BaseController, route
-from resources.lib.nvhttp.request.staticrequestservice import StaticRequestService
 
 from resources.lib.views.main import Main
 
 
 class MainController(BaseController):
-    def __init__(self, host_context_service, host_manager, logger):
+    def __init__(self, host_context_service, host_manager, host_status_service, logger):
         super(MainController, self).__init__()
         self.host_context_service = host_context_service
         self.host_manager = host_manager
+        self.host_status_service = host_status_service
         self.logger = logger
         self.window = None
 
     @route(name="index")
     def index_action(self):
-        self.window = Main(controller=self, hosts=self.get_hosts())
+        host_states = dict((uuid, state) for uuid, (state, checked_at) in
+                           self.host_status_service.get_cached_states().iteritems())
+        self.window = Main(controller=self, hosts=self.get_hosts(), host_states=host_states)
         self.update_host_status()
         self.window.doModal()
         del self.window
@@ -52,17 +52,16 @@ class MainController(BaseController):
         background_dialog = xbmcgui.DialogProgressBG()
         background_dialog.create('Refreshing Host Status')
         hosts = self.host_manager.get_hosts()
-        for key, host in hosts.iteritems():
-            try:
-                StaticRequestService.get_static_server_info(host.local_ip)
-                host.state = host.STATE_ONLINE
-            except ConnectionError:
-                host.state = host.STATE_OFFLINE
-        self.window.update_host_status(hosts.raw_dict())
+        self.host_status_service.probe_all(hosts.values(), self._on_host_status)
         self.logger.info("Getting Host Status ... Done")
         background_dialog.close()
         del background_dialog
         return
 
+    def _on_host_status(self, host, state):
+        window = getattr(self, 'window', None)
+        if window is not None:
+            window.update_host_state(host.uuid, state)
+
     def get_hosts(self):
         return self.host_manager.get_hosts()
@@ -11,7 +11,8 @@ import xbmc
 import xbmcaddon
 import xbmcgui
 
-from resources.lib.storageengine.storage import TimedStorage
+from resources.lib.storageengine.sqlitestorage import SqliteStorage
+from resources.lib.storageengine.storagemigration import get_storage_files, open_storage
 
 STRINGS = {
     'name':                30000,
@@ -71,7 +72,8 @@ class Core:
             os.chmod(self.internal_path + '/resources/lib/launchscripts/osmc/moonlight-heartbeat.sh', st.st_mode | 0111)
             self.logger.info('Changed file permissions for moonlight-heartbeat')
 
-    def get_storage(self, name='game_storage', file_format='pickle', TTL=None):
+    def get_storage(self, name='game_storage', file_format='pickle', TTL=None, journal=False, backend='pickle',
+                    lazy=False):
         """
         This method was originally part of xbmcswift2 by Jonathan Beluch.
         Used in Luna in accordance with GPLv3; with the reason being that his storage engine didn't behave entirely
@@ -102,11 +104,25 @@ class Core:
                     storage is loaded form disk, it is possible to call
                     get_storage() with a different TTL than when the storage was
                     created. The currently specified TTL is always honored.
+        :param journal: If True, sync appends changed entries to a journal
+                        file instead of rewriting the whole storage. Only
+                        honored for the pickle format and only when the
+                        storage is loaded for the first time.
+        :param backend: 'pickle' for a :class:`TimedStorage` or 'sqlite' for a
+                        :class:`SqliteStorage`. An existing storage of the
+                        same name written with the other backend is migrated
+                        on first load.
+        :param lazy: If True, a pickle storage only loads its key index and
+                     unpickles values on first access, see
+                     :class:`LazyTimedStorage`.
         """
 
         if not hasattr(self, '_unsynced_storages'):
             self._unsynced_storages = {}
-        filename = os.path.join(self.storage_path, name)
+        pickle_filename = os.path.join(self.storage_path, name)
+        filename = pickle_filename
+        if backend == 'sqlite':
+            filename += SqliteStorage.FILE_SUFFIX
         try:
             storage = self._unsynced_storages[filename]
             self.logger.info('Loaded storage "%s" from memory' % name)
@@ -115,7 +131,7 @@ class Core:
                 TTL = timedelta(minutes=TTL)
 
             try:
-                storage = TimedStorage(filename, file_format, TTL)
+                storage = open_storage(pickle_filename, self.logger, file_format, TTL, journal, backend, lazy)
             except ValueError:
                 # Thrown when the storage file is corrupted and can't be read.
                 # Prompt user to delete storage.
@@ -124,8 +140,11 @@ class Core:
                                               ' is recommended to clear it.',
                                               choices)
                 if ret == 0:
-                    os.remove(filename)
-                    storage = TimedStorage(filename, file_format, TTL)
+                    for path in get_storage_files(pickle_filename, 'pickle') + \
+                            get_storage_files(pickle_filename, 'sqlite'):
+                        if os.path.exists(path):
+                            os.remove(path)
+                    storage = open_storage(pickle_filename, self.logger, file_format, TTL, journal, backend, lazy)
                 else:
                     raise Exception('Corrupted storage file at %s' % filename)
 
@@ -133,6 +152,14 @@ class Core:
             self.logger.info('Loaded storage "%s" from disk' % name)
         return storage
 
+    def vacuum_storages(self):
+        """Removes expired items from all loaded storages and syncs the ones which changed"""
+        for filename, storage in getattr(self, '_unsynced_storages', {}).items():
+            removed = storage.vacuum()
+            if removed > 0:
+                self.logger.info('Removed %s expired items from storage "%s"' % (removed, os.path.basename(filename)))
+                storage.sync()
+
     def get_active_skin(self):
         userdata_folder = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(self.storage_path))))
         guisettings_file = os.path.join(userdata_folder, 'guisettings.xml')
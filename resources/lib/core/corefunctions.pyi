@@ -1,10 +1,11 @@
 # Stubs for corefunctions (Python 2)
 #
 # NOTE: This dynamically typed stub was automatically generated by stubgen.
-from typing import AnyStr
+from typing import AnyStr, Union
 from xbmcaddon import Addon
 
 from resources.lib.core.logger import Logger
+from resources.lib.storageengine.sqlitestorage import SqliteStorage
 from resources.lib.storageengine.storage import TimedStorage
 
 internal_path = ... # type: str
@@ -23,7 +24,8 @@ class Core:
         self._current_version = ... # type: str
     def string(self, string_id) -> str: ...
     def check_script_permissions(self) -> None: ...
-    def get_storage(self, name='game_storage', file_format='pickle', TTL=None) -> TimedStorage: ...
+    def get_storage(self, name='game_storage', file_format='pickle', TTL=None, journal=False, backend='pickle', lazy=False) -> Union[TimedStorage, SqliteStorage]: ...
+    def vacuum_storages(self) -> None: ...
     def get_active_skin(self) -> str: ...
     def _create_path(self) -> None: ...
     def get_setting(self, setting_id: str, return_type:type=None) -> str: ...
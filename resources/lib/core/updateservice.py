@@ -1,9 +1,10 @@
 import json
 import os
 import re
-import urllib2
 import zipfile
 
+import requests
+
 import xbmc
 import xbmcaddon
 import xbmcgui
@@ -16,8 +17,9 @@ class UpdateService:
     api_url = 'https://api.github.com/repos/wackerl91/luna/releases/latest'
     pre_api_url = 'https://api.github.com/repos/wackerl91/luna/releases'
 
-    def __init__(self, core, logger):
+    def __init__(self, core, http_client_service, logger):
         self.core = core
+        self.http_client_service = http_client_service
         self.logger = logger
         self.current_version = core.current_version
         self.update_version = None
@@ -33,12 +35,14 @@ class UpdateService:
         if not update_storage.get('checked') or ignore_checked:
             pre_updates_enabled = self.core.get_setting('enable_pre_updates', bool)
             if pre_updates_enabled:
-                response = json.load(urllib2.urlopen(self.pre_api_url))
+                response = self.http_client_service.get(self.pre_api_url).json()
             else:
                 try:
-                    response = json.load(urllib2.urlopen(self.api_url))
-                except urllib2.HTTPError, e:
-                    if e.code == 404:
+                    response = self.http_client_service.get(self.api_url)
+                    response.raise_for_status()
+                    response = response.json()
+                except requests.HTTPError, e:
+                    if e.response.status_code == 404:
                         update = None
                         response = ''
                     else:
@@ -79,8 +83,11 @@ class UpdateService:
 
     def do_update(self, update):
         file_path = update.file_path
+        response = self.http_client_service.get(update.asset_url, stream=True, timeout=(3, 60))
+        response.raise_for_status()
         with open(file_path, 'wb') as asset:
-            asset.write(urllib2.urlopen(update.asset_url).read())
+            for chunk in response.iter_content(64 * 1024):
+                asset.write(chunk)
             asset.close()
         zip_file = zipfile.ZipFile(file_path)
         zip_file.extractall(self.core.internal_path, self._get_members(zip_file))
@@ -5,6 +5,7 @@ from xbmcaddon import Addon
 from resources.lib.core.corefunctions import Core
 from resources.lib.core.logger import Logger
 from resources.lib.model.update import Update
+from resources.lib.service.httpclientservice import HttpClientService
 
 
 class UpdateService:
@@ -13,13 +14,14 @@ class UpdateService:
     pre_api_url = ... # type: str
     addon = ... # type: Addon
     core = ... # type: Core
+    http_client_service = ... # type: HttpClientService
     logger = ... # type: Logger
     current_version = ... # type: str
     update_version = ... # type: str
     asset_url = ... # type: str
     asset_name = ... # type: str
     changelog = ... # type: str
-    def __init__(self, addon: Addon, core: Core, logger: Logger): ...
+    def __init__(self, core: Core, http_client_service: HttpClientService, logger: Logger): ...
     def check_for_update(self, ignore_checked:bool) -> Union(Update, None): ...
     def initiate_update(self, update: Update) -> None: ...
     def do_update(self, update: Update) -> None: ...
@@ -20,10 +20,11 @@ def async(func):
 
 
 class EosHelper(object):
-    def __init__(self, core, host_manager, game_manager):
+    def __init__(self, core, host_manager, game_manager, http_client_service):
         self.core = core
         self.host_manager = host_manager
         self.game_manager = game_manager
+        self.http_client_service = http_client_service
 
         from resources.lib.core.logger.logger import Logger
         self.logger = Logger('debug')
@@ -52,7 +53,7 @@ class EosHelper(object):
                 server_version = host.server_version
             host_details.append({
                 'gfe_version': server_version,
-                'number_of_games': len(self.game_manager.get_games(host)),
+                'number_of_games': self.game_manager.count_games(host),
                 'host_uuid': host.uuid
             })
 
@@ -169,11 +170,11 @@ class EosHelper(object):
         hardware_id = self._generate_hardware_id()
         url = os.path.join(self.base_url, 'request', hardware_id)
         try:
-            response = requests.get(url, timeout=(3, 10))
+            response = self.http_client_service.get(url, timeout=(3, 10))
         except requests.exceptions.ReadTimeout:
             # Try again, EOS might be sleeping
             try:
-                response = requests.get(url, timeout=(3, 20))
+                response = self.http_client_service.get(url, timeout=(3, 20))
             except requests.exceptions.ReadTimeout as e:
                 self.logger.warning("script.luna.eos", "Connection to EOS timed out: %s" % e.message)
 
@@ -221,11 +222,11 @@ class EosHelper(object):
         response = None
 
         if request_type == HTTP_GET:
-            response = requests.get(url, timeout=timeout)
+            response = self.http_client_service.get(url, timeout=timeout)
         elif request_type == HTTP_PUT:
-            response = requests.put(url, data, timeout=timeout)
+            response = self.http_client_service.put(url, data, timeout=timeout)
         elif request_type == HTTP_POST:
-            response = requests.post(url, data=data, json=data, timeout=timeout)
+            response = self.http_client_service.post(url, data=data, json=data, timeout=timeout)
 
         return response
 
@@ -5,6 +5,9 @@ class GameManager(object):
     def get_games(self, host):
         return self.repository.get_games(host)
 
+    def count_games(self, host):
+        return self.repository.count_games(host)
+
     def add_game(self, host, game, flush=True):
         self.repository.add_game(host, game, flush)
 
@@ -21,8 +24,22 @@ class GameManager(object):
         return self.repository.get_game_by_id(host, id)
 
     def add_games(self, host, games):
-        # TODO!!!!
-        pass
+        self.repository.add_games(host, games)
+
+    def remove_games_by_id(self, host, ids):
+        self.repository.remove_games_by_id(host, ids)
+
+    def get_synced_gamelist_id(self, host):
+        return self.repository.get_synced_gamelist_id(host)
+
+    def set_synced_gamelist_id(self, host, gamelist_id):
+        self.repository.set_synced_gamelist_id(host, gamelist_id)
+
+    def batch(self):
+        return self.repository.batch()
+
+    def flush(self):
+        self.repository.flush()
 
     def clear(self):
         self.repository.clear()
@@ -2,7 +2,7 @@
 #
 # NOTE: This dynamically typed stub was automatically generated by stubgen.
 
-from typing import Any, Dict, AnyStr, List
+from typing import Any, Dict, AnyStr, List, ContextManager, Union
 
 from resources.lib.model.game import Game
 from resources.lib.model.hostdetails import HostDetails
@@ -13,9 +13,15 @@ class GameManager:
     repository = ... # type: GameRepository
     def __init__(self, repository): ...
     def get_games(self, host:HostDetails) -> Dict(Game): ...
+    def count_games(self, host:HostDetails) -> int: ...
     def add_game(self, host:HostDetails, game:Game, flush=True): ...
     def remove_game(self, host:HostDetails, game:Game, flush=True): ...
     def remove_games(self, host:HostDetails, flush=True): ...
     def remove_game_by_id(self, host:HostDetails, id:AnyStr, flush=True): ...
     def get_game_by_id(self, host:HostDetails, id:AnyStr) -> Game: ...
     def add_games(self, host:HostDetails, games:List(Game)): ...
+    def remove_games_by_id(self, host:HostDetails, ids:List(AnyStr)): ...
+    def get_synced_gamelist_id(self, host:HostDetails) -> Union[str, None]: ...
+    def set_synced_gamelist_id(self, host:HostDetails, gamelist_id:Union[str, None]) -> None: ...
+    def batch(self) -> ContextManager[GameRepository]: ...
+    def flush(self) -> None: ...
@@ -1,16 +1,29 @@
-class Fanart:
+from resources.lib.model.versionedmodel import VersionedModel
+from resources.lib.util.stringpool import join_path, split_path
+
+
+class Fanart(VersionedModel):
+    """
+    Paths are kept split into a shared directory prefix and the file name, as all art of a library lives in a handful
+    of directories. Fanarts pickled as classic classes still restore through the original and thumb properties.
+    """
+    __slots__ = ('_original_prefix', '_original_name', '_thumb_prefix', '_thumb_name')
+
     def __init__(self, original=None, thumb=None):
-        self.original = original
-        self.thumb = thumb
+        self.set_original(original)
+        self.set_thumb(thumb)
 
     def get_original(self):
-        return self.original
+        return join_path(self._original_prefix, self._original_name)
 
     def set_original(self, original):
-        self.original = original
+        self._original_prefix, self._original_name = split_path(original)
 
     def get_thumb(self):
-        return self.thumb
+        return join_path(self._thumb_prefix, self._thumb_name)
 
     def set_thumb(self, thumb):
-        self.thumb = thumb
+        self._thumb_prefix, self._thumb_name = split_path(thumb)
+
+    original = property(get_original, set_original)
+    thumb = property(get_thumb, set_thumb)
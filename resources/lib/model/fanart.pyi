@@ -1,4 +1,7 @@
-class Fanart:
+from resources.lib.model.versionedmodel import VersionedModel
+
+
+class Fanart(VersionedModel):
     original = ... # type: str
     thumb = ... # type: str
     def __init__(self, original:str=None, thumb:str=None): ...
@@ -1,14 +1,27 @@
 import os
 
-import subprocess
-
 from resources.lib.model.fanart import Fanart
+from resources.lib.model.versionedmodel import VersionedModel
+from resources.lib.util.stringpool import intern_string
+
 
+def _add_selected_art(state):
+    state.setdefault('selected_fanart', Fanart('', ''))
+    state.setdefault('selected_poster', '')
+    return state
 
-class Game:
-    version = 20161201
 
-    def __init__(self, name, host_uuid, id=None, year=None, genre=None, plot=None, posters=None, fanarts=None):
+class Game(VersionedModel):
+    version = 20261018
+    unversioned = 20161201
+    migrations = {
+        20261018: _add_selected_art
+    }
+    __slots__ = ('name', 'host_uuid', 'id', 'year', 'genre', 'plot', 'posters', 'fanarts', 'selected_fanart',
+                 'selected_poster')
+
+    def __init__(self, name=None, host_uuid=None, id=None, year=None, genre=None, plot=None, posters=None,
+                 fanarts=None):
         if genre is None:
             genre = []
         if posters is None:
@@ -20,7 +33,7 @@ class Game:
         self.host_uuid = host_uuid
         self.id = id
         self.year = year
-        self.genre = genre
+        self.genre = self._intern_genre(genre)
         self.plot = plot
         self.posters = posters
         self.fanarts = fanarts
@@ -62,9 +75,9 @@ class Game:
             self.year = other.year
 
         if self.genre is None:
-            self.genre = sorted(other.genre, key=str.lower)
+            self.genre = self._intern_genre(sorted(other.genre, key=str.lower))
         elif other.genre is not None:
-            self.genre = sorted(list(set(self.genre) | set(other.genre)), key=str.lower)
+            self.genre = self._intern_genre(sorted(list(set(self.genre) | set(other.genre)), key=str.lower))
 
         if self.plot is None:
             self.plot = other.plot
@@ -86,6 +99,11 @@ class Game:
         if self.selected_fanart is None or self.selected_fanart == '':
             self.selected_fanart = other.selected_fanart
 
+    def __setstate__(self, state):
+        super(Game, self).__setstate__(state)
+        if hasattr(self, 'genre'):
+            self.genre = self._intern_genre(self.genre)
+
     def get_fanart(self, alt):
         if self.fanarts is None:
             return Fanart(alt, alt)
@@ -147,11 +165,23 @@ class Game:
             self.selected_poster = self.get_poster(0, '')
             return self.selected_poster
 
+    def replace_poster(self, old_path, new_path):
+        """Points the game at new_path wherever it used old_path"""
+        self.posters = [new_path if poster == old_path else poster for poster in self.posters or []]
+        if new_path not in self.posters:
+            self.posters.append(new_path)
+        if self.selected_poster == old_path:
+            self.selected_poster = new_path
+
+    @staticmethod
+    def _intern_genre(genre):
+        if genre is None:
+            return None
+        return [intern_string(name) for name in genre]
+
     def _replace_thumb(self, thumbfile, original):
-        file_path = thumbfile
-        with open(file_path, 'wb') as img:
-            curl = subprocess.Popen(['curl', '-XGET', original], stdout=subprocess.PIPE)
-            img.write(curl.stdout.read())
-            img.close()
+        from resources.lib.di.requiredfeature import RequiredFeature
+        # the thumb stays in place if the download fails
+        RequiredFeature('download-service').request().download(original, thumbfile, force=True)
 
-        return file_path
+        return thumbfile
@@ -2,10 +2,12 @@ from typing import Dict
 from typing import List
 
 from resources.lib.model.fanart import Fanart
+from resources.lib.model.versionedmodel import VersionedModel
 
 
-class Game:
+class Game(VersionedModel):
     version = ... # type: int
+    unversioned = ... # type: int
     name = ... # type: str
     host_uuid = ... # type: str
     id = ... # type: str
@@ -16,14 +18,18 @@ class Game:
     fanarts = ... # type: Dict[Fanart]
     selected_fanart = ... # type: Fanart
     selected_poster = ... # type: str
-    def __init__(self, name:str, host_uuid:str, id:str=None, year:str=None, genre:List[str]=None, plot:str=None, posters:List[str]=None, fanarts:Dict[str]=None): ...
+    def __init__(self, name:str=None, host_uuid:str=None, id:str=None, year:str=None, genre:List[str]=None, plot:str=None, posters:List[str]=None, fanarts:Dict[str]=None): ...
     @classmethod
     def from_api_response(cls, api_response): ...
     def merge(self, other) -> None: ...
+    def __setstate__(self, state:Dict) -> None: ...
     def get_fanart(self, alt) -> Fanart: ...
     def get_selected_fanart(self) -> Fanart: ...
     def set_selected_fanart(self, uri:str): ...
     def get_genre_as_string(self) -> str: ...
     def get_poster(self, index:int, alt:str): ...
     def get_selected_poster(self) -> str: ...
+    def replace_poster(self, old_path:str, new_path:str) -> None: ...
+    @staticmethod
+    def _intern_genre(genre:List[str]) -> List[str]: ...
     def _replace_thumb(self, thumbfile:str, original:str) -> str:
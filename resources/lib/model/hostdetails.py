@@ -1,4 +1,18 @@
-class HostDetails(object):
+from resources.lib.model.versionedmodel import VersionedModel
+
+
+def _add_missing_fields(state):
+    for name, value in HostDetails().get_fields().iteritems():
+        state.setdefault(name, value)
+    return state
+
+
+class HostDetails(VersionedModel):
+    version = 1
+    migrations = {
+        1: _add_missing_fields
+    }
+
     STATE_ONLINE = 0
     STATE_OFFLINE = 1
     STATE_UNKNOWN = 2
@@ -8,6 +22,9 @@ class HostDetails(object):
     REACH_OFFLINE = 2
     REACH_UNKNOWN = 3
 
+    __slots__ = ('name', 'uuid', 'mac_address', 'local_ip', 'remote_ip', 'pair_state', 'gpu_type', 'gamelist_id',
+                 'key_dir', 'server_version', 'state', 'reachability')
+
     def __init__(self):
         self.name = None
         self.uuid = None
@@ -1,4 +1,8 @@
-class HostDetails:
+from resources.lib.model.versionedmodel import VersionedModel
+
+
+class HostDetails(VersionedModel):
+    version = ... # type: int
     STATE_ONLINE = ... # type: int
     STATE_OFFLINE = ... # type: int
     STATE_UNKNOWN = ... # type: int
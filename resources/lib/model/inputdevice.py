@@ -1,7 +1,20 @@
 import os
 
+from resources.lib.model.versionedmodel import VersionedModel
+
+
+def _add_missing_fields(state):
+    for name, value in InputDevice().get_fields().iteritems():
+        state.setdefault(name, value)
+    return state
+
+
+class InputDevice(VersionedModel):
+    version = 1
+    migrations = {
+        1: _add_missing_fields
+    }
 
-class InputDevice:
     def __init__(self):
         self.name = None
         self.handlers = []
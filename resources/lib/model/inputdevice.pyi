@@ -1,7 +1,10 @@
 from typing import List
 
+from resources.lib.model.versionedmodel import VersionedModel
 
-class InputDevice:
+
+class InputDevice(VersionedModel):
+    version = ... # type: int
     name = ... # type: str
     handlers = ... # type: List[str]
     mapping = ... # type: str
@@ -1,4 +1,6 @@
 class NvApp(object):
+    __slots__ = ('install_path', 'title', 'distributor', 'id', 'max_controllers', 'short_name')
+
     def __init__(self):
         self.install_path = None
         self.title = None
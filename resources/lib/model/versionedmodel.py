@@ -0,0 +1,107 @@
+import threading
+import time
+from itertools import repeat
+
+_report_lock = threading.Lock()
+_report = {}
+_UNSET = object()
+
+
+class VersionedModel(object):
+    """
+    Mixin for models which are pickled into storages.
+
+    Every instance is pickled together with the schema version of its class. When a record of an older version is
+    unpickled, all migrations registered for newer versions are applied to its fields in ascending order, so
+    changing a model upgrades stored records field by field instead of invalidating them.
+
+    A migration is a function taking the fields of the previous version and returning the upgraded ones:
+
+        version = 2
+        migrations = {1: _add_state, 2: _rename_ip}
+
+    Records pickled before this mixin was added are treated as ``unversioned``.
+
+    Models declaring all their fields in ``__slots__`` are pickled as (version, field names, values). The field
+    names are the class' ``__slots__`` tuple, which pickle writes only once per snapshot, and records of the current
+    version are restored without building a dict.
+    """
+    __slots__ = ()
+    version = 0
+    unversioned = 0
+    migrations = {}
+
+    def __getstate__(self):
+        if not hasattr(self, '__dict__'):
+            names = type(self).__slots__
+            values = tuple(getattr(self, name, _UNSET) for name in names)
+            if _UNSET not in values:
+                return self.version, names, values
+        state = self.get_fields()
+        state['_schema_version'] = self.version
+        return state
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple) and len(state) == 3:
+            version, names, values = state
+            if version == self.version and names == type(self).__slots__:
+                map(setattr, repeat(self, len(names)), names, values)
+                return
+            state = dict(zip(names, values), _schema_version=version)
+        elif isinstance(state, tuple):
+            # (dict, slots) as pickled by default for slotted classes
+            state = dict(state[0] or {}, **(state[1] or {}))
+        for name, value in migrate(self.__class__, state).iteritems():
+            try:
+                setattr(self, name, value)
+            except AttributeError:
+                # the field was removed from a slotted model
+                pass
+
+    def get_fields(self):
+        """
+        Returns all fields which are set on this instance
+        :rtype: dict
+        """
+        fields = dict(getattr(self, '__dict__', {}))
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                    fields[name] = getattr(self, name)
+        return fields
+
+
+def migrate(model, state):
+    """
+    Upgrades the fields of a pickled record to the current version of model
+    :type model: type
+    :type state: dict
+    :rtype: dict
+    """
+    version = state.pop('_schema_version', model.unversioned)
+    if version >= model.version:
+        return state
+    pending = sorted(target for target in model.migrations if version < target <= model.version)
+    if not pending:
+        return state
+
+    start = time.time()
+    for target in pending:
+        state = model.migrations[target](state)
+    elapsed = time.time() - start
+
+    with _report_lock:
+        count, seconds = _report.get(model.__name__, (0, 0.0))
+        _report[model.__name__] = (count + 1, seconds + elapsed)
+
+    return state
+
+
+def pop_migration_report(model):
+    """
+    Returns how many records of model were migrated and how many seconds it took since the last call
+    :type model: type
+    :rtype: (int, float)
+    """
+    with _report_lock:
+        return _report.pop(model.__name__, (0, 0.0))
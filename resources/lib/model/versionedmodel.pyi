@@ -0,0 +1,13 @@
+from typing import Any, Callable, Dict, Tuple
+
+
+class VersionedModel:
+    version = ... # type: int
+    unversioned = ... # type: int
+    migrations = ... # type: Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]]
+    def __getstate__(self) -> Dict[str, Any]: ...
+    def __setstate__(self, state:Dict[str, Any]) -> None: ...
+    def get_fields(self) -> Dict[str, Any]: ...
+
+def migrate(model:type, state:Dict[str, Any]) -> Dict[str, Any]: ...
+def pop_migration_report(model:type) -> Tuple[int, float]: ...
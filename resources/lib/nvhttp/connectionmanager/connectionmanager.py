@@ -19,6 +19,7 @@ class ConnectionManager(object):
                 pair_state = AbstractPairingManager.STATE_FAILED
             else:
                 pair_state = self.pairing_manager.pair(self.request_service, server_info, dialog)
+                self.request_service.invalidate_server_info(self.request_service.host_ip)
 
                 if pair_state == AbstractPairingManager.STATE_PIN_WRONG:
                     message = 'PIN wrong.'
@@ -35,6 +36,7 @@ class ConnectionManager(object):
             if self.pairing_manager.get_pair_state(self.request_service,
                                                    server_info) == AbstractPairingManager.STATE_PAIRED:
                 self.pairing_manager.unpair(self.request_service, server_info)
+                self.request_service.invalidate_server_info(self.request_service.host_ip)
         except ValueError:
             # Unpairing a host needs to be fire and forget
             pass
@@ -1,4 +1,6 @@
+import threading
 import time
+
 from zeroconf import ServiceBrowser, Zeroconf, ServiceStateChange
 
 from resources.lib.model.mdnscomputer import MdnsComputer
@@ -11,20 +13,26 @@ class DiscoveryAgent(object):
         self.available_hosts = {}
         self.zeroconf = None
         self.browser = None
+        self.resolved = threading.Event()
 
     def service_state_change(self, zeroconf, service_type, name, state_change):
         if state_change is ServiceStateChange.Added:
             info = zeroconf.get_service_info(service_type, name)
-            self.available_hosts[name] = MdnsComputer.from_service_info(info)
+            if info is not None:
+                self.available_hosts[name] = MdnsComputer.from_service_info(info)
+                self.resolved.set()
 
-    def start_discovery(self, timeout=3):
-        start_time = time.time()
+    def start_discovery(self, timeout=3, first_only=False):
+        """
+        Browses for hosts for timeout seconds, or only until the first host resolved if first_only is set
+        """
+        self.resolved.clear()
         self.zeroconf = Zeroconf()
         self.browser = ServiceBrowser(self.zeroconf, self.service_type, handlers=[self.service_state_change])
         try:
-            while time.time() - start_time < timeout:
-                time.sleep(0.1)
-        except:
-            pass
+            if first_only:
+                self.resolved.wait(timeout)
+            else:
+                time.sleep(timeout)
         finally:
             self.zeroconf.close()
@@ -2,6 +2,7 @@
 #
 # NOTE: This dynamically typed stub was automatically generated by stubgen.
 
+from threading import Event
 from typing import Any, List, AnyStr
 from zeroconf import ServiceBrowser, ServiceStateChange, Zeroconf
 
@@ -13,6 +14,7 @@ class DiscoveryAgent:
     available_hosts = ... # type: List[MdnsComputer]
     zeroconf = ... # type: Zeroconf
     browser = ... # type: ServiceBrowser
+    resolved = ... # type: Event
     def __init__(self): ...
     def service_state_change(self, zeroconf:Zeroconf, service_type:AnyStr, name:AnyStr, state_change:ServiceStateChange): ...
-    def start_discovery(self, timeout=3) -> List[MdnsComputer]: ...
+    def start_discovery(self, timeout=3, first_only=False) -> None: ...
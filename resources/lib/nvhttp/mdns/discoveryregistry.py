@@ -0,0 +1,97 @@
+import threading
+
+from resources.lib.model.mdnscomputer import MdnsComputer
+from resources.lib.nvhttp.request.staticrequestservice import StaticRequestService
+
+
+class DiscoveryRegistry(object):
+    """
+    Keeps an mDNS browser for GameStream hosts running for as long as the service runs.
+
+    Every host which is announced is resolved and asked for its serverinfo on a thread of its own, and stored with
+    its details in the registry storage, from which the "Add Host" flow of the addon reads without waiting. Hosts which
+    go away are removed again.
+    """
+    service_type = '_nvstream._tcp.local.'
+    REGISTRY_STORAGE = 'discovered_hosts'
+
+    def __init__(self, core, logger):
+        self.core = core
+        self.logger = logger
+        self.hosts = core.get_storage(self.REGISTRY_STORAGE)
+        self.zeroconf = None
+        self.browser = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Starts browsing, returns False if zeroconf isn't available
+        :rtype: bool
+        """
+        try:
+            from zeroconf import ServiceBrowser, Zeroconf
+        except ImportError as e:
+            self.logger.info("Couldn't start mDNS discovery: %s" % e.message)
+            return False
+
+        self._clear()
+        self.zeroconf = Zeroconf()
+        self.browser = ServiceBrowser(self.zeroconf, self.service_type, handlers=[self.service_state_change])
+        self.logger.info("Started mDNS discovery")
+
+        return True
+
+    def stop(self):
+        if self.zeroconf is not None:
+            self.zeroconf.close()
+            self.zeroconf = None
+            self.browser = None
+        # nobody keeps the entries up to date anymore
+        self._clear()
+
+    def service_state_change(self, zeroconf, service_type, name, state_change):
+        from zeroconf import ServiceStateChange
+        if state_change is ServiceStateChange.Removed:
+            self.logger.info("Host %s went away" % name)
+            with self._lock:
+                if name in self.hosts:
+                    del self.hosts[name]
+                    self.hosts.sync()
+        elif state_change is ServiceStateChange.Added:
+            resolver = threading.Thread(target=self._resolve, args=(zeroconf, service_type, name))
+            resolver.daemon = True
+            resolver.start()
+
+    def get_hosts(self):
+        """
+        Returns the details of the hosts which are announced right now
+        :rtype: dict
+        :return: {host uuid: HostDetails}
+        """
+        with self._lock:
+            entries = self.hosts.values()
+
+        return dict((entry['host'].uuid, entry['host']) for entry in entries if entry['host'] is not None)
+
+    def _resolve(self, zeroconf, service_type, name):
+        info = zeroconf.get_service_info(service_type, name)
+        if info is None:
+            self.logger.info("Couldn't resolve %s" % name)
+            return
+
+        computer = MdnsComputer.from_service_info(info)
+        try:
+            host = StaticRequestService.get_static_computer_details(computer.address)
+        except (IOError, ValueError) as e:
+            self.logger.info("Getting serverinfo of %s (%s) failed: %s" % (name, computer.address, e))
+            host = None
+
+        self.logger.info("Discovered host %s at %s" % (name, computer.address))
+        with self._lock:
+            self.hosts[name] = {'address': computer.address, 'host': host}
+            self.hosts.sync()
+
+    def _clear(self):
+        with self._lock:
+            self.hosts.clear()
+            self.hosts.sync()
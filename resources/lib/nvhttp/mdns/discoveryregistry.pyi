@@ -0,0 +1,22 @@
+from typing import AnyStr, Dict
+
+from resources.lib.core.corefunctions import Core
+from resources.lib.core.logger import Logger
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.storageengine.storage import TimedStorage
+from zeroconf import ServiceBrowser, ServiceStateChange, Zeroconf
+
+
+class DiscoveryRegistry(object):
+    service_type = ... # type: str
+    REGISTRY_STORAGE = ... # type: str
+    core = ... # type: Core
+    logger = ... # type: Logger
+    hosts = ... # type: TimedStorage
+    zeroconf = ... # type: Zeroconf
+    browser = ... # type: ServiceBrowser
+    def __init__(self, core: Core, logger: Logger) -> None: ...
+    def start(self) -> bool: ...
+    def stop(self) -> None: ...
+    def service_state_change(self, zeroconf: Zeroconf, service_type: AnyStr, name: AnyStr, state_change: ServiceStateChange) -> None: ...
+    def get_hosts(self) -> Dict[str, HostDetails]: ...
@@ -9,6 +9,7 @@ from M2Crypto import X509
 from resources.lib.nvhttp.pairinghash.sha256pairinghash import Sha256PairingHash
 from resources.lib.nvhttp.pairinghash.sha1pairinghash import Sha1PairingHash
 from resources.lib.nvhttp.pairingmanager.abstractpairingmanager import AbstractPairingManager
+from resources.lib.nvhttp.response.pairresponse import PairResponse
 
 
 class AdvancedPairingManager(AbstractPairingManager):
@@ -21,8 +22,8 @@ class AdvancedPairingManager(AbstractPairingManager):
         self.logger = logger
 
     @staticmethod
-    def _extract_plain_cert(request_service, text):
-        cert_text = request_service.get_xml_string(text, "plaincert")
+    def _extract_plain_cert(pair_response):
+        cert_text = pair_response.plain_cert
 
         cert = X509.load_cert_string(cert_text.decode('hex'))
 
@@ -100,6 +101,16 @@ class AdvancedPairingManager(AbstractPairingManager):
     def _sign_data(data, key):
         return key.sign(hashlib.sha256(data).digest(), 'sha256')
 
+    @staticmethod
+    def _pair_step(request_service, base_url, query, enable_read_timeout=True):
+        """
+        :rtype: PairResponse
+        """
+        return PairResponse.parse(request_service.open_http_connection(
+            base_url + '/pair?' + request_service.build_uid_uuid_string() + '&devicename=roth&updateState=1&' + query,
+            enable_read_timeout
+        ))
+
     def pair(self, request_service, server_info, dialog):
         pin = self.generate_pin_string()
         self.update_dialog(pin, dialog)
@@ -116,37 +127,36 @@ class AdvancedPairingManager(AbstractPairingManager):
 
         aes_key = self._generate_aes_key(hash_algo, salt_and_pin)
 
-        get_cert = request_service.open_http_connection(
-            request_service.base_url_http + '/pair?' + request_service.build_uid_uuid_string() +
-            '&devicename=roth&updateState=1&phrase=getservercert&salt=' +
-            self.bytes_to_hex(salt) + '&clientcert=' + self.bytes_to_hex(self.pem_cert_bytes),
+        get_cert = self._pair_step(
+            request_service, request_service.base_url_http,
+            'phrase=getservercert&salt=' + self.bytes_to_hex(salt) + '&clientcert=' +
+            self.bytes_to_hex(self.pem_cert_bytes),
             False
         )
-        if int(request_service.get_xml_string(get_cert, 'paired')) != 1:
+        if not get_cert.paired:
             request_service.open_http_connection(
                 request_service.base_url_http + '/unpair?' + request_service.build_uid_uuid_string(),
                 True
             )
             return self.STATE_FAILED
 
-        server_cert, server_sig = self._extract_plain_cert(request_service, get_cert)
+        server_cert, server_sig = self._extract_plain_cert(get_cert)
 
         rnd_challenge = self._get_random_bytes(16)
         encrypted_challenge = self._encrypt_aes(rnd_challenge, aes_key)
 
-        challenge_response = request_service.open_http_connection(
-            request_service.base_url_http + '/pair?' + request_service.build_uid_uuid_string() +
-            '&devicename=roth&updateState=1&clientchallenge=' + self.bytes_to_hex(encrypted_challenge),
-            True
+        challenge_response = self._pair_step(
+            request_service, request_service.base_url_http,
+            'clientchallenge=' + self.bytes_to_hex(encrypted_challenge)
         )
-        if int(request_service.get_xml_string(challenge_response, 'paired')) != 1:
+        if not challenge_response.paired:
             request_service.open_http_connection(
                 request_service.base_url_http + '/unpair?' + request_service.build_uid_uuid_string(),
                 True
             )
             return self.STATE_FAILED
 
-        enc_srv_challenge_response = self._hex_to_bytes(request_service.get_xml_string(challenge_response, 'challengeresponse'))
+        enc_srv_challenge_response = self._hex_to_bytes(challenge_response.challenge_response)
         dec_srv_challenge_response = self._decrypt_aes(enc_srv_challenge_response, aes_key)
 
         srv_response = dec_srv_challenge_response[:hash_algo.get_hash_length()]
@@ -161,19 +171,18 @@ class AdvancedPairingManager(AbstractPairingManager):
         )
         enc_challenge_response = self._encrypt_aes(challenge_response_hash, aes_key)
 
-        secret_response = request_service.open_http_connection(
-            request_service.base_url_http + '/pair?' + request_service.build_uid_uuid_string() +
-            '&devicename=roth&updateState=1&serverchallengeresp=' + self.bytes_to_hex(enc_challenge_response),
-            True
+        secret_response = self._pair_step(
+            request_service, request_service.base_url_http,
+            'serverchallengeresp=' + self.bytes_to_hex(enc_challenge_response)
         )
-        if int(request_service.get_xml_string(secret_response, 'paired')) != 1:
+        if not secret_response.paired:
             request_service.open_http_connection(
                 request_service.base_url_http + '/unpair?' + request_service.build_uid_uuid_string(),
                 True
             )
             return self.STATE_FAILED
 
-        srv_secret_response = self._hex_to_bytes(request_service.get_xml_string(secret_response, 'pairingsecret'))
+        srv_secret_response = self._hex_to_bytes(secret_response.pairing_secret)
         srv_secret = srv_secret_response[:16]
         srv_signature = srv_secret_response[16:272]
 
@@ -198,24 +207,19 @@ class AdvancedPairingManager(AbstractPairingManager):
             return self.STATE_PIN_WRONG
 
         client_pairing_secret = self._concat_bytes(client_secret, self._sign_data(client_secret, self.private_key))
-        client_secret_response = request_service.open_http_connection(
-            request_service.base_url_http + '/pair?' + request_service.build_uid_uuid_string() +
-            '&devicename=roth&updateState=1&clientpairingsecret=' + self.bytes_to_hex(client_pairing_secret),
-            True
+        client_secret_response = self._pair_step(
+            request_service, request_service.base_url_http,
+            'clientpairingsecret=' + self.bytes_to_hex(client_pairing_secret)
         )
-        if int(request_service.get_xml_string(client_secret_response, 'paired')) != 1:
+        if not client_secret_response.paired:
             request_service.open_http_connection(
                 request_service.base_url_http + '/unpair?' + request_service.build_uid_uuid_string(),
                 True
             )
             return self.STATE_FAILED
 
-        pair_challenge = request_service.open_http_connection(
-            request_service.base_url_https + '/pair?' + request_service.build_uid_uuid_string() +
-            '&devicename=roth&updateState=1&phrase=pairchallenge',
-            True
-        )
-        if int(request_service.get_xml_string(pair_challenge, 'paired')) != 1:
+        pair_challenge = self._pair_step(request_service, request_service.base_url_https, 'phrase=pairchallenge')
+        if not pair_challenge.paired:
             request_service.open_http_connection(
                 request_service.base_url_http + '/unpair?' + request_service.build_uid_uuid_string(),
                 True
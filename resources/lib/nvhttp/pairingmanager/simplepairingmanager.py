@@ -30,6 +30,7 @@ class SimplePairingManager(AbstractPairingManager):
             if not pairing_thread.isAlive():
                 break
 
+        request_service.invalidate_server_info(request_service.host_ip)
         new_server_info = request_service.get_server_info()
         if self.get_pair_state(request_service, new_server_info) == self.STATE_PAIRED:
             return self.STATE_PAIRED
@@ -0,0 +1,194 @@
+import Queue
+import socket
+import threading
+import time
+
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.nvhttp.request.staticrequestservice import StaticRequestService
+from resources.lib.service.httpclientservice import InFlightRequest
+
+
+class ReachabilityResolver(object):
+    """
+    Decides whether a host is reached via its local or its remote address, happy-eyeballs style.
+
+    The local address is probed first (a TCP connect to the NvHTTP port). If it hasn't connected after head_start
+    seconds, or failed before that, the remote address is probed in parallel and the first one to connect wins. The
+    winner is recorded as HostDetails.reachability and used for ttl seconds, a host which answered on neither address
+    is asked again after OFFLINE_TTL seconds. Hosts without a remote address different from the local one are never
+    probed.
+    """
+    REACHABILITY_TTL = 300
+    OFFLINE_TTL = 10
+    HEAD_START = 0.25
+    PROBE_TIMEOUT = 2
+
+    def __init__(self, logger, ttl=REACHABILITY_TTL, head_start=HEAD_START, probe_timeout=PROBE_TIMEOUT,
+                 port=StaticRequestService.HTTP_PORT):
+        self.logger = logger
+        self.ttl = ttl
+        self.head_start = head_start
+        self.probe_timeout = probe_timeout
+        self.port = port
+        self.hits = 0
+        self.races = 0
+        self.wins = {HostDetails.REACH_LOCAL: 0, HostDetails.REACH_REMOTE: 0, HostDetails.REACH_OFFLINE: 0}
+        self.timings = {}
+        self._resolved = {}
+        self._races = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host, force=False):
+        """
+        Returns the address host is reached at, racing its addresses unless a result younger than the TTL is known
+        :type host: HostDetails
+        :param force: race even if a result is known
+        :rtype: str
+        """
+        candidates = self.get_candidates(host)
+        if len(candidates) < 2:
+            return host.local_ip
+
+        with self._lock:
+            reachability, address, expires = self._resolved.get(host.uuid, (None, None, 0))
+            if not force and time.time() < expires:
+                self.hits += 1
+                host.reachability = reachability
+                return address
+            race = self._races.get(host.uuid)
+            follower = race is not None
+            if not follower:
+                race = self._races[host.uuid] = InFlightRequest()
+        if follower:
+            reachability, address = race.result()
+            host.reachability = reachability
+            return address
+
+        try:
+            reachability, address = self._race(host, candidates)
+        except Exception as e:
+            race.finish(error=e)
+            raise
+        else:
+            race.finish((reachability, address))
+        finally:
+            with self._lock:
+                del self._races[host.uuid]
+
+        host.reachability = reachability
+        return address
+
+    def invalidate(self, address=None):
+        """Forgets the results which resolved to address, or all of them"""
+        with self._lock:
+            for uuid, (_, resolved_address, _) in self._resolved.items():
+                if address is None or resolved_address == address:
+                    del self._resolved[uuid]
+
+    def get_statistics(self):
+        """
+        Counts the resolutions answered from a known result (hits), the races and which address won them
+        :rtype: dict
+        """
+        return {
+            'hits': self.hits,
+            'races': self.races,
+            'local': self.wins[HostDetails.REACH_LOCAL],
+            'remote': self.wins[HostDetails.REACH_REMOTE],
+            'offline': self.wins[HostDetails.REACH_OFFLINE]
+        }
+
+    @staticmethod
+    def get_candidates(host):
+        """
+        :type host: HostDetails
+        :rtype: list[tuple]
+        :return: [(reachability, address)] in the order they are probed
+        """
+        candidates = []
+        if host.local_ip:
+            candidates.append((HostDetails.REACH_LOCAL, host.local_ip))
+        if host.remote_ip and host.remote_ip != host.local_ip:
+            candidates.append((HostDetails.REACH_REMOTE, host.remote_ip))
+
+        return candidates
+
+    def probe(self, address):
+        """
+        :rtype: bool
+        :return: True if the NvHTTP port of address accepted a connection within probe_timeout
+        """
+        try:
+            connection = socket.create_connection((address, self.port), self.probe_timeout)
+        except (socket.error, socket.timeout):
+            return False
+        connection.close()
+        return True
+
+    def _race(self, host, candidates):
+        results = Queue.Queue()
+        start = time.time()
+        timings = {}
+        winner = None
+        pending = 0
+
+        for index, (reachability, address) in enumerate(candidates):
+            timings[reachability] = None
+            prober = threading.Thread(target=self._probe_into, args=(reachability, address, results))
+            prober.daemon = True
+            prober.start()
+            pending += 1
+            last = index == len(candidates) - 1
+            # the last probe started is also the last one to time out
+            wait_until = time.time() + (self.probe_timeout + 0.1 if last else self.head_start)
+
+            while pending > 0 and winner is None:
+                try:
+                    probed, probed_address, connected, elapsed = results.get(
+                        timeout=max(0, wait_until - time.time()))
+                except Queue.Empty:
+                    break
+                pending -= 1
+                timings[probed] = (elapsed, connected)
+                if connected:
+                    winner = probed, probed_address
+            if winner is not None:
+                break
+
+        if winner is None:
+            winner = HostDetails.REACH_OFFLINE, host.local_ip
+        resolved_after = time.time() - start
+        self._record(host, winner, resolved_after)
+        self._log_race(host, candidates, timings, winner, resolved_after)
+
+        return winner
+
+    def _probe_into(self, reachability, address, results):
+        start = time.time()
+        connected = self.probe(address)
+        results.put((reachability, address, connected, time.time() - start))
+
+    def _record(self, host, winner, resolved_after):
+        reachability, address = winner
+        ttl = self.OFFLINE_TTL if reachability == HostDetails.REACH_OFFLINE else self.ttl
+        with self._lock:
+            self._resolved[host.uuid] = (reachability, address, time.time() + ttl)
+            self.races += 1
+            self.wins[reachability] += 1
+            self.timings[host.uuid] = resolved_after
+
+    def _log_race(self, host, candidates, timings, winner, resolved_after):
+        names = {HostDetails.REACH_LOCAL: 'local', HostDetails.REACH_REMOTE: 'remote',
+                 HostDetails.REACH_OFFLINE: 'offline'}
+        probes = []
+        for reachability, address in candidates:
+            if reachability not in timings:
+                outcome = 'not started'
+            elif timings[reachability] is None:
+                outcome = 'no answer yet'
+            else:
+                elapsed, connected = timings[reachability]
+                outcome = '%s after %dms' % ('connected' if connected else 'failed', elapsed * 1000)
+            probes.append('%s %s %s' % (names[reachability], address, outcome))
+        self.logger.info("Reachability of %s: %s after %dms (%s)" % (
+            host.name, names[winner[0]], resolved_after * 1000, ', '.join(probes)))
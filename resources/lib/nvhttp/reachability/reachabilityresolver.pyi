@@ -0,0 +1,27 @@
+from typing import Dict, List, Tuple
+
+from resources.lib.core.logger import Logger
+from resources.lib.model.hostdetails import HostDetails
+
+
+class ReachabilityResolver(object):
+    REACHABILITY_TTL = ... # type: int
+    OFFLINE_TTL = ... # type: int
+    HEAD_START = ... # type: float
+    PROBE_TIMEOUT = ... # type: float
+    logger = ... # type: Logger
+    ttl = ... # type: float
+    head_start = ... # type: float
+    probe_timeout = ... # type: float
+    port = ... # type: int
+    hits = ... # type: int
+    races = ... # type: int
+    wins = ... # type: Dict[int, int]
+    timings = ... # type: Dict[str, float]
+    def __init__(self, logger: Logger, ttl: float = ..., head_start: float = ..., probe_timeout: float = ..., port: int = ...) -> None: ...
+    def resolve(self, host: HostDetails, force: bool = False) -> str: ...
+    def invalidate(self, address: str = None) -> None: ...
+    def get_statistics(self) -> Dict[str, int]: ...
+    @staticmethod
+    def get_candidates(host: HostDetails) -> List[Tuple[int, str]]: ...
+    def probe(self, address: str) -> bool: ...
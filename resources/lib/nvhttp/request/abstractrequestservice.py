@@ -1,6 +1,9 @@
-import re
+import os
 from abc import ABCMeta
-import xml.etree.ElementTree as ETree
+
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.nvhttp.response.nvhttpresponse import NvHttpResponse, parse_xml
+from resources.lib.nvhttp.response.serverinforesponse import ServerInfoResponse
 
 
 class AbstractRequestService(object):
@@ -14,8 +17,10 @@ class AbstractRequestService(object):
 
     @staticmethod
     def get_xml_string(server_info, tag):
-        if isinstance(server_info, str):
-            server_info = ETree.ElementTree(ETree.fromstring(server_info.encode('utf-16'))).getroot()
+        if isinstance(server_info, NvHttpResponse):
+            return server_info.get(tag)
+        if isinstance(server_info, basestring):
+            return NvHttpResponse.parse(server_info).get(tag)
 
         if server_info.find(tag) is not None:
             text = server_info.find(tag).text
@@ -27,17 +32,15 @@ class AbstractRequestService(object):
     @staticmethod
     def verify_response_status(response):
         try:
-            server_info = ETree.ElementTree(ETree.fromstring(response.content.encode('utf-16'))).getroot()
-            status_code = server_info.get('status_code')
-            status_message = server_info.get('status_message')
-        except ETree.ParseError:
-            status_code = str(response.status_code)
-            status_message = response.content
-        if int(status_code) != 200:
-            raise AssertionError(status_code + ' ' + status_message)
+            NvHttpResponse.parse(response.content).verify_status()
+        except ValueError:
+            if response.status_code != 200:
+                raise AssertionError('%s %s' % (response.status_code, response.content))
 
     @staticmethod
     def get_server_version(server_info):
+        if isinstance(server_info, ServerInfoResponse):
+            return server_info.server_version
         return AbstractRequestService.get_xml_string(server_info, "appversion")
 
     @staticmethod
@@ -45,64 +48,33 @@ class AbstractRequestService(object):
         server_version = AbstractRequestService.get_server_version(server_info)
         return int(server_version[:1])
 
-    def re_encode_string(self, xml_string):
-        regex = re.compile('UTF-\d{1,2}')
-
-        specified_encoding = regex.search(xml_string)
-
-        self.logger.info("Trying to decode as: %s" % 'ASCII')
-        try:
-            xml_string = xml_string.decode(encoding='ascii')
-        except UnicodeDecodeError as e:
-            self.logger.info("Decoding as %s failed, trying as %s" % ('ASCII', 'UTF-8'))
-            try:
-                xml_string = xml_string.decode(encoding='UTF-8')
-            except UnicodeDecodeError as e:
-                self.logger.info("Decoding as %s failed, trying as %s" % ('UTF-8', 'UTF-16'))
-                try:
-                    xml_string = xml_string.decode(encoding='UTF-16')
-                except UnicodeDecodeError as e:
-                    self.logger.error("Decoding as UTF-16 failed, this was the last attempt. Offending string follows ...")
-                    self.logger.error(xml_string)
-                    raise ValueError("String Decode Failed")
-
-        if specified_encoding is not None:
-            try:
-                self.logger.info("Trying to encode as specified in XML: %s" % specified_encoding.group(0))
-                xml_string = xml_string.encode(encoding=specified_encoding.group(0))
-            except UnicodeEncodeError as e:
-                new_encode_setting = 'UTF-16' if specified_encoding.group(0) == 'UTF-8' else 'UTF-8'
-                self.logger.info("Encoding as %s failed, trying as %s" % (specified_encoding.group(0), new_encode_setting))
-                try:
-                    xml_string = xml_string.encode(encoding=new_encode_setting)
-                except UnicodeEncodeError as e:
-                    self.logger.error(
-                        "Encoding as %s failed, this was the last attempt. Offending string follows ..." %
-                        new_encode_setting)
-                    self.logger.error(xml_string)
-                    raise ValueError("String Encode Failed")
-
-            return xml_string
-        else:
-            self.logger.info("RegExp couldn't find a match in the XML string ...")
-            try:
-                self.logger.info("Trying to encode as: UTF-8")
-                xml_string = xml_string.encode(encoding='UTF-8')
-            except UnicodeEncodeError as e:
-                self.logger.info("Encoding as UTF-8 failed, trying as UTF-16")
-                try:
-                    xml_string = xml_string.encode(encoding='UTF-16')
-                except UnicodeEncodeError as e:
-                    self.logger.error("Encoding as UTF-16 failed, this was the last attempt. Offending string follows ...")
-                    self.logger.error(xml_string)
-                    raise ValueError("String Encode Failed")
-
-            return xml_string
+    @staticmethod
+    def build_host_details(server_info):
+        """
+        :type server_info: ServerInfoResponse
+        :rtype: HostDetails
+        """
+        from resources.lib.nvhttp.cryptoprovider.abstractcryptoprovider import AbstractCryptoProvider
+
+        host = HostDetails()
+        host.name = server_info.hostname
+        host.uuid = server_info.unique_id
+        host.mac_address = server_info.mac_address
+        host.local_ip = server_info.local_ip
+        host.remote_ip = server_info.external_ip
+        host.pair_state = server_info.pair_status
+        host.gpu_type = server_info.gpu_type
+        host.gamelist_id = server_info.gamelist_id
+        host.server_version = server_info.server_version
+        host.key_dir = os.path.join(AbstractCryptoProvider.get_key_base_path(), host.uuid)
+        host.state = HostDetails.STATE_ONLINE
+
+        return host
 
     def build_etree(self, xml_string):
         try:
-            etree = ETree.fromstring(AbstractRequestService.re_encode_string(self, xml_string))
-        except ETree.ParseError as e:
+            etree = parse_xml(xml_string)
+        except ValueError as e:
             self.logger.error("Building ETree from XML failed: %s. Offending string follows ..." % e.message)
             self.logger.error(xml_string)
             raise ValueError("Building ETree Failed")
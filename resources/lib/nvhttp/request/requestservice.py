@@ -1,81 +1,217 @@
+import collections
+import hashlib
 import json
 import os
 import random
+import threading
+import time
+import urlparse
 import uuid
-import xml.etree.ElementTree as ETree
 
 import requests
 from requests import ConnectionError
 
-from resources.lib.model.hostdetails import HostDetails
-from resources.lib.model.nvapp import NvApp
-from resources.lib.nvhttp.cryptoprovider.abstractcryptoprovider import AbstractCryptoProvider
 from resources.lib.nvhttp.request.abstractrequestservice import AbstractRequestService
+from resources.lib.nvhttp.response.applistresponse import AppListResponse
+from resources.lib.nvhttp.response.serverinforesponse import ServerInfoResponse
+from resources.lib.service.httpclientservice import ConnectionCounter, CountingHTTPAdapter, InFlightRequest
+
+# where and as whom one call talks to the host
+Target = collections.namedtuple('Target', ['host_ip', 'key_dir', 'base_url_https', 'base_url_http', 'uid'])
 
 
 class RequestService(AbstractRequestService):
-    def __init__(self, core, crypto_provider, config_helper, host_context_service, logger):
+    """
+    Talks NvHTTP to the current host.
+
+    Every host gets its own requests.Session (one with and one without the client certificate), so the TLS
+    connections and their handshakes are reused across serverinfo, applist, appasset and pair calls. Which of HTTPS
+    and HTTP answered serverinfo is remembered per host, so unpaired and GEN7 hosts aren't asked over HTTPS first every
+    time. The memory expires after SCHEME_TTL seconds and is dropped whenever a host is paired or unpaired.
+
+    Serverinfo responses are cached per host for server_info_ttl seconds and callers asking while a fetch is in
+    flight wait for it instead of sending their own. Pairing, unpairing and launching invalidate the cache. The client
+    UID is read from the key directory once per host context.
+
+    The host is addressed by its local or remote address, whichever the ReachabilityResolver found to answer. A
+    request which can't connect makes it race the addresses again.
+
+    Every call resolves the current host into a Target once and builds its URLs from it, so calls running on other
+    threads for another host never change where or as whom it talks.
+    """
+    SCHEME_TTL = 600
+    SERVER_INFO_TTL = 5
+    POOL_SIZE = 4
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, core, crypto_provider, config_helper, host_context_service, reachability_resolver, logger,
+                 server_info_ttl=SERVER_INFO_TTL):
         super(RequestService, self).__init__(logger)
         self.core = core
         self.crypto_provider = crypto_provider
         self.config_helper = config_helper
         self.host_context_service = host_context_service
+        self.reachability_resolver = reachability_resolver
+        self.connection_counter = ConnectionCounter()
+        self._sessions = {}
+        self._schemes = {}
+        self.server_info_ttl = server_info_ttl
+        self.server_info_hits = 0
+        self.server_info_misses = 0
+        self._server_infos = {}
+        self._server_info_fetches = {}
+        self._server_info_generations = {}
+        self._uids = {}
+        self._app_indexes = {}
+        self._lock = threading.Lock()
         self.config_helper.configure(False)
 
-    def _reconfigure(self):
+    def get_target(self):
+        """
+        Resolves the address, URLs and client UID of the current host
+        :rtype: Target
+        """
         host_details = self.host_context_service.get_current_context()
+        host_ip = self.reachability_resolver.resolve(host_details)
+
+        return Target(host_ip, host_details.key_dir, 'https://%s:%s' % (host_ip, self.HTTPS_PORT),
+                      'http://%s:%s' % (host_ip, self.HTTP_PORT), self._get_uid(host_details.key_dir))
+
+    @property
+    def host_ip(self):
+        return self.get_target().host_ip
+
+    @property
+    def key_dir(self):
+        return self.host_context_service.get_current_context().key_dir
 
-        self.host_ip = host_details.local_ip
-        self.key_dir = host_details.key_dir
-        self.base_url_https = 'https://%s:%s' % (self.host_ip, self.HTTPS_PORT)
-        self.base_url_http = 'http://%s:%s' % (self.host_ip, self.HTTP_PORT)
-        self.uid = self._load_or_generate_uid()
+    @property
+    def base_url_https(self):
+        return self.get_target().base_url_https
 
-    def build_uid_uuid_string(self):
-        self._reconfigure()
-        return 'uniqueid=%s&uuid=%s' % (self.uid, uuid.uuid4())
+    @property
+    def base_url_http(self):
+        return self.get_target().base_url_http
+
+    @property
+    def uid(self):
+        return self.get_target().uid
+
+    def get_host_ip(self):
+        """Returns the address the current host is reached at"""
+        return self.host_ip
+
+    def build_uid_uuid_string(self, target=None):
+        """
+        :param target: the Target of the call the query is built for, the current host if None
+        """
+        if target is None:
+            target = self.get_target()
+        return 'uniqueid=%s&uuid=%s' % (target.uid, uuid.uuid4())
 
     def get_server_info(self):
-        self._reconfigure()
+        """
+        Returns the serverinfo of the current host, from cache if it was fetched less than server_info_ttl seconds ago
+        :rtype: ServerInfoResponse
+        """
+        target = self.get_target()
+        host = target.host_ip
+        with self._lock:
+            content, fetched_at = self._server_infos.get(host, (None, 0))
+            if content is not None and time.time() - fetched_at <= self.server_info_ttl:
+                self.server_info_hits += 1
+                return content
+            fetch = self._server_info_fetches.get(host)
+            follower = fetch is not None
+            if follower:
+                self.server_info_hits += 1
+            else:
+                self.server_info_misses += 1
+                fetch = self._server_info_fetches[host] = InFlightRequest()
+                generation = self._server_info_generations.get(host, 0)
+        if follower:
+            return fetch.result()
+
+        try:
+            content = self._fetch_server_info(target)
+        except Exception as e:
+            fetch.finish(error=e)
+            raise
+        else:
+            fetch.finish(content)
+            with self._lock:
+                # a fetch which was running while the host got invalidated may be outdated already
+                if self._server_info_generations.get(host, 0) == generation:
+                    self._server_infos[host] = (content, time.time())
+        finally:
+            with self._lock:
+                del self._server_info_fetches[host]
+
+        return content
+
+    def invalidate_server_info(self, host=None):
+        """Drops the cached serverinfo of host, or of all hosts"""
+        with self._lock:
+            hosts = self._server_infos.keys() + self._server_info_fetches.keys() if host is None else [host]
+            for host in hosts:
+                self._server_infos.pop(host, None)
+                self._server_info_generations[host] = self._server_info_generations.get(host, 0) + 1
+
+    def get_server_info_statistics(self):
+        """
+        Counts the serverinfo calls answered from cache or by a fetch in flight (hits) and the ones which were fetched
+        :rtype: dict
+        """
+        return {'hits': self.server_info_hits, 'misses': self.server_info_misses}
+
+    def _fetch_server_info(self, target):
+        if self._get_remembered_scheme(target.host_ip) == 'http':
+            response = self.open_http_connection(
+                target.base_url_http + '/serverinfo?' + self.build_uid_uuid_string(target), True, False)
+            if response is None:
+                self.forget_scheme(target.host_ip)
+                raise ValueError("Host %s didn't answer serverinfo" % target.host_ip)
+
+            return ServerInfoResponse.parse(response.content)
+
         response = None
         try:
             response = self.open_http_connection(
-                self.base_url_https + '/serverinfo?' + self.build_uid_uuid_string(), True, False)
+                target.base_url_https + '/serverinfo?' + self.build_uid_uuid_string(target), True, False)
+            if response is None:
+                raise ValueError("Host %s didn't answer serverinfo" % target.host_ip)
 
-            self.verify_response_status(response)
+            try:
+                server_info = ServerInfoResponse.parse(response.content)
+            except ValueError:
+                raise AssertionError('%s %s' % (response.status_code, response.content))
+            server_info.verify_status()
+            self._remember_scheme(target.host_ip, 'https')
         except (AssertionError, IOError) as e:
             # Looks like GEN7 Servers are sending 404 instead of 401 if client is not authorized
             # GFE 2.11.3.5 returns 200 on my machine, only the response body has the right status code
             if response is not None and response.status_code in [401, 404] or isinstance(e.message, str) and \
                     e.message.startswith('401'):
                 response = self.open_http_connection(
-                    self.base_url_http + '/serverinfo?' + self.build_uid_uuid_string(), True, False)
+                    target.base_url_http + '/serverinfo?' + self.build_uid_uuid_string(target), True, False)
+                if response is None:
+                    raise ValueError("Host %s didn't answer serverinfo" % target.host_ip)
+                server_info = ServerInfoResponse.parse(response.content)
+                self._remember_scheme(target.host_ip, 'http')
             else:
                 raise ValueError(e.message)
 
-        return response.content
+        return server_info
 
     def get_computer_details(self):
-        server_info = ETree.ElementTree(ETree.fromstring(self.re_encode_string(self.get_server_info()))).getroot()
-
-        host = HostDetails()
-        host.name = self.get_xml_string(server_info, 'hostname')
-        host.uuid = self.get_xml_string(server_info, 'uniqueid')
-        host.mac_address = self.get_xml_string(server_info, 'mac')
-        host.local_ip = self.get_xml_string(server_info, 'LocalIP')
-        host.remote_ip = self.get_xml_string(server_info, 'ExternalIP')
-        host.pair_state = int(self.get_xml_string(server_info, 'PairStatus'))
-        host.gpu_type = self.get_xml_string(server_info, 'gputype')
-        host.gamelist_id = self.get_xml_string(server_info, 'gamelistid')
-        host.server_version = self.get_server_version(server_info)
-        host.key_dir = os.path.join(AbstractCryptoProvider.get_key_base_path(), host.uuid)
-        host.state = HostDetails.STATE_ONLINE
-
-        # self.key_dir = host.key_dir
-
-        return host
-
-    def open_http_connection(self, url, enable_read_timeout, content_only=True):
+        return self.build_host_details(self.get_server_info())
+
+    def open_http_connection(self, url, enable_read_timeout, content_only=True, stream=False):
+        host = urlparse.urlsplit(url).hostname
+        if '/pair?' in url or '/unpair?' in url:
+            self.forget_scheme(host)
+            self.invalidate_server_info(host)
+
         try:
             cert = self.crypto_provider.get_cert_path()
             key = self.crypto_provider.get_key_path()
@@ -84,19 +220,20 @@ class RequestService(AbstractRequestService):
             if not os.path.isfile(cert) or not os.path.isfile(key):
                 raise IOError
 
+            session = self._get_session(host, (cert, key))
             if enable_read_timeout:
                 # TODO: Only disable host name checking via custom transport:
                 # http://stackoverflow.com/questions/22758031/how-to-disable-hostname-checking-in-requests-python
-                response = requests.get(url, timeout=(3, 5), cert=(cert, key),
-                                        verify=False)
+                response = session.get(url, timeout=(3, 5), cert=(cert, key), verify=False, stream=stream)
             else:
-                response = requests.get(url, timeout=(3, None), cert=(cert, key),
-                                        verify=False)
+                response = session.get(url, timeout=(3, None), cert=(cert, key), verify=False, stream=stream)
         except (IOError, ValueError):
             try:
-                response = requests.get(url, timeout=(3, 5), verify=False)
+                response = self._get_session(host).get(url, timeout=(3, 5), verify=False, stream=stream)
             except ConnectionError, e:
                 self.logger.error("Request failed. URL: '%s', reason: '%s'" % (url, e.message))
+                # the client may have moved between networks, race the host's addresses again next time
+                self.reachability_resolver.invalidate(host)
                 return
 
         if content_only:
@@ -104,72 +241,115 @@ class RequestService(AbstractRequestService):
         else:
             return response
 
+    def forget_scheme(self, host):
+        """Drops the remembered serverinfo scheme of host, so the next serverinfo starts over with HTTPS"""
+        with self._lock:
+            self._schemes.pop(host, None)
+
+    def get_connection_statistics(self):
+        """
+        Counts the requests which needed a new connection (and handshake) and the ones which reused one
+        :rtype: dict
+        """
+        return {
+            'new_connections': self.connection_counter.new_connections,
+            'reused_connections': self.connection_counter.reused_connections
+        }
+
+    def _get_session(self, host, cert=None):
+        with self._lock:
+            session = self._sessions.get((host, cert))
+            if session is None:
+                session = requests.Session()
+                adapter = CountingHTTPAdapter(self.connection_counter, pool_connections=2,
+                                              pool_maxsize=self.POOL_SIZE)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[(host, cert)] = session
+
+            return session
+
+    def _get_uid(self, key_dir):
+        with self._lock:
+            uid = self._uids.get(key_dir)
+        if uid is None:
+            uid = self._load_or_generate_uid(key_dir)
+            with self._lock:
+                self._uids[key_dir] = uid
+
+        return uid
+
+    def _get_remembered_scheme(self, host):
+        with self._lock:
+            scheme, remembered_at = self._schemes.get(host, (None, 0))
+        if time.time() - remembered_at > self.SCHEME_TTL:
+            return None
+
+        return scheme
+
+    def _remember_scheme(self, host, scheme):
+        with self._lock:
+            self._schemes[host] = (scheme, time.time())
+
     def get_gpu_type(self, server_info):
-        return self.get_xml_string(server_info, "gputype")
+        return self._as_server_info(server_info).gpu_type
 
     def get_current_game(self, server_info):
-        server_state = self.get_xml_string(server_info, "state")
-        if server_state is not None and not server_state.endswith('_SERVER_AVAILABLE'):
-            game = self.get_xml_string(server_info, "currentgame")
-            return int(game)
-        else:
-            return 0
+        return self._as_server_info(server_info).current_game
+
+    @staticmethod
+    def _as_server_info(server_info):
+        if isinstance(server_info, ServerInfoResponse):
+            return server_info
+        return ServerInfoResponse.parse(server_info)
 
     def get_app_by_id(self, app_id):
-        applist = self.get_app_list()
-        for _app_id, _app_name in applist:
-            if app_id == _app_id:
-                app_idx = applist.index((_app_id, _app_name))
-                return applist[app_idx]
-        return None
+        """
+        Looks the app up in an index of the host's applist, which is rebuilt when the host's gamelistid changes
+        :rtype: NvApp
+        """
+        host = self.get_host_ip()
+        try:
+            gamelist_id = self.get_server_info().gamelist_id
+        except ValueError:
+            gamelist_id = None
+        with self._lock:
+            indexed_gamelist_id, index = self._app_indexes.get(host, (None, None))
+        if index is None or gamelist_id is None or indexed_gamelist_id != gamelist_id:
+            index = dict((app.id, app) for app in self.get_app_list())
+            with self._lock:
+                self._app_indexes[host] = (gamelist_id, index)
+
+        return index.get(str(app_id))
 
     def get_app_list(self):
-        self._reconfigure()
-        response = self.open_http_connection(self.base_url_https + '/applist?' + self.build_uid_uuid_string(), False,
-                                             False)
+        target = self.get_target()
+        response = self.open_http_connection(target.base_url_https + '/applist?' + self.build_uid_uuid_string(target),
+                                             False, False)
         if not response:
             self.logger.error("No response received when trying to get host list - host is either unknown or offline.")
             app_list = []
         elif response.status_code in [401, 404]:
             app_list = []
         else:
-            self.logger.info(response.content)
             app_list = self.get_app_list_from_string(response.content)
+            self.logger.info("Received app list of %s bytes with %s apps" % (len(response.content), len(app_list)))
 
         return app_list
 
     def get_app_list_from_string(self, xml_string):
-        etree = self.build_etree(xml_string)
-        if etree is not None:
-            applist_root = ETree.ElementTree(etree).getroot()
-            applist = []
-
-            for app in applist_root.findall('App'):
-                nvapp = NvApp()
-                if app.find('AppInstallPath') is not None:
-                    nvapp.install_path = app.find('AppInstallPath').text
-                if app.find('AppTitle') is not None:
-                    nvapp.title = app.find('AppTitle').text.encode('UTF-8')
-                if app.find('Distributor') is not None:
-                    nvapp.distributor = app.find('Distributor').text
-                if app.find('ID') is not None:
-                    nvapp.id = app.find('ID').text
-                if app.find('MaxControllersForSingleSession') is not None:
-                    nvapp.max_controllers = app.find('MaxControllersForSingleSession').text
-                if app.find('ShortName') is not None:
-                    nvapp.short_name = app.find('ShortName').text
-                applist.append(nvapp)
-
-            return applist
-        else:
-            raise ValueError("ETree is not set.")
+        try:
+            return AppListResponse.parse(xml_string).apps
+        except ValueError as e:
+            self.logger.error("Parsing app list of %s bytes failed: %s" % (len(xml_string or ''), e))
+            raise
 
     def get_box_art(self, app_id, asset_type=2, asset_idx=0):
-        self._reconfigure()
+        target = self.get_target()
         # TODO: What are the other asset types and indices?
         response = self.open_http_connection(
-            '{0:s}/appasset?{1:s}&appid={2:s}&AssetType={3:s}&AssetIdx={4:s}'.format(self.base_url_https,
-                                                                                     self.build_uid_uuid_string(),
+            '{0:s}/appasset?{1:s}&appid={2:s}&AssetType={3:s}&AssetIdx={4:s}'.format(target.base_url_https,
+                                                                                     self.build_uid_uuid_string(target),
                                                                                      str(app_id), str(asset_type),
                                                                                      str(asset_idx)),
             True, content_only=False)
@@ -179,14 +359,50 @@ class RequestService(AbstractRequestService):
         else:
             return response.content
 
+    def stream_box_art(self, app_id, file_path, asset_type=2, asset_idx=0):
+        """
+        Streams the box art of app_id into file_path, over the pooled connection of the current host
+        :rtype: str
+        :return: sha1 hex digest of the image or None if the host has none
+        """
+        target = self.get_target()
+        response = self.open_http_connection(
+            '{0:s}/appasset?{1:s}&appid={2:s}&AssetType={3:s}&AssetIdx={4:s}'.format(target.base_url_https,
+                                                                                     self.build_uid_uuid_string(target),
+                                                                                     str(app_id), str(asset_type),
+                                                                                     str(asset_idx)),
+            True, content_only=False, stream=True)
+        if response is None:
+            return None
+
+        try:
+            if response.status_code != 200:
+                return None
+
+            digest = hashlib.sha1()
+            length = 0
+            with open(file_path, 'wb') as image:
+                for chunk in response.iter_content(self.CHUNK_SIZE):
+                    image.write(chunk)
+                    digest.update(chunk)
+                    length += len(chunk)
+        finally:
+            response.close()
+
+        if length == 0:
+            os.remove(file_path)
+            return None
+
+        return digest.hexdigest()
+
 #    def unpair(self):
 #        self.open_http_connection(self.base_url_https + '/unpair?' + self.build_uid_uuid_string(), True)
 
-    def _load_or_generate_uid(self):
-        uid_file = os.path.join(self.key_dir, 'uniqueid.dat')
-        self.logger.info(self.key_dir)
-        if not os.path.isdir(self.key_dir):
-            os.makedirs(self.key_dir)
+    def _load_or_generate_uid(self, key_dir):
+        uid_file = os.path.join(key_dir, 'uniqueid.dat')
+        self.logger.info(key_dir)
+        if not os.path.isdir(key_dir):
+            os.makedirs(key_dir)
         if not os.path.isfile(uid_file):
             uid = hex(random.getrandbits(63)).rstrip("L").lstrip("0x")
             with open(uid_file, 'wb') as f:
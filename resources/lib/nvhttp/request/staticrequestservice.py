@@ -1,47 +1,30 @@
-import os
 import random
 import uuid
-import xml.etree.ElementTree as ETree
 
 import requests
 
-from resources.lib.model.hostdetails import HostDetails
 from resources.lib.nvhttp.request.abstractrequestservice import AbstractRequestService
+from resources.lib.nvhttp.response.serverinforesponse import ServerInfoResponse
 
 
 class StaticRequestService(AbstractRequestService):
     @staticmethod
-    def get_static_server_info(host_ip):
-        base_url_http = 'http://%s:%s' % (host_ip, StaticRequestService.HTTP_PORT)
+    def get_static_server_info(host_ip, timeout=(3, 5), port=None):
+        base_url_http = 'http://%s:%s' % (host_ip, port or StaticRequestService.HTTP_PORT)
         response = StaticRequestService.open_static_http_connection(
-            base_url_http + '/serverinfo?' + StaticRequestService.build_static_uid_uuid_string(), False)
+            base_url_http + '/serverinfo?' + StaticRequestService.build_static_uid_uuid_string(), False, timeout)
 
         return response.content
 
     @staticmethod
     def get_static_computer_details(host_ip):
-        from resources.lib.nvhttp.cryptoprovider.abstractcryptoprovider import AbstractCryptoProvider
-        server_info = ETree.ElementTree(
-            ETree.fromstring(StaticRequestService.get_static_server_info(host_ip).encode('utf-16'))).getroot()
-
-        host = HostDetails()
-        host.name = StaticRequestService.get_xml_string(server_info, 'hostname')
-        host.uuid = StaticRequestService.get_xml_string(server_info, 'uniqueid')
-        host.mac_address = StaticRequestService.get_xml_string(server_info, 'mac')
-        host.local_ip = StaticRequestService.get_xml_string(server_info, 'LocalIP')
-        host.remote_ip = StaticRequestService.get_xml_string(server_info, 'ExternalIP')
-        host.pair_state = int(StaticRequestService.get_xml_string(server_info, 'PairStatus'))
-        host.gpu_type = StaticRequestService.get_xml_string(server_info, 'gputype')
-        host.gamelist_id = StaticRequestService.get_xml_string(server_info, 'gamelistid')
-        host.server_version = StaticRequestService.get_server_version(server_info)
-        host.key_dir = os.path.join(AbstractCryptoProvider.get_key_base_path(), host.uuid)
-        host.state = HostDetails.STATE_ONLINE
-
-        return host
+        server_info = ServerInfoResponse.parse(StaticRequestService.get_static_server_info(host_ip))
+
+        return StaticRequestService.build_host_details(server_info)
 
     @staticmethod
-    def open_static_http_connection(url, content_only=True):
-        response = requests.get(url, timeout=(3, 5))
+    def open_static_http_connection(url, content_only=True, timeout=(3, 5)):
+        response = requests.get(url, timeout=timeout)
 
         if content_only:
             return response.content
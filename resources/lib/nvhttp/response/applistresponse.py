@@ -0,0 +1,65 @@
+from cStringIO import StringIO
+
+try:
+    import xml.etree.cElementTree as ETree
+except ImportError:
+    import xml.etree.ElementTree as ETree
+
+from resources.lib.model.nvapp import NvApp
+from resources.lib.nvhttp.response.nvhttpresponse import NvHttpResponse, XML_DECLARATION, decode_xml
+
+
+class AppListParser(object):
+    """
+    Streams the apps out of an applist body. Each <App> is turned into an NvApp as soon as it is closed and dropped
+    from the tree, so large libraries are never held as a whole tree.
+    """
+    FIELDS = {
+        'AppInstallPath': 'install_path',
+        'Distributor': 'distributor',
+        'ID': 'id',
+        'MaxControllersForSingleSession': 'max_controllers',
+        'ShortName': 'short_name'
+    }
+
+    def __init__(self, content):
+        if not content:
+            raise ValueError("Empty response")
+        self.content = content
+        self.root = None
+
+    def __iter__(self):
+        source = StringIO(XML_DECLARATION.sub('', decode_xml(self.content), 1).encode('utf-8'))
+        try:
+            for event, element in ETree.iterparse(source, events=('start', 'end')):
+                if event == 'start':
+                    if self.root is None:
+                        self.root = element
+                elif element.tag == 'App':
+                    yield self._to_nvapp(element)
+                    self.root.remove(element)
+        except (ETree.ParseError, SyntaxError) as e:
+            raise ValueError("Building ETree failed: %s" % e)
+
+    def _to_nvapp(self, app):
+        nvapp = NvApp()
+        for element in app:
+            if element.tag == 'AppTitle':
+                nvapp.title = (element.text or '').encode('UTF-8')
+            elif element.tag in self.FIELDS:
+                setattr(nvapp, self.FIELDS[element.tag], element.text)
+
+        return nvapp
+
+
+class AppListResponse(NvHttpResponse):
+    def __init__(self, root, apps):
+        super(AppListResponse, self).__init__(root)
+        self.apps = apps
+
+    @classmethod
+    def parse(cls, content):
+        parser = AppListParser(content)
+        apps = list(parser)
+
+        return cls(parser.root, apps)
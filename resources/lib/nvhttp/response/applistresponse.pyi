@@ -0,0 +1,19 @@
+from typing import AnyStr, Dict, Iterator, List
+from xml.etree.ElementTree import Element
+
+from resources.lib.model.nvapp import NvApp
+from resources.lib.nvhttp.response.nvhttpresponse import NvHttpResponse
+
+
+class AppListParser(object):
+    FIELDS = ... # type: Dict[str, str]
+    content = ... # type: AnyStr
+    root = ... # type: Element
+    def __init__(self, content: AnyStr) -> None: ...
+    def __iter__(self) -> Iterator[NvApp]: ...
+
+class AppListResponse(NvHttpResponse):
+    apps = ... # type: List[NvApp]
+    def __init__(self, root: Element, apps: List[NvApp]) -> None: ...
+    @classmethod
+    def parse(cls, content: AnyStr) -> AppListResponse: ...
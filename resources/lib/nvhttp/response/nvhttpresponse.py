@@ -0,0 +1,63 @@
+import codecs
+import re
+import xml.etree.ElementTree as ETree
+
+XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+
+def decode_xml(content):
+    """
+    Decodes an NvHTTP XML body in one pass. The encoding is taken from the bytes themselves (byte order mark or NUL
+    bytes of UTF-16), not from the declaration, which GFE sets to UTF-16 for bodies which are actually UTF-8.
+    :rtype: unicode
+    """
+    if isinstance(content, unicode):
+        return content
+    if content.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return content.decode('utf-16')
+    if content.startswith(codecs.BOM_UTF8):
+        return content[len(codecs.BOM_UTF8):].decode('utf-8', 'replace')
+    if content[:1] == '\0' or content[1:2] == '\0':
+        return content.decode('utf-16-be' if content[:1] == '\0' else 'utf-16-le')
+
+    return content.decode('utf-8', 'replace')
+
+
+def parse_xml(content):
+    """
+    Parses an NvHTTP XML body into its root element
+    :rtype: ETree.Element
+    """
+    if not content:
+        raise ValueError("Empty response")
+    try:
+        return ETree.fromstring(XML_DECLARATION.sub('', decode_xml(content), 1).encode('utf-8'))
+    except ETree.ParseError as e:
+        raise ValueError("Building ETree failed: %s" % e)
+
+
+class NvHttpResponse(object):
+    """An NvHTTP XML response, parsed once. Fields are read from the parsed tree."""
+    def __init__(self, root):
+        self.root = root
+        self.status_code = int(root.get('status_code', 200))
+        self.status_message = root.get('status_message', '')
+
+    @classmethod
+    def parse(cls, content):
+        return cls(parse_xml(content))
+
+    def get(self, tag, default=''):
+        """
+        Returns the text of the child element tag, default if there is none
+        :rtype: str
+        """
+        element = self.root.find(tag)
+        if element is None:
+            return default
+
+        return element.text if element.text is not None else ''
+
+    def verify_status(self):
+        if self.status_code != 200:
+            raise AssertionError('%s %s' % (self.status_code, self.status_message))
@@ -0,0 +1,17 @@
+from typing import Any, AnyStr, Pattern
+from xml.etree.ElementTree import Element
+
+XML_DECLARATION = ... # type: Pattern
+
+def decode_xml(content: AnyStr) -> unicode: ...
+def parse_xml(content: AnyStr) -> Element: ...
+
+class NvHttpResponse(object):
+    root = ... # type: Element
+    status_code = ... # type: int
+    status_message = ... # type: str
+    def __init__(self, root: Element) -> None: ...
+    @classmethod
+    def parse(cls, content: AnyStr) -> Any: ...
+    def get(self, tag: str, default: str = ...) -> str: ...
+    def verify_status(self) -> None: ...
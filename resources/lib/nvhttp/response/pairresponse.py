@@ -0,0 +1,20 @@
+from resources.lib.nvhttp.response.nvhttpresponse import NvHttpResponse
+
+
+class PairResponse(NvHttpResponse):
+    """The answer to one step of the pairing handshake"""
+    @property
+    def paired(self):
+        return self.get('paired') == '1'
+
+    @property
+    def plain_cert(self):
+        return self.get('plaincert')
+
+    @property
+    def challenge_response(self):
+        return self.get('challengeresponse')
+
+    @property
+    def pairing_secret(self):
+        return self.get('pairingsecret')
@@ -0,0 +1,8 @@
+from resources.lib.nvhttp.response.nvhttpresponse import NvHttpResponse
+
+
+class PairResponse(NvHttpResponse):
+    paired = ... # type: bool
+    plain_cert = ... # type: str
+    challenge_response = ... # type: str
+    pairing_secret = ... # type: str
@@ -0,0 +1,60 @@
+from resources.lib.nvhttp.response.nvhttpresponse import NvHttpResponse
+
+
+class ServerInfoResponse(NvHttpResponse):
+    @property
+    def hostname(self):
+        return self.get('hostname')
+
+    @property
+    def unique_id(self):
+        return self.get('uniqueid')
+
+    @property
+    def mac_address(self):
+        return self.get('mac')
+
+    @property
+    def local_ip(self):
+        return self.get('LocalIP')
+
+    @property
+    def external_ip(self):
+        return self.get('ExternalIP')
+
+    @property
+    def pair_status(self):
+        return int(self.get('PairStatus') or 0)
+
+    @property
+    def gpu_type(self):
+        return self.get('gputype')
+
+    @property
+    def gamelist_id(self):
+        """
+        :return: None if the host didn't send a gamelistid
+        """
+        return self.get('gamelistid') or None
+
+    @property
+    def server_version(self):
+        return self.get('appversion')
+
+    @property
+    def server_major_version(self):
+        return int(self.server_version[:1])
+
+    @property
+    def state(self):
+        return self.get('state')
+
+    @property
+    def current_game(self):
+        """
+        :return: id of the running game, 0 if the host is idle
+        """
+        if self.state and not self.state.endswith('_SERVER_AVAILABLE'):
+            return int(self.get('currentgame') or 0)
+
+        return 0
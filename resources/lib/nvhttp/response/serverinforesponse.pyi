@@ -0,0 +1,16 @@
+from resources.lib.nvhttp.response.nvhttpresponse import NvHttpResponse
+
+
+class ServerInfoResponse(NvHttpResponse):
+    hostname = ... # type: str
+    unique_id = ... # type: str
+    mac_address = ... # type: str
+    local_ip = ... # type: str
+    external_ip = ... # type: str
+    pair_status = ... # type: int
+    gpu_type = ... # type: str
+    gamelist_id = ... # type: str
+    server_version = ... # type: str
+    server_major_version = ... # type: int
+    state = ... # type: str
+    current_game = ... # type: int
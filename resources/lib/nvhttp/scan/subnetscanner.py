@@ -0,0 +1,143 @@
+import Queue
+import socket
+import struct
+import threading
+import time
+
+import requests
+
+from resources.lib.model.mdnscomputer import MdnsComputer
+from resources.lib.nvhttp.request.staticrequestservice import StaticRequestService
+from resources.lib.nvhttp.response.serverinforesponse import ServerInfoResponse
+
+
+class SubnetScanner(object):
+    """
+    Finds GameStream hosts without multicast by probing every address of a network for the NvHTTP port.
+
+    At most max_sockets probes are open at the same time. A probe is a TCP connect with a short timeout and, if the
+    port is open, a /serverinfo request. The scan ends at the global deadline, whatever is still running by then is
+    left behind.
+    """
+    service_type = 'subnet-scan'
+    MAX_ADDRESSES = 4096
+
+    def __init__(self, logger, max_sockets=64, deadline=3, probe_timeout=0.5, port=StaticRequestService.HTTP_PORT):
+        self.logger = logger
+        self.max_sockets = max_sockets
+        self.deadline = deadline
+        self.probe_timeout = probe_timeout
+        self.port = port
+        self.available_hosts = {}
+        self._lock = threading.Lock()
+
+    def scan(self, network=None, first_only=False):
+        """
+        Probes all addresses of network, the local /24 if none is given
+        :param network: CIDR notation, e.g. 192.168.1.0/24
+        :param first_only: stop as soon as one host answered
+        :rtype: dict
+        :return: {host uuid: HostDetails}
+        """
+        network = network or self.get_local_network()
+        addresses = self.get_addresses(network)
+        self.logger.info("Scanning %s addresses of %s for port %s" % (len(addresses), network, self.port))
+
+        queue = Queue.Queue()
+        for address in addresses:
+            queue.put(address)
+        self.available_hosts = {}
+        host_details = {}
+        found = threading.Event()
+        deadline = time.time() + self.deadline
+
+        def work():
+            while time.time() < deadline and not (first_only and found.is_set()):
+                try:
+                    address = queue.get_nowait()
+                except Queue.Empty:
+                    return
+                host = self.probe(address, deadline)
+                if host is not None:
+                    with self._lock:
+                        host_details[host.uuid] = host
+                        self.available_hosts[host.name] = MdnsComputer(self.service_type, host.name, address, self.port,
+                                                                       host.name)
+                    found.set()
+
+        workers = [threading.Thread(target=work) for _ in range(min(self.max_sockets, len(addresses)))]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+        for worker in workers:
+            worker.join(max(0, deadline - time.time()))
+
+        with self._lock:
+            self.logger.info("Subnet scan found %s hosts" % len(host_details))
+            return dict(host_details)
+
+    def probe(self, address, deadline):
+        """
+        :rtype: HostDetails
+        :return: the details of the host at address or None if there is no GameStream host
+        """
+        timeout = min(self.probe_timeout, max(0.01, deadline - time.time()))
+        try:
+            socket.create_connection((address, self.port), timeout).close()
+        except (socket.error, socket.timeout):
+            return None
+
+        try:
+            response = requests.get('http://%s:%s/serverinfo?%s' % (address, self.port,
+                                                                    StaticRequestService.build_static_uid_uuid_string()),
+                                    timeout=(timeout, max(timeout, deadline - time.time())))
+            server_info = ServerInfoResponse.parse(response.content)
+            server_info.verify_status()
+            if not server_info.unique_id:
+                return None
+        except (IOError, ValueError, AssertionError) as e:
+            self.logger.info("%s has port %s open, but isn't a GameStream host: %s" % (address, self.port, e))
+            return None
+
+        return StaticRequestService.build_host_details(server_info)
+
+    @staticmethod
+    def get_local_network():
+        """
+        Returns the /24 of the address the default route goes out of
+        :rtype: str
+        """
+        probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            # nothing is sent, connecting only picks the outgoing interface
+            probe.connect(('10.255.255.255', 1))
+            address = probe.getsockname()[0]
+        finally:
+            probe.close()
+
+        return '%s.0/24' % address.rsplit('.', 1)[0]
+
+    @classmethod
+    def get_addresses(cls, network):
+        """
+        Returns the host addresses of an IPv4 network in CIDR notation, without network and broadcast address
+        :rtype: list
+        """
+        try:
+            address, prefix = network.split('/') if '/' in network else (network, '32')
+            prefix = int(prefix)
+            base = struct.unpack('!I', socket.inet_aton(address))[0]
+        except (ValueError, socket.error):
+            raise ValueError("'%s' is no IPv4 network" % network)
+        if not 0 <= prefix <= 32:
+            raise ValueError("'%s' is no IPv4 network" % network)
+
+        size = 1 << (32 - prefix)
+        if size > cls.MAX_ADDRESSES:
+            raise ValueError("'%s' has more than %s addresses" % (network, cls.MAX_ADDRESSES))
+        first = base & ~(size - 1) & 0xFFFFFFFF
+        numbers = range(first, first + size)
+        if size > 2:
+            numbers = numbers[1:-1]
+
+        return [socket.inet_ntoa(struct.pack('!I', number)) for number in numbers]
@@ -0,0 +1,23 @@
+from typing import Dict, List, Optional
+
+from resources.lib.core.logger import Logger
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.model.mdnscomputer import MdnsComputer
+
+
+class SubnetScanner(object):
+    service_type = ... # type: str
+    MAX_ADDRESSES = ... # type: int
+    logger = ... # type: Logger
+    max_sockets = ... # type: int
+    deadline = ... # type: float
+    probe_timeout = ... # type: float
+    port = ... # type: int
+    available_hosts = ... # type: Dict[str, MdnsComputer]
+    def __init__(self, logger: Logger, max_sockets: int = ..., deadline: float = ..., probe_timeout: float = ..., port: int = ...) -> None: ...
+    def scan(self, network: str = None, first_only: bool = False) -> Dict[str, HostDetails]: ...
+    def probe(self, address: str, deadline: float) -> Optional[HostDetails]: ...
+    @staticmethod
+    def get_local_network() -> str: ...
+    @classmethod
+    def get_addresses(cls, network: str) -> List[str]: ...
@@ -1,59 +1,266 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from resources.lib.model.game import Game
+from resources.lib.model.versionedmodel import pop_migration_report
+from resources.lib.storageengine.storage import TimedStorage
+
+
 class GameRepository(object):
+    """
+    Games are stored in one shard per host (game_storage.<host uuid>), which is only loaded once a host's games are
+    requested, so syncing one host never touches the library of another one.
+
+    Mutations inside ``with repository.batch():`` are synced once when the block ends and rolled back if it raises.
+    Outside of a batch, flushes are coalesced into one sync per shard every storage_flush_delay seconds, if set.
+
+    The Game.version a shard was last written with is kept in game_version. Shards written with an older version are
+    migrated and rewritten once when they are loaded.
+
+    The gamelistid a host's games were last synced for is kept in game_sync and forgotten as soon as games are
+    removed from the host other than by a sync.
+    """
+    LEGACY_STORAGE = 'game_storage'
+    SHARD_PREFIX = 'game_storage.'
+    VERSION_STORAGE = 'game_version'
+    SYNC_STORAGE = 'game_sync'
+    _MISSING = object()
+
     def __init__(self, core, logger):
-        self.storage = core.get_storage('game_storage')
+        self.core = core
         self.logger = logger
+        self.backend = core.get_setting('game_storage_backend', str) or 'pickle'
+        self.flush_delay = int(core.get_setting('storage_flush_delay', str) or 0)
+        self.shards = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._pending_flush = {}
+        self._flush_timer = None
+        self.version_storage = core.get_storage(self.VERSION_STORAGE)
+        self.sync_storage = core.get_storage(self.SYNC_STORAGE)
+        self._migrate_legacy_storage()
 
     def get_games(self, host):
-        if host.uuid in self.storage.keys():
-            return self.storage[host.uuid]
-        else:
-            # Host isn't present yet, possibly new one
-            return {}
+        with self._lock:
+            return dict(self._get_shard(host.uuid).items())
+
+    def count_games(self, host):
+        return len(self._get_shard(host.uuid))
 
     def add_game(self, host, game, flush=True):
         if game.host_uuid == '' or game.host_uuid is None:
             game.host_uuid = host.uuid
 
-        if host.uuid not in self.storage.keys():
-            self.storage[host.uuid] = {}
-
-        self.storage[host.uuid][game.id] = game
+        with self._lock:
+            shard = self._get_shard(host.uuid)
+            self._record_undo(host.uuid, shard, game.id)
+            shard[game.id] = game
 
         if flush:
-            self.storage.sync()
+            self._flush(host.uuid)
+
+    def add_games(self, host, games):
+        with self.batch():
+            for game in games:
+                self.add_game(host, game, False)
 
     def remove_game(self, host, game, flush=True):
         self.remove_game_by_id(host, game.id, flush)
 
     def remove_games(self, host, flush=True):
-        if host.uuid in self.storage.keys():
-            del self.storage[host.uuid]
+        self._forget_synced_gamelist_id(host.uuid)
+        if self._current_batch() is None:
+            with self._lock:
+                self._get_shard(host.uuid).clear()
+        else:
+            self.remove_games_by_id(host, list(self._get_shard(host.uuid)))
+
+    def remove_game_by_id(self, host, id, flush=True):
+        with self._lock:
+            shard = self._get_shard(host.uuid)
+            if id not in shard:
+                return
+            self._record_undo(host.uuid, shard, id)
+            del shard[id]
+        self._forget_synced_gamelist_id(host.uuid)
 
         if flush:
-            self.storage.sync()
+            self._flush(host.uuid)
 
-    def remove_game_by_id(self, host, id, flush=True):
-        if host.uuid in self.storage.keys():
-            if id in self.storage[host.uuid].keys():
-                del self.storage[host.uuid][id]
-                if flush:
-                    self.storage.sync()
+    def remove_games_by_id(self, host, ids):
+        with self.batch():
+            for id in ids:
+                self.remove_game_by_id(host, id, False)
+
+    @contextmanager
+    def batch(self):
+        if self._current_batch() is not None:
+            yield self
+            return
+
+        self._local.batch = ({}, {})
+        try:
+            yield self
+        except Exception:
+            shards, undo = self._local.batch
+            self._local.batch = None
+            self.logger.info('Batch aborted, rolling back %s changes' % len(undo))
+            with self._lock:
+                for (host_uuid, id), previous in undo.iteritems():
+                    if previous is self._MISSING:
+                        shards[host_uuid].pop(id, None)
+                    else:
+                        shards[host_uuid][id] = previous
+            raise
+        else:
+            shards, undo = self._local.batch
+            self._local.batch = None
+            with self._lock:
+                for host_uuid, shard in shards.iteritems():
+                    self._pending_flush.pop(host_uuid, None)
+                    shard.sync()
+
+    def flush(self):
+        """Syncs all shards with pending delayed flushes"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            pending, self._pending_flush = self._pending_flush, {}
+            for shard in pending.itervalues():
+                shard.sync()
+
+    def get_synced_gamelist_id(self, host):
+        """
+        Returns the gamelistid of the host's game list the stored games were last synced with, if any
+        :rtype: str
+        """
+        return self.sync_storage.get(host.uuid)
+
+    def set_synced_gamelist_id(self, host, gamelist_id):
+        """
+        Remembers the gamelistid the stored games were synced with, an empty or missing id is never remembered as
+        it wouldn't change when the games on the host do
+        """
+        if not gamelist_id:
+            self._forget_synced_gamelist_id(host.uuid)
+            return
+        self.sync_storage[host.uuid] = gamelist_id
+        self.sync_storage.sync()
 
     def get_game_by_id(self, host, id):
         self.logger.info('Trying to load game by id ...')
 
-        if host.uuid in self.storage.keys():
-            if id in self.storage[host.uuid].keys():
-                self.logger.info('Found game by Host / ID combination: %s -> %s' % (host.uuid, id))
-                return self.storage[host.uuid][id]
-            else:
-                self.logger.info('Game ID is not known for host: %s -> %s' % (id, host.uuid))
+        shard = self._get_shard(host.uuid)
+        if id in shard:
+            self.logger.info('Found game by Host / ID combination: %s -> %s' % (host.uuid, id))
+            return shard[id]
         else:
-            self.logger.info('Host ID is not known: %s' % host.uuid)
+            self.logger.info('Game ID is not known for host: %s -> %s' % (id, host.uuid))
 
         return None
 
     def clear(self):
         self.logger.info('Clearing game_storage')
-        self.storage.clear()
-        self.storage.sync()
+        for host_uuid in self._stored_host_uuids() | set(self.shards.keys()):
+            self._get_shard(host_uuid).clear()
+        self.sync_storage.clear()
+        self.sync_storage.sync()
+
+    def _forget_synced_gamelist_id(self, host_uuid):
+        if host_uuid in self.sync_storage:
+            del self.sync_storage[host_uuid]
+            self.sync_storage.sync()
+
+    def _current_batch(self):
+        return getattr(self._local, 'batch', None)
+
+    def _record_undo(self, host_uuid, shard, id):
+        batch = self._current_batch()
+        if batch is None:
+            return
+        shards, undo = batch
+        shards[host_uuid] = shard
+        if (host_uuid, id) not in undo:
+            undo[(host_uuid, id)] = shard.get(id, self._MISSING)
+
+    def _flush(self, host_uuid):
+        batch = self._current_batch()
+        if batch is not None:
+            return
+
+        with self._lock:
+            if self.flush_delay <= 0:
+                self._get_shard(host_uuid).sync()
+                return
+            self._pending_flush[host_uuid] = self._get_shard(host_uuid)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _get_shard(self, host_uuid):
+        with self._lock:
+            try:
+                return self.shards[host_uuid]
+            except KeyError:
+                self.logger.info('Loading game shard for host: %s' % host_uuid)
+                shard = self.core.get_storage(self.SHARD_PREFIX + host_uuid, journal=True, backend=self.backend,
+                                              lazy=True)
+                self.shards[host_uuid] = shard
+                self._migrate_shard(host_uuid, shard)
+                return shard
+
+    def _migrate_shard(self, host_uuid, shard):
+        # game_version used to hold one global version before storage was sharded
+        stored_version = self.version_storage.get(host_uuid, self.version_storage.get('version'))
+        if stored_version == Game.version:
+            return
+
+        if len(shard) > 0:
+            start = time.time()
+            for id in list(shard):
+                # unpickling runs the migrations, assigning marks the game for rewriting
+                shard[id] = shard[id]
+            shard.compact()
+            migrated, migration_time = pop_migration_report(Game)
+            self.logger.info('Migrated %s of %s games for host %s to version %s in %.3fs (%.3fs in migrations)' % (
+                migrated, len(shard), host_uuid, Game.version, time.time() - start, migration_time))
+
+        self.version_storage[host_uuid] = Game.version
+        self.version_storage.sync()
+
+    def _stored_host_uuids(self):
+        host_uuids = set()
+        for file_name in os.listdir(self.core.storage_path):
+            if file_name.startswith(self.SHARD_PREFIX):
+                # strips journal, temp and database suffixes
+                host_uuids.add(file_name[len(self.SHARD_PREFIX):].split('.')[0])
+
+        return host_uuids
+
+    def _migrate_legacy_storage(self):
+        filename = os.path.join(self.core.storage_path, self.LEGACY_STORAGE)
+        journal_filename = filename + TimedStorage.JOURNAL_SUFFIX
+        if not os.path.exists(filename) and not os.path.exists(journal_filename):
+            return
+
+        self.logger.info('Migrating %s to per host shards' % self.LEGACY_STORAGE)
+        try:
+            legacy_storage = TimedStorage(filename, journal=True)
+        except ValueError:
+            self.logger.info('Legacy %s is corrupted, skipping migration' % self.LEGACY_STORAGE)
+            return
+
+        for host_uuid, games in legacy_storage.items():
+            shard = self._get_shard(host_uuid)
+            for id, game in games.iteritems():
+                shard[id] = game
+            shard.compact()
+            self.logger.info('Migrated %s games for host: %s' % (len(games), host_uuid))
+
+        for path in (filename, journal_filename):
+            if os.path.exists(path):
+                os.remove(path)
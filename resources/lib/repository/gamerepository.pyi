@@ -2,22 +2,48 @@
 #
 # NOTE: This dynamically typed stub was automatically generated by stubgen.
 
-from typing import Any, Dict, AnyStr
+from typing import Any, Dict, AnyStr, Set, Union, List, Tuple, ContextManager
 
 from resources.lib.core.corefunctions import Core
 from resources.lib.core.logger import Logger
 from resources.lib.model.game import Game
 from resources.lib.model.hostdetails import HostDetails
+from resources.lib.storageengine.sqlitestorage import SqliteStorage
 from resources.lib.storageengine.storage import TimedStorage
 
 
 class GameRepository:
-    storage = ... # type: TimedStorage
+    LEGACY_STORAGE = ... # type: str
+    SHARD_PREFIX = ... # type: str
+    VERSION_STORAGE = ... # type: str
+    SYNC_STORAGE = ... # type: str
+    core = ... # type: Core
     logger = ... # type: Logger
-    def __init__(self, core:Core): ...
+    backend = ... # type: str
+    flush_delay = ... # type: int
+    shards = ... # type: Dict[str, Union[TimedStorage, SqliteStorage]]
+    version_storage = ... # type: TimedStorage
+    sync_storage = ... # type: TimedStorage
+    def __init__(self, core:Core, logger:Logger): ...
     def get_games(self, host:HostDetails) -> Dict(Game): ...
+    def count_games(self, host:HostDetails) -> int: ...
     def add_game(self, host:HostDetails, game:Game, flush=True): ...
+    def add_games(self, host:HostDetails, games:List[Game]): ...
     def remove_game(self, host:HostDetails, game:Game, flush=True): ...
     def remove_games(self, host:HostDetails, flush=True): ...
     def remove_game_by_id(self, host:HostDetails, id:AnyStr, flush=True): ...
+    def remove_games_by_id(self, host:HostDetails, ids:List[AnyStr]): ...
+    def batch(self) -> ContextManager[GameRepository]: ...
+    def flush(self) -> None: ...
+    def get_synced_gamelist_id(self, host:HostDetails) -> Union[str, None]: ...
+    def set_synced_gamelist_id(self, host:HostDetails, gamelist_id:Union[str, None]) -> None: ...
     def get_game_by_id(self, host:HostDetails, id:AnyStr) -> Game: ...
+    def clear(self) -> None: ...
+    def _forget_synced_gamelist_id(self, host_uuid:str) -> None: ...
+    def _current_batch(self) -> Tuple[Dict, Dict]: ...
+    def _record_undo(self, host_uuid:str, shard, id:AnyStr) -> None: ...
+    def _flush(self, host_uuid:str) -> None: ...
+    def _get_shard(self, host_uuid:str) -> Union[TimedStorage, SqliteStorage]: ...
+    def _migrate_shard(self, host_uuid:str, shard:Union[TimedStorage, SqliteStorage]) -> None: ...
+    def _stored_host_uuids(self) -> Set[str]: ...
+    def _migrate_legacy_storage(self) -> None: ...
@@ -1,7 +1,19 @@
+import time
+
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.model.versionedmodel import pop_migration_report
+
+
 class HostRepository(object):
     def __init__(self, core, logger):
+        start = time.time()
         self.storage = core.get_storage('host')
         self.logger = logger
+        migrated, migration_time = pop_migration_report(HostDetails)
+        if migrated > 0:
+            self.storage.sync()
+            self.logger.info('Migrated %s hosts to version %s in %.3fs (%.3fs in migrations)' % (
+                migrated, HostDetails.version, time.time() - start, migration_time))
 
     def get_hosts(self):
         return self.storage
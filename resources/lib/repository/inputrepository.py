@@ -1,7 +1,19 @@
+import time
+
+from resources.lib.model.inputdevice import InputDevice
+from resources.lib.model.versionedmodel import pop_migration_report
+
+
 class InputRepository(object):
     def __init__(self, core, logger):
+        start = time.time()
         self.storage = core.get_storage('input_storage')
         self.logger = logger
+        migrated, migration_time = pop_migration_report(InputDevice)
+        if migrated > 0:
+            self.storage.sync()
+            self.logger.info('Migrated %s input devices to version %s in %.3fs (%.3fs in migrations)' % (
+                migrated, InputDevice.version, time.time() - start, migration_time))
 
     def get_input_devices(self):
         return dict((key, value[0]) for (key, value) in self.storage.raw_dict().iteritems())
@@ -1,14 +1,20 @@
+import errno
 import os
-import subprocess
 
 from abc import ABCMeta, abstractmethod, abstractproperty
 
 
 class AbstractScraper:
     __metaclass__ = ABCMeta
+    # calls of this scraper which may run at the same time
+    max_concurrency = 2
+    # titles this scraper found nothing for are not asked for again until the negative cache expires
+    cache_misses = True
 
-    def __init__(self, core):
+    def __init__(self, core, download_service=None, response_cache_service=None):
         self.core = core
+        self.download_service = download_service
+        self.response_cache_service = response_cache_service
         self.base_path = self.core.storage_path
 
     @abstractproperty
@@ -26,6 +32,8 @@ class AbstractScraper:
         Queries game information from API and returns it as a dict
         :type nvapp: NvApp
         :rtype: dict
+        :raises Exception: if the API couldn't be reached or its response couldn't be parsed. Only an empty response
+                           is remembered as a title the scraper has nothing for.
         """
         pass
 
@@ -41,26 +49,37 @@ class AbstractScraper:
     def is_enabled(self):
         pass
 
+    def refresh_images(self, nvapp):
+        """
+        Fetches the images of a game which was scraped before again, for scrapers whose source may change them
+        :type nvapp: NvApp
+        :rtype: dict
+        :return: {old path: new path} of the images which changed
+        """
+        return {}
+
     @staticmethod
     def _set_up_path(path):
         if not os.path.exists(path):
-            os.makedirs(path)
+            try:
+                os.makedirs(path)
+            except OSError as e:
+                # created by another scraper running in parallel
+                if e.errno != errno.EEXIST:
+                    raise
 
         return path
 
-    @staticmethod
-    def _dump_image(base_path, url):
-        if url != 'N/A':
-            file_path = os.path.join(base_path, os.path.basename(url))
-            if not os.path.exists(file_path):
-                if not os.path.exists(os.path.dirname(file_path)):
-                    os.makedirs(os.path.dirname(file_path))
-                with open(file_path, 'wb') as img:
-                    curl = subprocess.Popen(['curl', '-XGET', url], stdout=subprocess.PIPE)
-                    img.write(curl.stdout.read())
-                    img.close()
+    def _dump_image(self, base_path, url):
+        return self._dump_images(base_path, [url])[0]
 
-            return file_path
-        else:
+    def _dump_images(self, base_path, urls):
+        """
+        Downloads all urls into base_path in parallel
+        :rtype: list
+        :return: the local file paths in the order of urls, None for urls which failed or are 'N/A'
+        """
+        downloads = [(url, os.path.join(base_path, os.path.basename(url))) for url in urls if url != 'N/A']
+        file_paths = dict(zip([url for url, _ in downloads], self.download_service.download_all(downloads)))
 
-            return None
+        return [file_paths.get(url) for url in urls]
@@ -1,7 +1,5 @@
 import ConfigParser
-import json
 import os
-import urllib2
 import dateutil.parser as date_parser
 
 try:
@@ -14,19 +12,18 @@ from resources.lib.model.apiresponse import ApiResponse
 
 
 class IgdbScraper(AbstractScraper):
-    def __init__(self, core):
-        AbstractScraper.__init__(self, core)
+    def __init__(self, core, download_service, response_cache_service):
+        AbstractScraper.__init__(self, core, download_service, response_cache_service)
         self.api_url = 'https://www.igdb.com/api/v1/games/%s'
         self.api_img_url = 'https://res.cloudinary.com/igdb/image/upload/t_%s/%s.jpg'
         self.cover_cache = self._set_up_path(os.path.join(self.base_path, 'art/poster/'))
-        self.api_cache = self._set_up_path(os.path.join(self.base_path, 'api_cache/'))
 
     def name(self):
         return 'IGDB'
 
     def get_game_information(self, nvapp):
         if self.core.get_setting('api_key_file', str) == "":
-            return ApiResponse()
+            raise ValueError("No API key file configured for %s" % self.name())
 
         request_name = nvapp.title.replace(" ", "+").replace(":", "")
         response = self._gather_information(nvapp, request_name)
@@ -35,16 +32,13 @@ class IgdbScraper(AbstractScraper):
         return response
 
     def return_paths(self):
-        return [self.cover_cache, self.api_cache]
+        return [self.cover_cache]
 
     def is_enabled(self):
         return self.core.get_setting('enable_igdb', bool)
 
     def _gather_information(self, nvapp, game):
         game_cover_path = self._set_up_path(os.path.join(self.cover_cache, nvapp.id))
-        game_cache_path = self._set_up_path(os.path.join(self.api_cache, nvapp.id))
-
-        file_path = os.path.join(game_cache_path, game+'.json')
 
         try:
             cp = ConfigParser.ConfigParser()
@@ -55,35 +49,20 @@ class IgdbScraper(AbstractScraper):
                 self.core.string('name'),
                 self.core.string('scraper_failed') % (game, self.name())
             )
-            return ApiResponse()
+            raise ValueError("Reading the API key of %s failed" % self.name())
 
-        url_opener = urllib2.build_opener()
-        url_opener.addheaders = [
-            ('Accept', 'application/json'),
-            ('Authorization', 'Token token=%s' % igdb_api_key)
-        ]
-
-        if not os.path.isfile(file_path):
-            query_string = 'search?q=%s' % game
-            response = url_opener.open(self.api_url % query_string)
-            if response.getcode() in [200, 304]:
-                search_results = json.load(url_opener.open(self.api_url % query_string))
-                print search_results
-                if len(search_results) > 0:
-                    best_match_id = search_results['games'][0]['id']
-                else:
-                    return None
-            else:
-                raise IOError("Server failed with status code %s" % response.getcode())
-        else:
-            best_match_id = None
+        headers = {
+            'Accept': 'application/json',
+            'Authorization': 'Token token=%s' % igdb_api_key
+        }
 
-        try:
-            json_data = json.load(open(self._get_json_data(url_opener, game_cache_path, game, best_match_id)))
-        except IOError:
-            return None
+        search_results = self._get_json_data(nvapp, 'search?q=%s' % game, headers)
+        if len(search_results) > 0:
+            best_match_id = search_results['games'][0]['id']
+        else:
+            return ApiResponse()
 
-        json_data = json_data['game']
+        json_data = self._get_json_data(nvapp, best_match_id, headers)['game']
 
         api_response = ApiResponse()
         api_response.year = date_parser.parse(json_data['release_date']).year
@@ -99,17 +78,10 @@ class IgdbScraper(AbstractScraper):
 
         return api_response
 
-    def _get_json_data(self, url_opener, path, game, best_match_id):
-        file_path = os.path.join(path, game+'_igdb.json')
-        if not os.path.exists(file_path) and best_match_id is not None:
-            if not os.path.exists(os.path.dirname(file_path)):
-                os.makedirs(os.path.dirname(file_path))
-            response = url_opener.open(self.api_url % best_match_id)
-            if response.getcode() in [200, 304]:
-                json_response = json.load(response)
-                with open(file_path, 'w') as response_file:
-                    json.dump(json_response, response_file)
-            else:
-                raise IOError("Server failed with status code %s" % response.get())
-
-        return file_path
+    def _get_json_data(self, nvapp, query, headers):
+        response = self.response_cache_service.get(self.api_url % query, headers=headers, scraper=self.name(),
+                                                   game_id=nvapp.id)
+        if response.status_code != 200:
+            raise IOError("Server failed with status code %s" % response.status_code)
+
+        return response.json()
@@ -1,14 +1,33 @@
 import os
+import shutil
+import threading
 
 from resources.lib.model.apiresponse import ApiResponse
+from resources.lib.nvhttp.request.requestservice import RequestService
 from resources.lib.scraper.abcscraper import AbstractScraper
 
 
 class NvHTTPScraper(AbstractScraper):
+    """
+    Fetches box art from the host, streamed to disk over the host's pooled connections.
+
+    Every stored image has a fingerprint of its sha1 and the gamelistid of the host at the time it was fetched. As
+    long as the gamelistid doesn't change the image isn't asked for again. After it changed, the image is fetched and
+    only replaces the stored one if its hash differs. Images are named by their hash, so a replaced image has a new
+    path which :meth:`refresh_images` reports for the games which are already stored.
+    """
+    # box art comes from the host, which is cheap to ask and may have it next time
+    cache_misses = False
+    # one request per pooled connection of the host
+    max_concurrency = RequestService.POOL_SIZE
+    FINGERPRINT_STORAGE = 'box_art_fingerprints'
+
     def __init__(self, core, request_service):
         AbstractScraper.__init__(self, core)
         self.cover_cache = self._set_up_path(os.path.join(self.base_path, 'art/poster/'))
         self.request_service = request_service
+        self.fingerprints = core.get_storage(self.FINGERPRINT_STORAGE, journal=True)
+        self._lock = threading.Lock()
 
     def name(self):
         return 'NvHTTP'
@@ -20,24 +39,73 @@ class NvHTTPScraper(AbstractScraper):
         return True
 
     def get_game_information(self, nvapp):
-        game_cover_path = self._set_up_path(os.path.join(self.cover_cache, nvapp.id))
         response = ApiResponse()
         response.name = nvapp.title
-        raw_box_art = self.request_service.get_box_art(nvapp.id)
+        cover_path = self._fetch_box_art(nvapp)
 
-        if raw_box_art:
-            cover_path = self._dump_image_from_data(game_cover_path, nvapp.id, raw_box_art)
+        if cover_path is not None:
             response.posters.append(cover_path)
 
         return response
 
-    def _dump_image_from_data(self, base_path, id, data):
-        file_path = os.path.join(base_path, id + '.png')
-        if not os.path.exists(file_path):
-            if not os.path.exists(os.path.dirname(file_path)):
-                os.makedirs(os.path.dirname(file_path))
-            with open(file_path, 'wb') as img:
-                img.write(data)
-                img.close()
+    def refresh_images(self, nvapp):
+        """
+        Fetches the box art of a game which was scraped before, unless the host's game list is still the one it was
+        fetched under
+        :rtype: dict
+        :return: {old path: new path} if the image changed
+        """
+        old_path = self._get_box_art_path(nvapp, self._get_fingerprint(nvapp))
+        if not os.path.exists(old_path):
+            return {}
+        new_path = self._fetch_box_art(nvapp)
+        if new_path is None or new_path == old_path:
+            return {}
+
+        return {old_path: new_path}
+
+    def _fetch_box_art(self, nvapp):
+        server_info = self.request_service.get_server_info()
+        key = self._get_fingerprint_key(server_info, nvapp)
+        with self._lock:
+            fingerprint = self.fingerprints.get(key)
+        file_path = self._get_box_art_path(nvapp, fingerprint)
+        exists = os.path.exists(file_path)
+        if exists and fingerprint is not None and fingerprint['gamelist_id'] == server_info.gamelist_id:
+            return file_path
+
+        part_path = os.path.join(self._set_up_path(os.path.join(self.cover_cache, nvapp.id)), nvapp.id + '.part')
+        sha1 = self.request_service.stream_box_art(nvapp.id, part_path)
+        if sha1 is None:
+            return file_path if exists else None
+
+        if exists and fingerprint is not None and fingerprint['sha1'] == sha1:
+            os.remove(part_path)
+            new_path = file_path
+        else:
+            # a new name makes Kodi load the image again instead of showing its cached thumbnail
+            new_path = os.path.join(self.cover_cache, nvapp.id, sha1[:16] + '.png')
+            shutil.move(part_path, new_path)
+            if exists and file_path != new_path:
+                os.remove(file_path)
+
+        with self._lock:
+            self.fingerprints[key] = {'gamelist_id': server_info.gamelist_id, 'sha1': sha1, 'path': new_path}
+            self.fingerprints.sync()
+
+        return new_path
+
+    def _get_fingerprint(self, nvapp):
+        key = self._get_fingerprint_key(self.request_service.get_server_info(), nvapp)
+        with self._lock:
+            return self.fingerprints.get(key)
+
+    @staticmethod
+    def _get_fingerprint_key(server_info, nvapp):
+        return '%s:%s' % (server_info.unique_id, nvapp.id)
 
-        return file_path
+    def _get_box_art_path(self, nvapp, fingerprint):
+        if fingerprint is not None and 'path' in fingerprint:
+            return fingerprint['path']
+        # images fetched before they were named by their hash
+        return os.path.join(self.cover_cache, nvapp.id, nvapp.id + '.png')
@@ -1,6 +1,4 @@
-import json
 import os
-import urllib2
 
 try:
     import xbmcgui
@@ -12,11 +10,10 @@ from resources.lib.model.apiresponse import ApiResponse
 
 
 class OmdbScraper(AbstractScraper):
-    def __init__(self, core):
-        AbstractScraper.__init__(self, core)
+    def __init__(self, core, download_service, response_cache_service):
+        AbstractScraper.__init__(self, core, download_service, response_cache_service)
         self.api_url = 'http://www.omdbapi.com/?t=%s&plot=short&r=json&type=game'
         self.cover_cache = self._set_up_path(os.path.join(self.base_path, 'art/poster/'))
-        self.api_cache = self._set_up_path(os.path.join(self.base_path, 'api_cache/'))
 
     def name(self):
         return 'OMDB'
@@ -28,28 +25,26 @@ class OmdbScraper(AbstractScraper):
         return response
 
     def return_paths(self):
-        return [self.cover_cache, self.api_cache]
+        return [self.cover_cache]
 
     def is_enabled(self):
         return self.core.get_setting('enable_omdb', bool)
 
     def _gather_information(self, nvapp, game):
         game_cover_path = self._set_up_path(os.path.join(self.cover_cache, nvapp.id))
-        game_cache_path = self._set_up_path(os.path.join(self.api_cache, nvapp.id))
+        response = self.response_cache_service.get(self.api_url % game, scraper=self.name(), game_id=nvapp.id)
+        response.raise_for_status()
 
-        json_file = self._get_json_data(game_cache_path, game)
         try:
-            json_data = json.load(open(json_file))
+            json_data = response.json()
         except:
             xbmcgui.Dialog().notification(
                 self.core.string('name'),
                 self.core.string('scraper_failed') % (game, self.name())
             )
-
-            if json_file is not None and os.path.isfile(json_file):
-                os.remove(json_file)
-
-            return ApiResponse()
+            self.response_cache_service.invalidate(url=self.api_url % game)
+            # raised instead of returning an empty response, which would be remembered as a miss
+            raise ValueError("Response of %s for %s isn't valid JSON" % (self.name(), game))
 
         if json_data['Response'] != 'False':
             json_data['posters'] = []
@@ -66,14 +61,3 @@ class OmdbScraper(AbstractScraper):
         else:
 
             return ApiResponse()
-
-    def _get_json_data(self, path, game):
-        file_path = os.path.join(path, game+'_omdb.json')
-        if not os.path.exists(file_path):
-            if not os.path.exists(os.path.dirname(file_path)):
-                os.makedirs(os.path.dirname(file_path))
-            json_response = json.load(urllib2.urlopen(self.api_url % game))
-            with open(file_path, 'w') as response_file:
-                json.dump(json_response, response_file)
-
-        return file_path
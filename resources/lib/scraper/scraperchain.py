@@ -1,50 +1,244 @@
 import os
+import re
 import shutil
+import threading
 
 from resources.lib.model.fanart import Fanart
 from resources.lib.model.game import Game
 from resources.lib.scraper.abcscraper import AbstractScraper
+from resources.lib.scraper.scraperpool import ScraperPool
+
+
+class GameQuery(object):
+    """The scrapers of one game which are run one after the other until the game is complete"""
+    def __init__(self, nvapp, scrapers):
+        self.nvapp = nvapp
+        self.pending = list(scrapers)
+        self.games = []
+        self._done = threading.Event()
+
+    def finish(self):
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
 
 
 class ScraperChain:
-    def __init__(self, core, game_manager, logger):
+    """
+    Scrapes games with the enabled scrapers of the chain. The scrapers of a game run in chain order until the merged
+    game has all required_fields, while the games of a library are pipelined on a :class:`ScraperPool` of
+    scraper_workers threads and handed out in the order of the library.
+
+    Titles a scraper found nothing for are remembered for scraper_negative_ttl days and not asked for again. Scrapers
+    which raise, e.g. because the API was unreachable or sent a broken response, are asked again next time.
+    """
+    MISSING_VALUES = (None, '', 'N/A')
+
+    def __init__(self, core, game_manager, response_cache_service, logger):
         self.core = core
         self.game_manager = game_manager
+        self.response_cache_service = response_cache_service
         self.logger = logger
         self.scraper_chain = []
         self.game_blacklist = ['Steam', 'Steam Client Bootstrapper']
+        self.max_workers = int(core.get_setting('scraper_workers', str) or 8)
+        self.required_fields = ('year', 'plot', 'genre', 'posters', 'fanarts')
+        self.report = {}
+        negative_ttl = int(core.get_setting('scraper_negative_ttl', str) or 7)
+        if negative_ttl > 0:
+            self.negative_cache = core.get_storage('scraper_misses', TTL=negative_ttl * 24 * 60, journal=True)
+        else:
+            self.negative_cache = None
+        self._lock = threading.Lock()
 
     def query_game_information(self, nvapp):
-        game_info = []
-        self.logger.info("Trying to get information for game: %s" % nvapp.title)
-        if nvapp.title not in self.game_blacklist:
-            for scraper in self.scraper_chain:
-                if scraper.is_enabled():
-                    try:
-                        api_response = scraper.get_game_information(nvapp)
-                    except Exception as e:
-                        self.logger.warning("Scraper {0:s} failed: {1:s}".format(scraper.name, e.message))
-                        continue
+        for _, game_query in self.query_games_information([nvapp]):
+            return game_query()
 
-                    game = Game.from_api_response(api_response)
-                    game.id = nvapp.id
-                    game_info.append(game)
+    def query_games_information(self, nvapps):
+        """
+        Starts scraping all nvapps at once and yields (nvapp, game_query) in the order of nvapps. Calling game_query
+        waits for the scrapers of that game and returns the merged Game or raises like query_game_information.
+        Scrapers which are still queued are cancelled when the generator is closed early. The requests saved by the
+        negative cache, the completeness check and the response cache are logged and kept in report afterwards.
+        """
+        self.report = {'games': 0, 'requests': 0, 'known_misses': 0, 'complete': 0, 'cached_responses': 0}
+        cache_hits = self._get_cache_hits()
+        try:
+            with ScraperPool(self.max_workers) as pool:
+                queries = [(nvapp, self._submit(pool, nvapp)) for nvapp in nvapps]
+                for nvapp, game_query in queries:
+                    yield nvapp, game_query
+        finally:
+            self.report['cached_responses'] = self._get_cache_hits() - cache_hits
+            if self.negative_cache is not None:
+                with self._lock:
+                    self.negative_cache.sync()
+            self.logger.info("Scraped %(games)s games with %(requests)s scraper calls, saved %(known_misses)s calls "
+                             "for titles without results, %(complete)s calls for complete games and "
+                             "%(cached_responses)s API requests by cached responses" % self.report)
 
-        else:
-            game = Game(nvapp.title, None, nvapp.id)
+    def refresh_images(self, nvapps):
+        """
+        Asks the enabled scrapers for changed images of games which were scraped before. The calls run on a
+        :class:`ScraperPool` under the same limits as scraping and are collected in the order of nvapps.
+        :rtype: dict
+        :return: {app id: {old path: new path}} of the games whose images changed
+        """
+        scrapers = [scraper for scraper in self.scraper_chain if scraper.is_enabled()]
+        changed = {}
+        with ScraperPool(self.max_workers) as pool:
+            tasks = [pool.submit(scraper, nvapp, call=scraper.refresh_images)
+                     for nvapp in nvapps for scraper in scrapers]
+            for task in tasks:
+                try:
+                    paths = task.result()
+                except Exception as e:
+                    self.logger.warning("Refreshing images of %s with %s failed: %s" % (
+                        task.nvapp.title, task.scraper.name(), e))
+                    continue
+                if paths:
+                    changed.setdefault(task.nvapp.id, {}).update(paths)
+
+        return changed
+
+    def _submit(self, pool, nvapp):
+        if nvapp.title in self.game_blacklist:
+            return lambda: self._query_blacklisted_game(nvapp)
+
+        self.report['games'] += 1
+        scrapers = []
+        for scraper in self.scraper_chain:
+            if not scraper.is_enabled():
+                continue
+            if self._is_known_miss(scraper, nvapp):
+                self.report['known_misses'] += 1
+                continue
+            scrapers.append(scraper)
+
+        query = GameQuery(nvapp, scrapers)
+        self._advance(pool, query)
+        return lambda: self._merge_game_information(query)
+
+    def _advance(self, pool, query, task=None):
+        """Takes in the result of the last scraper of query and runs the next one unless the game is complete"""
+        if task is not None:
+            self._collect(query, task)
+
+        if query.pending and not self._is_complete(query.games):
+            scraper = query.pending.pop(0)
+            with self._lock:
+                self.report['requests'] += 1
+            pool.submit(scraper, query.nvapp, lambda finished_task: self._advance(pool, query, finished_task))
+            return
+
+        with self._lock:
+            self.report['complete'] += len(query.pending)
+        query.finish()
+
+    def _collect(self, query, task):
+        try:
+            api_response = task.result()
+        except Exception as e:
+            self.logger.warning("Scraper {0:s} failed: {1:s}".format(task.scraper.name(), e.message))
+            return
+
+        if self._is_miss(api_response):
+            self._remember_miss(task.scraper, query.nvapp)
+            return
 
-            if nvapp.title == 'Steam':
-                fanart_path = os.path.join(self.core.internal_path,
-                                           'resources/statics/steam_wallpaper___globe_by_diglididudeng-d7kq9v9.jpg')
-                fanart = Fanart(fanart_path, fanart_path)
-                game.fanarts[os.path.basename(fanart_path)] = fanart
-                for scraper in self.scraper_chain:
-                    if scraper.name() == 'NvHTTP':
-                        game.posters = scraper.get_game_information(nvapp).posters
-                        self.logger.info("Appending steam posters: %s" % game.posters)
+        game = Game.from_api_response(api_response)
+        game.id = query.nvapp.id
+        query.games.append(game)
 
-            game_info.append(game)
+    def _merge_game_information(self, query):
+        self.logger.info("Trying to get information for game: %s" % query.nvapp.title)
+        query.wait()
+        if not query.games:
+            return Game(query.nvapp.title, None, query.nvapp.id)
 
+        return self._merge(query.games)
+
+    def _is_complete(self, games):
+        """
+        Tells whether the given scraper results together have a value for every required field
+        :type games: list
+        :rtype: bool
+        """
+        if not games or not self.required_fields:
+            return False
+
+        return all(any(self._has_value(getattr(game, field)) for game in games) for field in self.required_fields)
+
+    def _is_miss(self, api_response):
+        return api_response is None or not any(self._has_value(getattr(api_response, field))
+                                               for field in ('year', 'plot', 'genre', 'posters', 'fanarts'))
+
+    def _has_value(self, value):
+        if isinstance(value, (list, dict)):
+            return len(value) > 0
+        return value not in self.MISSING_VALUES
+
+    def _is_known_miss(self, scraper, nvapp):
+        if self.negative_cache is None or not scraper.cache_misses:
+            return False
+        with self._lock:
+            return self._get_miss_key(scraper, nvapp) in self.negative_cache
+
+    def _remember_miss(self, scraper, nvapp):
+        if self.negative_cache is None or not scraper.cache_misses:
+            return
+        self.logger.info("Scraper %s found nothing for %s, skipping it for this title for now"
+                         % (scraper.name(), nvapp.title))
+        with self._lock:
+            self.negative_cache[self._get_miss_key(scraper, nvapp)] = nvapp.id
+
+    @staticmethod
+    def _get_miss_key(scraper, nvapp):
+        return '%s:%s' % (scraper.name(), ScraperChain.normalize_title(nvapp.title))
+
+    @staticmethod
+    def normalize_title(title):
+        """
+        Lower cases title and collapses everything but letters and digits into single spaces
+        :rtype: str
+        """
+        return re.sub(r'[^a-z0-9]+', ' ', title.lower()).strip()
+
+    def _forget_misses(self, scraper_name, game_id):
+        if self.negative_cache is None:
+            return
+        with self._lock:
+            for key, miss_game_id in self.negative_cache.items():
+                if (scraper_name is None or key.startswith('%s:' % scraper_name)) and \
+                        (game_id is None or miss_game_id == game_id):
+                    del self.negative_cache[key]
+            self.negative_cache.sync()
+
+    def _get_cache_hits(self):
+        if self.response_cache_service is None:
+            return 0
+        return self.response_cache_service.get_statistics()['hits']
+
+    def _query_blacklisted_game(self, nvapp):
+        self.logger.info("Trying to get information for game: %s" % nvapp.title)
+        game = Game(nvapp.title, None, nvapp.id)
+
+        if nvapp.title == 'Steam':
+            fanart_path = os.path.join(self.core.internal_path,
+                                       'resources/statics/steam_wallpaper___globe_by_diglididudeng-d7kq9v9.jpg')
+            fanart = Fanart(fanart_path, fanart_path)
+            game.fanarts[os.path.basename(fanart_path)] = fanart
+            for scraper in self.scraper_chain:
+                if scraper.name() == 'NvHTTP':
+                    game.posters = scraper.get_game_information(nvapp).posters
+                    self.logger.info("Appending steam posters: %s" % game.posters)
+
+        return game
+
+    @staticmethod
+    def _merge(game_info):
         game = game_info[0]
         while len(game_info) > 1:
             next_game = game_info.pop()
@@ -52,15 +246,33 @@ class ScraperChain:
 
         return game
 
-    def reset_cache(self):
+    def reset_cache(self, scraper_name=None, game_id=None, host=None):
+        """
+        Clears the scraped information. Without arguments all stored games, cached API responses and images are
+        removed. Otherwise only the API responses of the named scraper and / or the given game are invalidated,
+        together with the images of that game; the stored game itself is removed if its host is given.
+        """
         self.logger.info("Reset cache requested ...")
-        self.game_manager.clear()
+        if scraper_name is None and game_id is None:
+            self.game_manager.clear()
+        elif game_id is not None and host is not None:
+            self.game_manager.remove_game_by_id(host, game_id)
+
+        removed = self.response_cache_service.invalidate(scraper_name, game_id)
+        self.logger.info("Invalidated %s cached API responses" % removed)
+        self._forget_misses(scraper_name, game_id)
+
+        if scraper_name is not None and game_id is None:
+            # images are shared between scrapers and only removed per game
+            return
 
         paths = []
         for scraper in self.scraper_chain:
+            if scraper_name is not None and scraper.name() != scraper_name:
+                continue
             self.logger.info("Getting paths from scraper: %s" % scraper.name())
             for path in scraper.return_paths():
-                paths.append(path)
+                paths.append(path if game_id is None else os.path.join(path, game_id))
         unique_paths = set(paths)
 
         for path in unique_paths:
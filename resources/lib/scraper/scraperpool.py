@@ -0,0 +1,131 @@
+import Queue
+import sys
+import threading
+
+
+class ScraperTask(object):
+    """Result of one scraper call which is run by a :class:`ScraperPool`"""
+    def __init__(self, scraper, nvapp, callback=None, call=None):
+        self.scraper = scraper
+        self.nvapp = nvapp
+        self.callback = callback
+        self.call = call or scraper.get_game_information
+        self._done = threading.Event()
+        self._response = None
+        self._exc_info = None
+
+    def run(self):
+        try:
+            self._response = self.call(self.nvapp)
+        except Exception:
+            self._exc_info = sys.exc_info()
+        self._finish()
+
+    def cancel(self):
+        self._exc_info = (RuntimeError, RuntimeError('Scraper pool was shut down'), None)
+        self._finish()
+
+    def _finish(self):
+        self._done.set()
+        if self.callback is not None:
+            self.callback(self)
+
+    def result(self):
+        """
+        Waits for the scraper and returns its response or raises its exception
+        :rtype: ApiResponse
+        :return: the ApiResponse, or whatever call returned if the task was submitted with one
+        """
+        self._done.wait()
+        if self._exc_info is not None:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._response
+
+
+class ScraperPool(object):
+    """
+    Runs scraper calls on a bounded number of worker threads.
+
+    Every scraper gets its own queue, served by at most ``scraper.max_concurrency`` workers, so a slow API can't hold
+    up the others. No more than max_workers calls run at the same time across all scrapers. Workers are started on the
+    first call of a scraper and stopped by :meth:`shutdown`, which also runs when leaving a ``with`` block. Calls
+    submitted after that are cancelled right away.
+    """
+    def __init__(self, max_workers):
+        self.max_workers = max(1, max_workers)
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._queues = {}
+        self._workers = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, scraper, nvapp, callback=None, call=None):
+        """
+        :type scraper: AbstractScraper
+        :type nvapp: NvApp
+        :param callback: called with the task once it is done, on the worker thread which ran it
+        :param call: method of scraper to run with nvapp instead of get_game_information, under the same limits
+        :rtype: ScraperTask
+        """
+        task = ScraperTask(scraper, nvapp, callback, call)
+        queue = self._get_queue(scraper)
+        if queue is None:
+            task.cancel()
+        else:
+            queue.put(task)
+        return task
+
+    def shutdown(self, cancel=False):
+        """Stops all workers after the queued calls ran, or right away if cancel is set"""
+        with self._lock:
+            self._closed = True
+            queues, self._queues = self._queues, {}
+            workers, self._workers = self._workers, []
+        for queue, number_of_workers in queues.itervalues():
+            if cancel:
+                self._drain(queue)
+            for _ in range(number_of_workers):
+                queue.put(None)
+        for worker in workers:
+            worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown(cancel=exc_type is not None)
+
+    def _get_queue(self, scraper):
+        with self._lock:
+            if self._closed:
+                return None
+            try:
+                return self._queues[scraper][0]
+            except KeyError:
+                queue = Queue.Queue()
+                number_of_workers = max(1, min(scraper.max_concurrency, self.max_workers))
+                self._queues[scraper] = (queue, number_of_workers)
+                for _ in range(number_of_workers):
+                    worker = threading.Thread(target=self._work, args=(queue,))
+                    worker.daemon = True
+                    worker.start()
+                    self._workers.append(worker)
+                return queue
+
+    def _work(self, queue):
+        while True:
+            task = queue.get()
+            if task is None:
+                return
+            with self._slots:
+                task.run()
+
+    @staticmethod
+    def _drain(queue):
+        while True:
+            try:
+                task = queue.get_nowait()
+            except Queue.Empty:
+                return
+            if task is not None:
+                task.cancel()
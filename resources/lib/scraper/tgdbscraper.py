@@ -1,8 +1,7 @@
 import os
-import subprocess
 
-from xml.etree.ElementTree import ElementTree
 from xml.etree.ElementTree import Element
+from xml.etree.ElementTree import fromstring
 
 try:
     import xbmcgui
@@ -15,12 +14,13 @@ from resources.lib.model.fanart import Fanart
 
 
 class TgdbScraper(AbstractScraper):
-    def __init__(self, core):
-        AbstractScraper.__init__(self, core)
+    max_concurrency = 4
+
+    def __init__(self, core, download_service, response_cache_service):
+        AbstractScraper.__init__(self, core, download_service, response_cache_service)
         self.api_url = 'http://thegamesdb.net/api/GetGame.php?name=%s'
         self.cover_cache = self._set_up_path(os.path.join(self.base_path, 'art/poster/'))
         self.fanart_cache = self._set_up_path(os.path.join(self.base_path, 'art/fanart/'))
-        self.api_cache = os.path.join(self.base_path, 'api_cache/')
 
     def name(self):
         return 'TGDB'
@@ -32,7 +32,7 @@ class TgdbScraper(AbstractScraper):
         return response
 
     def return_paths(self):
-        return [self.cover_cache, self.fanart_cache, self.api_cache]
+        return [self.cover_cache, self.fanart_cache]
 
     def is_enabled(self):
         return self.core.get_setting('enable_tgdb', bool)
@@ -41,49 +41,37 @@ class TgdbScraper(AbstractScraper):
         game_cover_path = self._set_up_path(os.path.join(self.cover_cache, nvapp.id))
         game_fanart_path = self._set_up_path(os.path.join(self.fanart_cache, nvapp.id))
 
-        xml_response_file = self._get_xml_data(nvapp.id, game)
+        response = self.response_cache_service.get(self.api_url % game, scraper=self.name(), game_id=nvapp.id)
+        response.raise_for_status()
 
         try:
-            xml_root = ElementTree(file=xml_response_file).getroot()
+            xml_root = fromstring(response.content)
         except:
             xbmcgui.Dialog().notification(
                 self.core.string('name'),
                 self.core.string('scraper_failed') % (game, self.name())
             )
-
-            if xml_response_file is not None and os.path.isfile(xml_response_file):
-                os.remove(xml_response_file)
-
-            return ApiResponse()
+            self.response_cache_service.invalidate(url=self.api_url % game)
+            # raised instead of returning an empty response, which would be remembered as a miss
+            raise ValueError("Response of %s for %s isn't valid XML" % (self.name(), game))
 
         dict_response = self._parse_xml_to_dict(xml_root)
 
         if dict_response:
-            posters = dict_response['posters']
-            dict_response['posters'] = []
-            for poster in posters:
-                dict_response['posters'].append(self._dump_image(game_cover_path, poster))
+            posters = self._dump_images(game_cover_path, dict_response['posters'])
+            dict_response['posters'] = [poster for poster in posters if poster is not None]
 
             local_arts = {}
-            for art in dict_response.get('fanarts'):
-                art.set_thumb(self._dump_image(game_fanart_path, art.get_thumb()))
-                local_arts[os.path.basename(art.get_thumb())] = art
+            arts = dict_response.get('fanarts')
+            thumbs = self._dump_images(game_fanart_path, [art.get_thumb() for art in arts])
+            for art, thumb in zip(arts, thumbs):
+                if thumb is not None:
+                    art.set_thumb(thumb)
+                    local_arts[os.path.basename(thumb)] = art
             dict_response['fanarts'] = local_arts
 
             return ApiResponse.from_dict(**dict_response)
 
-    def _get_xml_data(self, id, game):
-        file_path = os.path.join(self.api_cache, id, game+'_tgdb.xml')
-
-        if not os.path.isfile(file_path):
-            if not os.path.exists(os.path.dirname(file_path)):
-                os.makedirs(os.path.dirname(file_path))
-            curl = subprocess.Popen(['curl', '-XGET', self.api_url % game], stdout=subprocess.PIPE)
-            with open(file_path, 'w') as response_file:
-                response_file.write(curl.stdout.read())
-
-        return file_path
-
     @staticmethod
     def _parse_xml_to_dict(root):
         """
@@ -0,0 +1,173 @@
+import Queue
+import errno
+import os
+import shutil
+import threading
+
+
+class DownloadTask(object):
+    """A download which is run by :class:`DownloadService`"""
+    def __init__(self, url, file_path, force):
+        self.url = url
+        self.file_path = file_path
+        self.force = force
+        self.followers = []
+        self._done = threading.Event()
+        self._result = None
+
+    def finish(self, result):
+        self._result = result
+        self._done.set()
+
+    def result(self):
+        """
+        Waits for the download and returns the file path or None if it failed
+        :rtype: str
+        """
+        self._done.wait()
+        return self._result
+
+
+class DownloadService(object):
+    """
+    Downloads images on a bounded pool of worker threads over the shared keep-alive HTTP client.
+
+    Bodies are streamed into <file>.part, which is checked against the announced Content-Length and Content-Type
+    and then renamed into place, so a file which exists is always complete. A download which broke off is resumed
+    with a Range request. Concurrent downloads of the same url are run once.
+    """
+    PART_SUFFIX = '.part'
+    CHUNK_SIZE = 64 * 1024
+    ACCEPTED_CONTENT_TYPES = ('image/', 'application/octet-stream', 'binary/octet-stream')
+
+    def __init__(self, http_client_service, logger, max_workers=4, timeout=(3, 10)):
+        self.http_client_service = http_client_service
+        self.logger = logger
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._queue = Queue.Queue()
+        self._workers = []
+        self._running = {}
+        self._lock = threading.Lock()
+
+    def download(self, url, file_path, force=False):
+        """
+        Downloads url to file_path unless the file exists already, or force is set
+        :rtype: str
+        :return: file_path or None if the download failed
+        """
+        return self.download_async(url, file_path, force).result()
+
+    def download_async(self, url, file_path, force=False):
+        """
+        Queues the download of url to file_path
+        :rtype: DownloadTask
+        """
+        task = DownloadTask(url, file_path, force)
+        if not force and os.path.exists(file_path):
+            task.finish(file_path)
+            return task
+
+        with self._lock:
+            running = self._running.get(url)
+            if running is not None:
+                running.followers.append(task)
+                return task
+            self._running[url] = task
+            self._start_workers()
+        self._queue.put(task)
+        return task
+
+    def download_all(self, downloads):
+        """
+        Downloads all (url, file_path) pairs in parallel and returns the file paths in the same order
+        :rtype: list
+        """
+        return [task.result() for task in [self.download_async(url, file_path) for url, file_path in downloads]]
+
+    def _start_workers(self):
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._work)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            task = self._queue.get()
+            try:
+                result = self._fetch(task.url, task.file_path)
+            except Exception as e:
+                self.logger.error("Downloading '%s' failed: %s" % (task.url, e))
+                result = None
+
+            with self._lock:
+                del self._running[task.url]
+            task.finish(result)
+            for follower in task.followers:
+                try:
+                    copy = self._copy(result, follower.file_path)
+                except (IOError, OSError) as e:
+                    self.logger.error("Copying '%s' to '%s' failed: %s" % (task.url, follower.file_path, e))
+                    copy = None
+                follower.finish(copy)
+
+    def _fetch(self, url, file_path):
+        self._set_up_path(os.path.dirname(file_path))
+        part_path = file_path + self.PART_SUFFIX
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {'Range': 'bytes=%s-' % offset} if offset > 0 else {}
+
+        response = self.http_client_service.get(url, headers=headers, stream=True, timeout=self.timeout)
+        try:
+            if response.status_code == 416:
+                # the partial file is no prefix of the current resource
+                os.remove(part_path)
+                return self._fetch(url, file_path)
+            if response.status_code == 200:
+                offset = 0
+            elif response.status_code != 206 or offset == 0:
+                self.logger.warning("Downloading '%s' failed with status %s" % (url, response.status_code))
+                return None
+
+            content_type = response.headers.get('content-type', 'application/octet-stream')
+            if not content_type.startswith(self.ACCEPTED_CONTENT_TYPES):
+                self.logger.warning("Downloading '%s' returned '%s' instead of an image" % (url, content_type))
+                return None
+
+            expected_length = response.headers.get('content-length')
+            length = 0
+            with open(part_path, 'ab' if offset > 0 else 'wb') as part:
+                for chunk in response.iter_content(self.CHUNK_SIZE):
+                    part.write(chunk)
+                    length += len(chunk)
+        finally:
+            response.close()
+
+        if expected_length is not None and length != int(expected_length):
+            self.logger.warning("Download of '%s' broke off after %s of %s bytes, will resume" % (
+                url, length, expected_length))
+            return None
+        if offset + length == 0:
+            os.remove(part_path)
+            return None
+
+        shutil.move(part_path, file_path)
+        return file_path
+
+    def _copy(self, source, file_path):
+        if source is None:
+            return None
+        if source != file_path:
+            self._set_up_path(os.path.dirname(file_path))
+            shutil.copyfile(source, file_path + self.PART_SUFFIX)
+            shutil.move(file_path + self.PART_SUFFIX, file_path)
+        return file_path
+
+    @staticmethod
+    def _set_up_path(path):
+        try:
+            os.makedirs(path)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
@@ -0,0 +1,110 @@
+import Queue
+import threading
+import time
+
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.nvhttp.request.staticrequestservice import StaticRequestService
+
+
+class HostStatusService(object):
+    """
+    Probes the hosts for being online, all at once and within a total deadline.
+
+    Results are handed to a callback as they arrive and remembered with the time they were taken, so the host list
+    can be shown with the last known state right away and refined while the probes are running.
+    """
+    STATUS_STORAGE = 'host_status'
+    # minutes a remembered state is shown before a host is unknown again
+    STATUS_TTL = 24 * 60
+    PROBE_DEADLINE = 4
+    PROBE_TIMEOUT = (2, 3)
+
+    def __init__(self, core, reachability_resolver, logger, deadline=PROBE_DEADLINE):
+        self.core = core
+        self.reachability_resolver = reachability_resolver
+        self.logger = logger
+        self.deadline = deadline
+        self.status = core.get_storage(self.STATUS_STORAGE, TTL=self.STATUS_TTL)
+        self._lock = threading.Lock()
+
+    def get_cached_states(self):
+        """
+        Returns the last known state of every host which was probed within STATUS_TTL
+        :rtype: dict
+        :return: {host uuid: (state, checked_at)}
+        """
+        states = {}
+        with self._lock:
+            # reading an expired entry removes it, so iterate over a snapshot of the keys
+            for uuid in list(self.status.keys()):
+                try:
+                    status = self.status[uuid]
+                except KeyError:
+                    continue
+                states[uuid] = (status['state'], status['checked_at'])
+        return states
+
+    def probe_all(self, hosts, callback=None):
+        """
+        Probes hosts in parallel and calls callback(host, state) on the calling thread for every result as it
+        arrives. Hosts which didn't answer within the deadline are reported offline.
+        :type hosts: list[HostDetails]
+        :rtype: dict
+        :return: {host uuid: state}
+        """
+        results = Queue.Queue()
+        pending = dict((host.uuid, host) for host in hosts)
+        for host in pending.itervalues():
+            prober = threading.Thread(target=self._probe_into, args=(host, results))
+            prober.daemon = True
+            prober.start()
+
+        states = {}
+        deadline = time.time() + self.deadline
+        while pending:
+            try:
+                host, state = results.get(timeout=max(0, deadline - time.time()))
+            except Queue.Empty:
+                break
+            pending.pop(host.uuid, None)
+            states[host.uuid] = self._report(host, state, callback)
+
+        for host in pending.itervalues():
+            self.logger.info("Host %s didn't answer within %ss" % (host.name, self.deadline))
+            states[host.uuid] = self._report(host, HostDetails.STATE_OFFLINE, callback)
+        self._remember(states)
+
+        return states
+
+    def _probe_into(self, host, results):
+        results.put((host, self.probe(host)))
+
+    def probe(self, host):
+        """
+        :rtype: int
+        :return: HostDetails.STATE_ONLINE or HostDetails.STATE_OFFLINE
+        """
+        # probing is a good moment to find out again which of the host's addresses answers
+        address = self.reachability_resolver.resolve(host, force=True)
+        if host.reachability == HostDetails.REACH_OFFLINE:
+            return HostDetails.STATE_OFFLINE
+        try:
+            StaticRequestService.get_static_server_info(address, self.PROBE_TIMEOUT)
+            return HostDetails.STATE_ONLINE
+        except IOError:
+            return HostDetails.STATE_OFFLINE
+
+    @staticmethod
+    def _report(host, state, callback):
+        host.state = state
+        if callback is not None:
+            callback(host, state)
+
+        return state
+
+    def _remember(self, states):
+        checked_at = time.time()
+        with self._lock:
+            for uuid, state in states.iteritems():
+                self.status[uuid] = {'state': state, 'checked_at': checked_at}
+            self.status.sync()
@@ -0,0 +1,187 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.poolmanager import PoolManager
+
+
+class ConnectionCounter(object):
+    """Counts the requests which opened a new connection and the ones which reused a kept-alive one"""
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self._lock = threading.Lock()
+
+    @property
+    def reused_connections(self):
+        return max(0, self.requests - self.new_connections)
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def count_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+
+class CountingPoolManager(PoolManager):
+    """
+    Hands out the connection pools of PoolManager, with connection classes which count every connection they open.
+
+    Only public urllib3 API is used, as the private pool factory changed its signature between the urllib3 versions
+    bundled with the requests modules Kodi ships.
+    """
+    def __init__(self, counter, *args, **kwargs):
+        PoolManager.__init__(self, *args, **kwargs)
+        self.counter = counter
+        self._connection_classes = {}
+
+    def connection_from_host(self, *args, **kwargs):
+        pool = PoolManager.connection_from_host(self, *args, **kwargs)
+        if getattr(pool, 'counter', None) is not self.counter:
+            pool.ConnectionCls = self._get_connection_class(pool.ConnectionCls)
+            pool.counter = self.counter
+
+        return pool
+
+    def _get_connection_class(self, connection_class):
+        if getattr(connection_class, 'counter', None) is self.counter:
+            return connection_class
+        counting_class = self._connection_classes.get(connection_class)
+        if counting_class is None:
+            counter = self.counter
+
+            class CountingConnection(connection_class):
+                def connect(self):
+                    counter.count_connection()
+                    return connection_class.connect(self)
+
+            CountingConnection.counter = counter
+            counting_class = self._connection_classes[connection_class] = CountingConnection
+
+        return counting_class
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    def __init__(self, counter, *args, **kwargs):
+        self.counter = counter
+        HTTPAdapter.__init__(self, *args, **kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = CountingPoolManager(self.counter, num_pools=connections, maxsize=maxsize, block=block,
+                                               **pool_kwargs)
+
+    def send(self, request, *args, **kwargs):
+        self.counter.count_request()
+        return HTTPAdapter.send(self, request, *args, **kwargs)
+
+
+class InFlightRequest(object):
+    """A GET which is sent once and whose response is handed to every caller asking for it meanwhile"""
+    def __init__(self):
+        self._done = threading.Event()
+        self._response = None
+        self._error = None
+
+    def finish(self, response=None, error=None):
+        self._response = response
+        self._error = error
+        self._done.set()
+
+    def result(self):
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._response
+
+
+class HttpClientService(object):
+    """
+    Shared HTTP client for everything which talks to the internet (scrapers, updater, downloads, Eos).
+
+    All requests go through one requests.Session which keeps a pool of kept-alive connections per origin.
+    Identical GETs which are issued while one of them is still in flight are sent once and share the response.
+    """
+    def __init__(self, logger, timeout=(3, 10), pool_connections=10, pool_maxsize=8):
+        self.logger = logger
+        self.timeout = timeout
+        self.counter = ConnectionCounter()
+        self.coalesced_requests = 0
+        self.session = requests.Session()
+        adapter = CountingHTTPAdapter(self.counter, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False, **kwargs):
+        """
+        Sends a GET request, concurrent identical requests are sent only once. Streamed responses aren't shared.
+        :rtype: requests.Response
+        """
+        if stream or kwargs:
+            return self.request('get', url, params=params, headers=headers, timeout=timeout, stream=stream, **kwargs)
+
+        key = (url, self._freeze(params), self._freeze(headers))
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            follower = in_flight is not None
+            if follower:
+                self.coalesced_requests += 1
+            else:
+                in_flight = self._in_flight[key] = InFlightRequest()
+        if follower:
+            self.logger.debug("Waiting for in-flight request to '%s'" % url)
+            return in_flight.result()
+
+        try:
+            response = self.request('get', url, params=params, headers=headers, timeout=timeout)
+        except Exception as e:
+            in_flight.finish(error=e)
+            raise
+        else:
+            in_flight.finish(response)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+        return response
+
+    def post(self, url, data=None, json=None, timeout=None, **kwargs):
+        return self.request('post', url, data=data, json=json, timeout=timeout, **kwargs)
+
+    def put(self, url, data=None, timeout=None, **kwargs):
+        return self.request('put', url, data=data, timeout=timeout, **kwargs)
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """
+        Sends a request over the shared session, using the default timeout unless one is given
+        :rtype: requests.Response
+        """
+        return self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+
+    def get_statistics(self):
+        """
+        :rtype: dict
+        """
+        return {
+            'new_connections': self.counter.new_connections,
+            'reused_connections': self.counter.reused_connections,
+            'coalesced_requests': self.coalesced_requests
+        }
+
+    def log_statistics(self):
+        self.logger.debug("HTTP connections: %(new_connections)s new, %(reused_connections)s reused, "
+                          "%(coalesced_requests)s requests coalesced" % self.get_statistics())
+
+    @staticmethod
+    def _freeze(values):
+        if not values:
+            return None
+        if isinstance(values, dict):
+            return tuple(sorted(values.iteritems()))
+        return tuple(values)
@@ -0,0 +1,261 @@
+import calendar
+import email.utils
+import errno
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import urllib
+import urlparse
+import zlib
+
+import requests
+
+
+class CachedResponse(object):
+    """A response served from the :class:`ResponseCacheService`, offering the parts of requests.Response in use"""
+    def __init__(self, url, content, headers=None, from_cache=False):
+        self.url = url
+        self.status_code = 200
+        self.content = content
+        self.headers = headers or {}
+        self.from_cache = from_cache
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        pass
+
+
+class ResponseCacheService(object):
+    """
+    Caches GET responses of the scraper APIs on disk.
+
+    Responses are keyed by their normalized request and stored zlib compressed under <storage>/response_cache/, while
+    an index storage keeps the validators (ETag, Last-Modified), the freshness and the scraper and game a response
+    belongs to. Fresh responses are served without a request, stale ones are revalidated with a conditional request
+    and served again if the API answers 304 or can't be reached.
+
+    Index entries expire INDEX_TTL minutes after they were last stored or revalidated. Bodies without an index entry
+    are deleted on start and then at most once every PRUNE_INTERVAL seconds, so the cache doesn't grow without bound.
+    """
+    CACHE_DIR = 'response_cache'
+    INDEX_STORAGE = 'response_cache_index'
+    LEGACY_CACHE_DIR = 'api_cache'
+    DEFAULT_MAX_AGE = 7 * 24 * 60 * 60
+    INDEX_TTL = 30 * 24 * 60
+    PRUNE_INTERVAL = 24 * 60 * 60
+    DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+    def __init__(self, core, http_client_service, logger, max_age=DEFAULT_MAX_AGE):
+        self.core = core
+        self.http_client_service = http_client_service
+        self.logger = logger
+        self.max_age = max_age
+        self.cache_path = os.path.join(core.storage_path, self.CACHE_DIR)
+        self.index = core.get_storage(self.INDEX_STORAGE, TTL=self.INDEX_TTL, journal=True)
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._pruned_at = 0
+        self._set_up_path(self.cache_path)
+        self._remove_legacy_cache()
+        self.prune()
+
+    def get(self, url, headers=None, scraper=None, game_id=None, max_age=None):
+        """
+        Returns the response for url, from cache if it is still fresh
+        :param scraper: name of the scraper the response belongs to, used by :meth:`invalidate`
+        :param game_id: id of the game the response belongs to, used by :meth:`invalidate`
+        :param max_age: freshness in seconds for responses which don't state their own
+        :rtype: CachedResponse|requests.Response
+        """
+        key = self.get_key(url, headers)
+        with self._lock:
+            entry = self.index.get(key)
+        content = self._read(key) if entry is not None else None
+        if content is not None and entry['expires'] > time.time():
+            with self._lock:
+                self.hits += 1
+            return CachedResponse(url, content, entry['headers'], from_cache=True)
+
+        request_headers = dict(headers or {})
+        if content is not None:
+            if entry['etag']:
+                request_headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                request_headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            response = self.http_client_service.get(url, headers=request_headers)
+        except requests.RequestException as e:
+            if content is None:
+                raise
+            self.logger.warning("Revalidating '%s' failed, serving stale response: %s" % (url, e))
+            with self._lock:
+                self.hits += 1
+            return CachedResponse(url, content, entry['headers'], from_cache=True)
+
+        if response.status_code == 304 and content is not None:
+            with self._lock:
+                self.revalidations += 1
+            self._store(key, url, entry['headers'], None, response.headers, scraper, game_id, max_age, entry)
+            return CachedResponse(url, content, entry['headers'], from_cache=True)
+
+        with self._lock:
+            self.misses += 1
+        if response.status_code != 200:
+            return response
+
+        headers = {'content-type': response.headers.get('content-type')}
+        self._store(key, url, headers, response.content, response.headers, scraper, game_id, max_age)
+        return CachedResponse(url, response.content, headers)
+
+    def invalidate(self, scraper=None, game_id=None, url=None, headers=None):
+        """
+        Removes the cached responses of a scraper, of a game, both, or of a single request. Without arguments the
+        whole cache is cleared.
+        :rtype: int
+        :return: number of removed responses
+        """
+        with self._lock:
+            if url is not None:
+                keys = [self.get_key(url, headers)]
+            else:
+                keys = [key for key, entry in self.index.items()
+                        if (scraper is None or entry['scraper'] == scraper) and
+                        (game_id is None or entry['game_id'] == game_id)]
+
+            removed = 0
+            for key in keys:
+                if key in self.index:
+                    del self.index[key]
+                    removed += 1
+                self._remove(key)
+            if removed > 0:
+                self.index.sync()
+
+        return removed
+
+    def prune(self):
+        """
+        Drops the index entries which weren't stored or revalidated within INDEX_TTL and deletes every cached body
+        without an index entry
+        :rtype: int
+        :return: number of removed bodies
+        """
+        with self._lock:
+            if self.index.vacuum() > 0:
+                self.index.sync()
+            keys = set(self.index.keys())
+            removed = 0
+            for name in os.listdir(self.cache_path):
+                if name not in keys:
+                    self._remove(name)
+                    removed += 1
+            self._pruned_at = time.time()
+
+        return removed
+
+    def get_statistics(self):
+        """
+        :rtype: dict
+        """
+        with self._lock:
+            return {'hits': self.hits, 'revalidations': self.revalidations, 'misses': self.misses}
+
+    def get_key(self, url, headers=None):
+        """
+        Builds the cache key of a request from its normalized url (lower case scheme and host, no default port, sorted
+        query, no fragment) and its headers
+        :rtype: str
+        """
+        scheme, netloc, path, query, _ = urlparse.urlsplit(url)
+        scheme = scheme.lower()
+        netloc = netloc.lower()
+        if ':' in netloc:
+            host, port = netloc.rsplit(':', 1)
+            if port.isdigit() and int(port) == self.DEFAULT_PORTS.get(scheme):
+                netloc = host
+        query = urllib.urlencode(sorted(urlparse.parse_qsl(query, keep_blank_values=True)))
+        request = urlparse.urlunsplit((scheme, netloc, path or '/', query, ''))
+        for name, value in sorted((name.lower(), value) for name, value in (headers or {}).iteritems()):
+            request += '\n%s: %s' % (name, value)
+
+        return hashlib.sha1(request).hexdigest()
+
+    def _store(self, key, url, headers, content, response_headers, scraper, game_id, max_age, entry=None):
+        cache_control = response_headers.get('cache-control', '').lower()
+        if 'no-store' in cache_control:
+            return
+
+        entry = dict(entry or {})
+        entry.update({
+            'url': url,
+            'headers': headers,
+            'etag': response_headers.get('etag', entry.get('etag')),
+            'last_modified': response_headers.get('last-modified', entry.get('last_modified')),
+            'expires': time.time() + self._get_freshness(response_headers, max_age),
+            'scraper': scraper if scraper is not None else entry.get('scraper'),
+            'game_id': game_id if game_id is not None else entry.get('game_id')
+        })
+
+        with self._lock:
+            if content is not None:
+                self._write(key, content)
+            self.index[key] = entry
+            self.index.sync()
+            if self._pruned_at + self.PRUNE_INTERVAL < time.time():
+                self.prune()
+
+    def _get_freshness(self, response_headers, max_age):
+        cache_control = response_headers.get('cache-control', '').lower()
+        if 'no-cache' in cache_control:
+            return 0
+        match = re.search(r'max-age=(\d+)', cache_control)
+        if match is not None:
+            return int(match.group(1))
+        expires = email.utils.parsedate_tz(response_headers.get('expires', ''))
+        if expires is not None:
+            return max(0, calendar.timegm(expires[:9]) - (expires[9] or 0) - time.time())
+
+        return max_age if max_age is not None else self.max_age
+
+    def _read(self, key):
+        try:
+            with open(os.path.join(self.cache_path, key), 'rb') as cache_file:
+                return zlib.decompress(cache_file.read())
+        except (IOError, zlib.error):
+            return None
+
+    def _write(self, key, content):
+        file_path = os.path.join(self.cache_path, key)
+        with open(file_path + '.tmp', 'wb') as cache_file:
+            cache_file.write(zlib.compress(content))
+        os.rename(file_path + '.tmp', file_path)
+
+    def _remove(self, key):
+        try:
+            os.remove(os.path.join(self.cache_path, key))
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+
+    def _remove_legacy_cache(self):
+        legacy_path = os.path.join(self.core.storage_path, self.LEGACY_CACHE_DIR)
+        if os.path.isdir(legacy_path):
+            self.logger.info("Removing legacy scraper cache at %s" % legacy_path)
+            shutil.rmtree(legacy_path, ignore_errors=True)
+
+    @staticmethod
+    def _set_up_path(path):
+        try:
+            os.makedirs(path)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
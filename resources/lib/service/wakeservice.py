@@ -0,0 +1,165 @@
+import binascii
+import socket
+import time
+
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.nvhttp.request.staticrequestservice import StaticRequestService
+
+
+class WakeService(object):
+    """
+    Wakes hosts with Wake-on-LAN and waits until they answer again.
+
+    The magic packet is sent a few times to the limited broadcast, the subnet-directed broadcast and the last known
+    address of the host, as some switches and routers drop one or the other. Readiness is polled via serverinfo with
+    an exponentially growing interval until the host answers or the deadline passes, on whichever of the host's
+    addresses the ReachabilityResolver finds to answer.
+    """
+    WAKE_PORTS = (9, 7)
+    WAKE_DEADLINE = 60
+    SEND_RETRIES = 3
+    SEND_INTERVAL = 0.2
+    POLL_DELAY = 0.5
+    MAX_POLL_DELAY = 4
+    # seconds between two progress reports while waiting for the next poll
+    PROGRESS_INTERVAL = 0.5
+    PROBE_TIMEOUT = (1, 2)
+
+    def __init__(self, reachability_resolver, logger, ports=WAKE_PORTS, deadline=WAKE_DEADLINE,
+                 retries=SEND_RETRIES, http_port=StaticRequestService.HTTP_PORT):
+        self.reachability_resolver = reachability_resolver
+        self.logger = logger
+        self.http_port = http_port
+        self.ports = ports
+        self.deadline = deadline
+        self.retries = retries
+
+    def wake(self, host, progress=None):
+        """
+        Sends the magic packet to host and waits until it answers
+        :type host: HostDetails
+        :param progress: called with (elapsed seconds, deadline) while waiting, returning False cancels the wait
+        :rtype: float
+        :return: seconds until the host was ready, or None if it wasn't within the deadline or the wait was cancelled
+        """
+        start = time.time()
+        self.send_magic_packet(host)
+        ready_after = self.wait_until_ready(host, progress, start)
+        if ready_after is None:
+            self.logger.warning("Host %s didn't wake up within %ss" % (host.name, self.deadline))
+        else:
+            self.logger.info("Host %s was ready %.1fs after sending the magic packet" % (host.name, ready_after))
+
+        return ready_after
+
+    def send_magic_packet(self, host):
+        """
+        Sends the magic packet for the MAC address of host to every wake address and port, retries times
+        :type host: HostDetails
+        :rtype: int
+        :return: number of packets which were sent
+        """
+        packet = self.build_magic_packet(host.mac_address)
+        addresses = self.get_wake_addresses(host)
+        self.logger.info("Waking host %s (MAC: %s) via %s" % (host.name, host.mac_address, ', '.join(addresses)))
+
+        sent = 0
+        wake_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            wake_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            for attempt in range(self.retries):
+                if attempt > 0:
+                    time.sleep(self.SEND_INTERVAL)
+                for address in addresses:
+                    for port in self.ports:
+                        try:
+                            wake_socket.sendto(packet, (address, port))
+                            sent += 1
+                        except socket.error as e:
+                            self.logger.debug("Sending magic packet to %s:%s failed: %s" % (address, port, e))
+        finally:
+            wake_socket.close()
+
+        return sent
+
+    def wait_until_ready(self, host, progress=None, start=None):
+        """
+        Polls host until it answers, waiting POLL_DELAY after the first poll and twice as long after every further
+        one, up to MAX_POLL_DELAY
+        :type host: HostDetails
+        :rtype: float
+        :return: seconds since start until the host was ready, or None
+        """
+        if start is None:
+            start = time.time()
+        deadline = start + self.deadline
+        delay = self.POLL_DELAY
+        polls = 0
+
+        while True:
+            polls += 1
+            if self.is_ready(host):
+                self.logger.debug("Host %s answered poll %s" % (host.name, polls))
+                return time.time() - start
+            if time.time() >= deadline:
+                return None
+
+            next_poll = min(time.time() + delay, deadline)
+            delay = min(delay * 2, self.MAX_POLL_DELAY)
+            while True:
+                now = time.time()
+                if progress is not None and progress(now - start, self.deadline) is False:
+                    self.logger.info("Waiting for host %s was cancelled after %s polls" % (host.name, polls))
+                    return None
+                if now >= next_poll:
+                    break
+                time.sleep(min(self.PROGRESS_INTERVAL, next_poll - now))
+
+    def is_ready(self, host):
+        """
+        Whether host answers serverinfo on its local or its remote address
+        :type host: HostDetails
+        :rtype: bool
+        """
+        address = self.reachability_resolver.resolve(host, force=True)
+        if host.reachability == HostDetails.REACH_OFFLINE:
+            return False
+        try:
+            StaticRequestService.get_static_server_info(address, self.PROBE_TIMEOUT, self.http_port)
+            return True
+        except IOError:
+            return False
+
+    @staticmethod
+    def build_magic_packet(mac_address):
+        """
+        :param mac_address: MAC address with or without ':' or '-' separators
+        :rtype: str
+        :raises ValueError: if mac_address isn't made of 6 hexadecimal bytes
+        """
+        mac = (mac_address or '').replace(':', '').replace('-', '')
+        if len(mac) != 12:
+            raise ValueError("Invalid MAC address: %s" % mac_address)
+        try:
+            return '\xff' * 6 + binascii.unhexlify(mac) * 16
+        except TypeError:
+            raise ValueError("Invalid MAC address: %s" % mac_address)
+
+    @staticmethod
+    def get_wake_addresses(host):
+        """
+        Returns the limited broadcast and, if the host has a known IPv4 address, the broadcast of its /24 and the
+        address itself
+        :type host: HostDetails
+        :rtype: list[str]
+        """
+        addresses = ['255.255.255.255']
+        try:
+            socket.inet_aton(host.local_ip)
+        except (socket.error, TypeError):
+            return addresses
+        if host.local_ip.count('.') == 3:
+            addresses.append(host.local_ip.rsplit('.', 1)[0] + '.255')
+            addresses.append(host.local_ip)
+
+        return addresses
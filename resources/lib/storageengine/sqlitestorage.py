@@ -0,0 +1,164 @@
+import collections
+import sqlite3
+import threading
+import time
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+
+class SqliteStorage(collections.MutableMapping):
+    """Storage that acts like a dict but keeps every item in its own row of a
+    sqlite database.
+
+    Lookups are indexed point queries, so opening a storage does not load its
+    values. Every write is committed right away in its own short transaction,
+    so other processes using the same database only ever wait for a single
+    statement instead of getting "database is locked" until this one syncs.
+
+    Values are unpickled on every access, so changes to a value have to be
+    written back by assigning it again. Keys have to be strings.
+
+    :param filename: An absolute filepath of the database file.
+    :param TTL: A datetime.timedelta or None. Items older than the TTL are
+                removed upon load and upon item access.
+    """
+
+    FILE_SUFFIX = '.db'
+
+    def __init__(self, filename, TTL=None):
+        self.filename = filename
+        self.TTL = TTL
+        self._lock = threading.RLock()
+        try:
+            # autocommit, transactions are only opened explicitly around bulk writes
+            self._connection = sqlite3.connect(filename, check_same_thread=False, isolation_level=None)
+            self._connection.text_factory = str
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS storage '
+                '(key TEXT PRIMARY KEY, value BLOB NOT NULL, timestamp REAL NOT NULL)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS storage_timestamp ON storage (timestamp)')
+            if self.TTL:
+                self._connection.execute('DELETE FROM storage WHERE timestamp < ?', (self._expiry_cutoff(),))
+        except sqlite3.DatabaseError as e:
+            raise ValueError('File not in a supported format: %s' % e)
+
+    def __setitem__(self, key, val):
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO storage (key, value, timestamp) VALUES (?, ?, ?)',
+                (key, self._encode(val), time.time()))
+
+    def __getitem__(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT value, timestamp FROM storage WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                raise KeyError(key)
+            if self.TTL and row[1] < self._expiry_cutoff():
+                self._connection.execute('DELETE FROM storage WHERE key = ?', (key,))
+                raise KeyError(key)
+        return self._decode(row[0])
+
+    def __delitem__(self, key):
+        with self._lock:
+            cursor = self._connection.execute('DELETE FROM storage WHERE key = ?', (key,))
+            if cursor.rowcount == 0:
+                raise KeyError(key)
+
+    def __contains__(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT 1 FROM storage WHERE key = ? AND timestamp >= ?', (key, self._expiry_cutoff())).fetchone()
+        return row is not None
+
+    def __iter__(self):
+        with self._lock:
+            keys = [row[0] for row in self._connection.execute(
+                'SELECT key FROM storage WHERE timestamp >= ?', (self._expiry_cutoff(),))]
+        return iter(keys)
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COUNT(*) FROM storage WHERE timestamp >= ?', (self._expiry_cutoff(),)).fetchone()[0]
+
+    def iteritems(self):
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT key, value FROM storage WHERE timestamp >= ?', (self._expiry_cutoff(),)).fetchall()
+        for key, value in rows:
+            yield key, self._decode(value)
+
+    def items(self):
+        return list(self.iteritems())
+
+    def raw_dict(self):
+        """Returns a dict of all items as (value, timestamp) tuples, like
+        :meth:`TimedStorage.raw_dict`
+        """
+        with self._lock:
+            rows = self._connection.execute('SELECT key, value, timestamp FROM storage').fetchall()
+        return dict((key, (self._decode(value), timestamp)) for key, value, timestamp in rows)
+
+    def import_storage(self, storage):
+        """Copies all items of a :class:`TimedStorage` including their timestamps in one transaction"""
+        rows = [(key, self._encode(val), timestamp) for key, (val, timestamp) in storage.raw_dict().iteritems()]
+        with self._lock:
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO storage (key, value, timestamp) VALUES (?, ?, ?)', rows)
+            except Exception:
+                self._connection.execute('ROLLBACK')
+                raise
+            self._connection.execute('COMMIT')
+
+    def vacuum(self):
+        """Removes all expired items and returns how many were removed"""
+        if not self.TTL:
+            return 0
+        with self._lock:
+            return self._connection.execute(
+                'DELETE FROM storage WHERE timestamp < ?', (self._expiry_cutoff(),)).rowcount
+
+    def sync(self):
+        """Writes are committed as they happen, there is nothing left to write"""
+        pass
+
+    def compact(self):
+        """Rebuilds the database file"""
+        with self._lock:
+            self._connection.execute('VACUUM')
+
+    def close(self):
+        """Closes the database connection"""
+        with self._lock:
+            self._connection.close()
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute('DELETE FROM storage')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _expiry_cutoff(self):
+        if not self.TTL:
+            return 0
+        return time.time() - self.TTL.total_seconds()
+
+    @staticmethod
+    def _encode(val):
+        return sqlite3.Binary(pickle.dumps(val, 2))
+
+    @staticmethod
+    def _decode(value):
+        return pickle.loads(str(value))
@@ -10,15 +10,24 @@
 import os
 import csv
 import json
+import struct
 import time
+import zlib
 
 try:
     import cPickle as pickle
 except ImportError:
     import pickle
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 import shutil
 import collections
-from datetime import datetime
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
 
 
 class _PersistentDictMixin(object):
@@ -29,25 +38,185 @@ class _PersistentDictMixin(object):
 
     Write to disk is delayed until close or sync (similar to gdbm's fast mode).
 
-    Input file format is automatically discovered.
     Output file format is selectable between pickle, json, and csv.
     All three serialization formats are backed by fast C implementations.
+    Snapshots start with a header naming their format, so load never has to
+    guess it. Files written before the header was introduced are still
+    discovered by trying each format.
+
+    In journal mode (pickle only) sync appends the changed entries to a log
+    next to the snapshot instead of rewriting the whole file. The log is
+    replayed on load and folded into the snapshot by :meth:`compact`, which
+    runs on close and whenever the log outgrows the snapshot.
+
+    Several processes (e.g. the addon and the service) may open the same
+    file. Writes hold an advisory fcntl lock on a lock file next to the
+    snapshot. Reads check the size and mtime of the snapshot and journal at
+    most every CHANGE_CHECK_INTERVAL seconds and pick up changes made by
+    others, replaying only the new journal tail where possible. Unsynced
+    local changes are kept on top of the reloaded data, so concurrent writers
+    don't lose each other's updates.
     """
 
-    def __init__(self, filename, flag='c', mode=None, file_format='pickle'):
+    FORMAT_MAGIC = 'LUNAFMT1'
+    JOURNAL_SUFFIX = '.journal'
+    JOURNAL_MIN_COMPACT_SIZE = 256 * 1024
+    LOCK_SUFFIX = '.lock'
+    CHANGE_CHECK_INTERVAL = 1.0
+    _RECORD_HEADER = struct.Struct('<II')  # payload length, crc32
+    _OP_SET = 0
+    _OP_DEL = 1
+
+    def __init__(self, filename, flag='c', mode=None, file_format='pickle', journal=False):
         self.flag = flag  # r=readonly, c=create, or n=new
         self.mode = mode  # None or an octal triple like 0644
         self.file_format = file_format  # 'csv', 'json', or 'pickle'
         self.filename = filename
-        if flag != 'n' and os.access(filename, os.R_OK):
-            fileobj = open(filename, 'rb' if file_format == 'pickle' else 'r')
-            with fileobj:
-                self.load(fileobj)
+        self.journal = journal and file_format == 'pickle'
+        self.journal_filename = filename + self.JOURNAL_SUFFIX
+        self.lock_filename = filename + self.LOCK_SUFFIX
+        self.bytes_written = 0
+        self._dirty = set()
+        self._generation = None
+        self._journal_offset = 0
+        self._last_check = time.time()
+        self._lock_depth = 0
+        self._lock_file = None
+        # guards the lock file and the entries with their dirty set against other threads, e.g. the VacuumThread
+        self._lock_mutex = threading.RLock()
+        if flag != 'n':
+            with self._locked():
+                self._load_files()
+                # taken before the lock is released, otherwise appends of other processes in between would be skipped
+                self._remember_generation()
+        else:
+            self._remember_generation()
+        self._dirty.clear()
+
+    def touch(self, *path):
+        """Marks the entry at the given key path as changed.
+
+        Needed in journal mode when a value nested inside a stored dict is
+        modified in place, e.g. ``storage.touch(host_uuid, game_id)``.
+        """
+        with self._lock_mutex:
+            self._pin(path[0])
+            self._dirty.add(tuple(path))
 
     def sync(self):
         """Write the dict to disk"""
         if self.flag == 'r':
             return
+        with self._locked():
+            self.refresh()
+            if self.journal:
+                self._append_journal()
+                if self._journal_size() > max(self._snapshot_size(), self.JOURNAL_MIN_COMPACT_SIZE):
+                    self.compact()
+            else:
+                self._write_snapshot()
+            self._remember_generation()
+
+    def compact(self):
+        """Folds the journal into a fresh snapshot and removes the journal"""
+        if self.flag == 'r':
+            return
+        with self._locked():
+            self.refresh()
+            self._write_snapshot()
+            if os.path.exists(self.journal_filename):
+                os.remove(self.journal_filename)
+            self._journal_offset = 0
+            self._remember_generation()
+
+    def refresh(self):
+        """Picks up changes other processes wrote since this storage last
+        read or wrote its files. Unsynced local changes are kept.
+
+        Returns whether anything was reloaded.
+        """
+        if self._current_generation() == self._generation:
+            return False
+        with self._locked():
+            generation = self._current_generation()
+            if generation == self._generation:
+                return False
+            pending = self._dirty_records()
+            if self._journal_appended(generation):
+                self._replay_journal(self._journal_offset)
+            else:
+                self._reset()
+                self._load_files()
+            for op, path, value in pending:
+                self._apply(op, path, value)
+            self._dirty = set(path for _, path, _ in pending)
+            self._remember_generation()
+        return True
+
+    def _check_for_changes(self):
+        """Refreshes at most every CHANGE_CHECK_INTERVAL seconds, called before data is served"""
+        if self._lock_depth:
+            return
+        now = time.time()
+        if now - self._last_check < self.CHANGE_CHECK_INTERVAL:
+            return
+        self._last_check = now
+        self.refresh()
+
+    @contextmanager
+    def _locked(self):
+        """Holds the lock file exclusively, reentrant within this storage"""
+        with self._lock_mutex:
+            if self._lock_depth == 0 and fcntl is not None and self.flag != 'r':
+                self._lock_file = open(self.lock_filename, 'a')
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_file is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def _load_files(self):
+        if os.access(self.filename, os.R_OK):
+            fileobj = open(self.filename, 'rb' if self.file_format == 'pickle' else 'r')
+            with fileobj:
+                self.load(fileobj)
+        self._journal_offset = 0
+        if os.access(self.journal_filename, os.R_OK):
+            self._replay_journal()
+
+    def _reset(self):
+        """Drops all entries held in memory before the files are loaded again"""
+        self._live_items().clear()
+
+    @staticmethod
+    def _file_generation(filename):
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime
+
+    def _current_generation(self):
+        return self._file_generation(self.filename), self._file_generation(self.journal_filename)
+
+    def _remember_generation(self):
+        self._generation = self._current_generation()
+        self._last_check = time.time()
+
+    def _journal_appended(self, generation):
+        """Whether another process only appended to the journal this storage already replayed"""
+        if self._generation is None or generation[0] != self._generation[0]:
+            return False
+        journal, known_journal = generation[1], self._generation[1]
+        return journal is not None and known_journal is not None and journal[0] == known_journal[0] and \
+            journal[1] >= self._journal_offset
+
+    def _write_snapshot(self):
         filename = self.filename
         tempname = filename + '.tmp'
         fileobj = open(tempname, 'wb' if self.file_format == 'pickle' else 'w')
@@ -61,10 +230,127 @@ class _PersistentDictMixin(object):
         shutil.move(tempname, self.filename)  # atomic commit
         if self.mode is not None:
             os.chmod(self.filename, self.mode)
+        self.bytes_written += self._snapshot_size()
+        self._dirty.clear()
 
     def close(self):
-        """Calls sync"""
-        self.sync()
+        """Calls sync, or compact in journal mode"""
+        if self.journal:
+            with self._locked():
+                self._append_journal()
+                self.compact()
+        else:
+            self.sync()
+
+    def _snapshot_size(self):
+        try:
+            return os.path.getsize(self.filename)
+        except OSError:
+            return 0
+
+    def _journal_size(self):
+        try:
+            return os.path.getsize(self.journal_filename)
+        except OSError:
+            return 0
+
+    def _append_journal(self):
+        if not self._dirty:
+            return
+        data = ''.join(self._encode_record(record) for record in self._dirty_records())
+        with open(self.journal_filename, 'ab') as fileobj:
+            fileobj.write(data)
+        if self.mode is not None:
+            os.chmod(self.journal_filename, self.mode)
+        self.bytes_written += len(data)
+        self._journal_offset = self._journal_size()
+        self._dirty.clear()
+
+    def _dirty_records(self):
+        records = []
+        with self._lock_mutex:
+            dirty = list(self._dirty)
+        # parents first, so a replaced dict never shadows a nested record
+        for path in sorted(dirty, key=len):
+            try:
+                records.append((self._OP_SET, path, self._resolve(path)))
+            except KeyError:
+                records.append((self._OP_DEL, path, None))
+        return records
+
+    def _encode_record(self, record):
+        payload = pickle.dumps(record, 2)
+        return self._RECORD_HEADER.pack(len(payload), zlib.crc32(payload) & 0xffffffff) + payload
+
+    def _replay_journal(self, start=0):
+        """Applies all intact journal records after start, cutting off a torn tail"""
+        header_size = self._RECORD_HEADER.size
+        with open(self.journal_filename, 'rb') as fileobj:
+            fileobj.seek(start)
+            data = fileobj.read()
+        offset = 0
+        while offset + header_size <= len(data):
+            length, checksum = self._RECORD_HEADER.unpack_from(data, offset)
+            payload = data[offset + header_size:offset + header_size + length]
+            if len(payload) != length or zlib.crc32(payload) & 0xffffffff != checksum:
+                break
+            try:
+                op, path, value = pickle.loads(payload)
+            except Exception:
+                break
+            self._apply(op, path, value)
+            offset += header_size + length
+        if offset != len(data) and self.flag != 'r':
+            with open(self.journal_filename, 'r+b') as fileobj:
+                fileobj.truncate(start + offset)
+        self._journal_offset = start + offset
+
+    def _resolve(self, path):
+        self._pin(path[0])
+        raw = self._live_items()[path[0]]
+        if len(path) == 1:
+            return raw
+        node = self._unwrap(raw)
+        for key in path[1:]:
+            node = node[key]
+        return node
+
+    def _apply(self, op, path, value):
+        self._pin(path[0])
+        items = self._live_items()
+        if len(path) == 1:
+            if op == self._OP_SET:
+                items[path[0]] = value
+            else:
+                items.pop(path[0], None)
+            return
+        if path[0] not in items:
+            if op == self._OP_DEL:
+                return
+            items[path[0]] = self._wrap({})
+        node = self._unwrap(items[path[0]])
+        for key in path[1:-1]:
+            node = node.setdefault(key, {})
+        if op == self._OP_SET:
+            node[path[-1]] = value
+        else:
+            node.pop(path[-1], None)
+
+    def _live_items(self):
+        """Returns the dict holding the raw entries which are changed in place"""
+        return self.raw_dict()
+
+    def _pin(self, key):
+        """Makes sure the raw entry for key is held in :meth:`_live_items`"""
+        pass
+
+    def _wrap(self, value):
+        """Turns a plain value into its raw representation in the dict"""
+        return value
+
+    def _unwrap(self, raw):
+        """Turns a raw entry of the dict into its plain value"""
+        return raw
 
     def __enter__(self):
         return self
@@ -74,6 +360,7 @@ class _PersistentDictMixin(object):
 
     def dump(self, fileobj):
         """Handles the writing of the dict to the file object"""
+        fileobj.write('%s%s\n' % (self.FORMAT_MAGIC, self.file_format))
         if self.file_format == 'csv':
             csv.writer(fileobj).writerows(self.raw_dict().items())
         elif self.file_format == 'json':
@@ -86,7 +373,18 @@ class _PersistentDictMixin(object):
 
     def load(self, fileobj):
         """Load the dict from the file object"""
-        # try formats from most restrictive to least restrictive
+        loaders = {'pickle': pickle.load, 'json': json.load, 'csv': csv.reader}
+        fileobj.seek(0)
+        if fileobj.read(len(self.FORMAT_MAGIC)) == self.FORMAT_MAGIC:
+            loader = loaders.get(fileobj.readline().rstrip('\r\n'))
+            if loader is None:
+                raise ValueError('File not in a supported format')
+            try:
+                return self.initial_update(loader(fileobj))
+            except Exception:
+                raise ValueError('File not in a supported format')
+
+        # headerless file, try formats from most restrictive to least restrictive
         for loader in (pickle.load, json.load, csv.reader):
             fileobj.seek(0)
             try:
@@ -118,25 +416,32 @@ class _Storage(collections.MutableMapping, _PersistentDictMixin):
     def dump(self, fileobj):
         super(_Storage, self).dump(fileobj)
 
-    def __init__(self, filename, file_format='pickle'):
+    def __init__(self, filename, file_format='pickle', journal=False):
         """Acceptable formats are 'csv', 'json' and 'pickle'."""
         self._items = {}
-        _PersistentDictMixin.__init__(self, filename, file_format=file_format)
+        _PersistentDictMixin.__init__(self, filename, file_format=file_format, journal=journal)
 
     def __setitem__(self, key, val):
-        self._items.__setitem__(key, val)
+        with self._lock_mutex:
+            self._items.__setitem__(key, val)
+            self._dirty.add((key,))
 
     def __getitem__(self, key):
+        self._check_for_changes()
         return self._items.__getitem__(key)
 
     def __delitem__(self, key):
-        self._items.__delitem__(key)
+        with self._lock_mutex:
+            self._items.__delitem__(key)
+            self._dirty.add((key,))
 
     def __iter__(self):
+        self._check_for_changes()
         return iter(self._items)
 
     def __len__(self):
-        return self._items.__len__
+        self._check_for_changes()
+        return len(self._items)
 
     def raw_dict(self):
         """Returns the wrapped dict"""
@@ -146,43 +451,312 @@ class _Storage(collections.MutableMapping, _PersistentDictMixin):
 
     def clear(self):
         super(_Storage, self).clear()
-        self.sync()
+        if self.journal:
+            self.compact()
+        else:
+            self.sync()
 
 
 class TimedStorage(_Storage):
-    """A dict with the ability to persist to disk and TTL for items."""
+    """A dict with the ability to persist to disk and TTL for items.
+
+    Expiry deadlines are kept in a heap, so :meth:`vacuum` can evict every
+    expired item in one pass without scanning the whole dict.
+    """
 
     def dump(self, fileobj):
         super(TimedStorage, self).dump(fileobj)
 
-    def __init__(self, filename, file_format='pickle', TTL=None):
+    def __init__(self, filename, file_format='pickle', TTL=None, journal=False):
         """TTL if provided should be a datetime.timedelta. Any entries
-        older than the provided TTL will be removed upon load and upon item
-        access.
+        older than the provided TTL will be removed upon load, upon item
+        access and by :meth:`vacuum`.
         """
         self.TTL = TTL
-        _Storage.__init__(self, filename, file_format=file_format)
+        self._ttl_seconds = TTL.total_seconds() if TTL else None
+        self._expiry_heap = []
+        self._expiry_lock = threading.Lock()
+        _Storage.__init__(self, filename, file_format=file_format, journal=journal)
 
     def __setitem__(self, key, val, raw=False):
-        if raw:
-            self._items[key] = val
-        else:
-            self._items[key] = (val, time.time())
+        with self._lock_mutex:
+            if raw:
+                self._items[key] = val
+            else:
+                self._items[key] = (val, time.time())
+                self._dirty.add((key,))
+            self._track_expiry(key, self._items[key][1])
 
     def __getitem__(self, key):
-        val, timestamp = self._items[key]
-        if self.TTL and (datetime.utcnow() -
-                             datetime.utcfromtimestamp(timestamp) > self.TTL):
-            del self._items[key]
-            return self._items[key][0]  # Will raise KeyError
+        self._check_for_changes()
+        with self._lock_mutex:
+            val, timestamp = self._items[key]
+            if self._is_expired(timestamp):
+                del self._items[key]
+                self._dirty.add((key,))
+                return self._items[key][0]  # Will raise KeyError
         return val
 
+    def vacuum(self):
+        """Removes all expired items and returns how many were removed.
+
+        Only the deadlines which have passed are looked at, so this is cheap
+        enough to run periodically, e.g. from a background thread. Call
+        :meth:`sync` afterwards to persist the removal.
+        """
+        if self._ttl_seconds is None:
+            return 0
+
+        removed = 0
+        now = time.time()
+        with self._lock_mutex, self._expiry_lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                _, key = heapq.heappop(self._expiry_heap)
+                timestamp = self._get_timestamp(key)
+                # stale heap entries belong to keys which were removed or set again since
+                if timestamp is not None and self._is_expired(timestamp, now):
+                    del self[key]
+                    removed += 1
+
+        return removed
+
+    def import_storage(self, storage):
+        """Copies all items of a :class:`SqliteStorage` including their
+        timestamps and writes a fresh snapshot
+        """
+        with self._locked():
+            for key, raw in storage.raw_dict().iteritems():
+                self.__setitem__(key, raw, raw=True)
+            self.compact()
+
+    def _is_expired(self, timestamp, now=None):
+        if self._ttl_seconds is None:
+            return False
+        return timestamp + self._ttl_seconds < (now or time.time())
+
+    def _get_timestamp(self, key):
+        try:
+            return self._items[key][1]
+        except KeyError:
+            return None
+
+    def _track_expiry(self, key, timestamp):
+        if self._ttl_seconds is None:
+            return
+        with self._expiry_lock:
+            heapq.heappush(self._expiry_heap, (timestamp + self._ttl_seconds, key))
+            # len(self) would refresh, which takes the expiry lock again when the files changed
+            if len(self._expiry_heap) > 2 * self._entry_count() + 64:
+                # drop entries of keys which were set again or removed
+                self._expiry_heap = [(deadline, key) for deadline, key in self._expiry_heap
+                                     if self._get_timestamp(key) is not None and
+                                     self._get_timestamp(key) + self._ttl_seconds == deadline]
+                heapq.heapify(self._expiry_heap)
+
+    def _entry_count(self):
+        return len(self._items)
+
+    def _reset(self):
+        _Storage._reset(self)
+        with self._expiry_lock:
+            self._expiry_heap = []
+
+    def _apply(self, op, path, value):
+        super(TimedStorage, self)._apply(op, path, value)
+        timestamp = self._get_timestamp(path[0])
+        if timestamp is not None:
+            self._track_expiry(path[0], timestamp)
+
+    def _wrap(self, value):
+        return value, time.time()
+
+    def _unwrap(self, raw):
+        return raw[0]
+
     def initial_update(self, mapping):
         '''Initially fills the underlying dictionary with keys, values and
         timestamps.
         '''
         for key, val in mapping.items():
             _, timestamp = val
-            if not self.TTL or (datetime.utcnow() -
-                                    datetime.utcfromtimestamp(timestamp) < self.TTL):
+            if not self._is_expired(timestamp):
                 self.__setitem__(key, val, raw=True)
+
+
+class LazyTimedStorage(TimedStorage):
+    """A TimedStorage which only loads a key index when opened.
+
+    The snapshot holds every value as its own pickle, followed by an index of
+    key -> (offset, length, timestamp). Values are unpickled on first access
+    and then kept in a LRU cache of at most cache_size entries. Entries which
+    are set, touched or replayed from the journal are pinned in memory until
+    the next snapshot is written. Plain pickle snapshots are still read and
+    rewritten in the indexed format on the next snapshot.
+    """
+
+    MAGIC = 'LUNAIDX1'
+    _TRAILER = struct.Struct('<Q')  # offset of the index
+
+    def __init__(self, filename, file_format='pickle', TTL=None, journal=False, cache_size=256):
+        self.cache_size = cache_size
+        self._index = {}
+        self._cache = collections.OrderedDict()
+        self._reader = None
+        self._reader_lock = threading.Lock()
+        self._next_index = None
+        TimedStorage.__init__(self, filename, file_format, TTL, journal)
+
+    def __setitem__(self, key, val, raw=False):
+        with self._lock_mutex:
+            self._index.pop(key, None)
+            self._cache.pop(key, None)
+            TimedStorage.__setitem__(self, key, val, raw)
+
+    def __getitem__(self, key):
+        self._check_for_changes()
+        with self._lock_mutex:
+            if key in self._items:
+                return TimedStorage.__getitem__(self, key)
+            try:
+                raw = self._cache.pop(key)
+            except KeyError:
+                offset, length, timestamp = self._index[key]
+                raw = (self._read_value(offset, length), timestamp)
+            self._cache[key] = raw
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            val, timestamp = raw
+            if self._is_expired(timestamp):
+                del self[key]
+                raise KeyError(key)
+        return val
+
+    def __delitem__(self, key):
+        with self._lock_mutex:
+            self._cache.pop(key, None)
+            if self._index.pop(key, None) is None:
+                self._items.__delitem__(key)
+            else:
+                self._items.pop(key, None)
+            self._dirty.add((key,))
+
+    def __contains__(self, key):
+        self._check_for_changes()
+        if key in self._items:
+            return not self._is_expired(self._items[key][1])
+        if key in self._index:
+            return not self._is_expired(self._index[key][2])
+        return False
+
+    def __iter__(self):
+        self._check_for_changes()
+        return itertools.chain(iter(self._items), iter(self._index))
+
+    def __len__(self):
+        self._check_for_changes()
+        return len(self._items) + len(self._index)
+
+    def raw_dict(self):
+        """Returns a dict of all entries, unpickling every value"""
+        raw = dict(self._items)
+        for key in self._index:
+            raw[key] = (self[key], self._index[key][2])
+        return raw
+
+    def clear(self):
+        with self._lock_mutex:
+            for key in self:
+                self._dirty.add((key,))
+            self._items.clear()
+            self._index.clear()
+            self._cache.clear()
+        if self.journal:
+            self.compact()
+        else:
+            self.sync()
+
+    def close(self):
+        TimedStorage.close(self)
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _live_items(self):
+        return self._items
+
+    def _entry_count(self):
+        return len(self._items) + len(self._index)
+
+    def _reset(self):
+        TimedStorage._reset(self)
+        self._index = {}
+        self._cache.clear()
+
+    def _get_timestamp(self, key):
+        if key in self._index:
+            return self._index[key][2]
+        return TimedStorage._get_timestamp(self, key)
+
+    def _pin(self, key):
+        if key in self._index:
+            try:
+                self[key]
+            except KeyError:
+                return  # expired
+            self._items[key] = self._cache.pop(key)
+            del self._index[key]
+
+    def load(self, fileobj):
+        if fileobj.read(len(self.MAGIC)) != self.MAGIC:
+            return TimedStorage.load(self, fileobj)
+        try:
+            fileobj.seek(-self._TRAILER.size, os.SEEK_END)
+            fileobj.seek(self._TRAILER.unpack(fileobj.read(self._TRAILER.size))[0])
+            index = pickle.load(fileobj)
+        except Exception:
+            raise ValueError('File not in a supported format')
+        self._index = dict((key, entry) for key, entry in index.iteritems() if not self._is_expired(entry[2]))
+        for key, (_, _, timestamp) in self._index.iteritems():
+            self._track_expiry(key, timestamp)
+        self._open_reader()
+
+    def dump(self, fileobj):
+        """Writes the indexed format, copying unchanged values without unpickling them"""
+        index = {}
+        fileobj.write(self.MAGIC)
+        for key, (offset, length, timestamp) in sorted(self._index.items(), key=lambda entry: entry[1][0]):
+            index[key] = (fileobj.tell(), length, timestamp)
+            fileobj.write(self._read_bytes(offset, length))
+        for key, (val, timestamp) in self._items.iteritems():
+            data = pickle.dumps(val, 2)
+            index[key] = (fileobj.tell(), len(data), timestamp)
+            fileobj.write(data)
+        index_offset = fileobj.tell()
+        pickle.dump(index, fileobj, 2)
+        fileobj.write(self._TRAILER.pack(index_offset))
+        self._next_index = index
+
+    def _write_snapshot(self):
+        TimedStorage._write_snapshot(self)
+        for key, raw in self._items.iteritems():
+            self._cache[key] = raw
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        self._items.clear()
+        self._index = self._next_index
+        self._next_index = None
+        self._open_reader()
+
+    def _open_reader(self):
+        with self._reader_lock:
+            if self._reader is not None:
+                self._reader.close()
+            self._reader = open(self.filename, 'rb')
+
+    def _read_bytes(self, offset, length):
+        with self._reader_lock:
+            self._reader.seek(offset)
+            return self._reader.read(length)
+
+    def _read_value(self, offset, length):
+        return pickle.loads(self._read_bytes(offset, length))
@@ -0,0 +1,58 @@
+import os
+
+from resources.lib.storageengine.sqlitestorage import SqliteStorage
+from resources.lib.storageengine.storage import LazyTimedStorage, TimedStorage
+
+SQLITE_SUFFIXES = (SqliteStorage.FILE_SUFFIX, SqliteStorage.FILE_SUFFIX + '-wal', SqliteStorage.FILE_SUFFIX + '-shm')
+
+
+def get_storage_files(filename, backend):
+    """
+    Returns the files a storage of the given backend keeps next to filename
+    :param filename: path of the storage without a backend suffix
+    :rtype: list[str]
+    """
+    if backend == 'sqlite':
+        return [filename + suffix for suffix in SQLITE_SUFFIXES]
+    return [filename, filename + TimedStorage.JOURNAL_SUFFIX, filename + TimedStorage.LOCK_SUFFIX]
+
+
+def open_storage(filename, logger, file_format='pickle', TTL=None, journal=False, backend='pickle', lazy=False):
+    """
+    Opens the storage at filename with the given backend. If the storage was last written with the other backend,
+    e.g. because the game_storage_backend setting was switched, its items are moved over and its files removed, so
+    switching back and forth never leaves the stored data behind.
+    :param filename: path of the storage without a backend suffix
+    :rtype: TimedStorage | SqliteStorage
+    """
+    if backend == 'sqlite':
+        storage = SqliteStorage(filename + SqliteStorage.FILE_SUFFIX, TTL)
+        if _exists(get_storage_files(filename, 'pickle')):
+            logger.info('Migrating storage "%s" to sqlite' % os.path.basename(filename))
+            storage.import_storage(LazyTimedStorage(filename, file_format, journal=True))
+            _remove(get_storage_files(filename, 'pickle'))
+        return storage
+
+    if lazy:
+        storage = LazyTimedStorage(filename, file_format, TTL, journal)
+    else:
+        storage = TimedStorage(filename, file_format, TTL, journal)
+    if _exists(get_storage_files(filename, 'sqlite')):
+        logger.info('Migrating storage "%s" to pickle' % os.path.basename(filename))
+        sqlite_storage = SqliteStorage(filename + SqliteStorage.FILE_SUFFIX)
+        try:
+            storage.import_storage(sqlite_storage)
+        finally:
+            sqlite_storage.close()
+        _remove(get_storage_files(filename, 'sqlite'))
+    return storage
+
+
+def _exists(paths):
+    return any(os.path.exists(path) for path in paths)
+
+
+def _remove(paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,18 @@
+from resources.lib.util.stoppablethread import StoppableThread
+
+
+class VacuumThread(StoppableThread):
+    """Periodically removes expired items from all storages loaded by core"""
+    def __init__(self, core, interval=300):
+        self.core = core
+        self.interval = interval
+        StoppableThread.__init__(self)
+
+    def run(self):
+        while not self.stopped():
+            self._stop.wait(self.interval)
+            if not self.stopped():
+                self.core.vacuum_storages()
+
+    def cleanup(self):
+        pass
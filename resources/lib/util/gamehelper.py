@@ -1,4 +1,3 @@
-import xbmcgui
 from resources.lib.model.game import Game
 
 
@@ -12,11 +11,22 @@ class GameHelper(object):
 
     def get_games(self, host, silent=False):
         """
-        Fills local game storage with scraper results (if enabled) or game names (if scrapers are disabled)
+        Syncs the local game storage with the host's game list. Nothing but serverinfo is requested if the host's
+        gamelistid didn't change since the last sync. Otherwise only apps which were added are scraped (if enabled)
+        and only apps which were removed are dropped, while the other games only get the images which changed on the
+        host.
         """
+        games = self.game_manager.get_games(host)
+        gamelist_id = self.moonlight_helper.get_gamelist_id()
+        if gamelist_id is not None and len(games) > 0 and \
+                gamelist_id == self.game_manager.get_synced_gamelist_id(host):
+            self.logger.info("Game list %s of host %s is unchanged" % (gamelist_id, host.name))
+            return games
+
         game_list = self.moonlight_helper.list_games()
 
         if game_list is None or len(game_list) == 0:
+            import xbmcgui
             xbmcgui.Dialog().notification(
                 self.core.string('name'),
                 'Getting game list failed. ' +
@@ -26,68 +36,65 @@ class GameHelper(object):
             )
             return
 
-        if not silent:
+        app_ids = set(nvapp.id for nvapp in game_list)
+        added = [nvapp for nvapp in game_list if nvapp.id not in games]
+        unchanged = [nvapp for nvapp in game_list if nvapp.id in games]
+        removed = [id for id in games if id not in app_ids]
+        self.logger.info("Syncing game list %s of host %s: %s added, %s removed, %s unchanged" % (
+            gamelist_id, host.name, len(added), len(removed), len(game_list) - len(added)))
+
+        if not silent and added:
+            import xbmcgui
             progress_dialog = xbmcgui.DialogProgress()
             progress_dialog.create(
                 self.core.string('name'),
                 'Refreshing Game List'
             )
+            bar_movement = int(1.0 / len(added) * 100)
 
-        if not silent:
-            if game_list is None or len(game_list) == 0:
-                xbmcgui.Dialog().notification(
-                    self.core.string('name'),
-                    self.core.string('empty_game_list')
-                )
-                return
-
-        bar_movement = int(1.0 / len(game_list) * 100)
-
-        # TODO: storage should be closed after access -> need to build a list(!!) of games and add them all together
-        games = self.game_manager.get_games(host)
-        game_version_storage = self.core.get_storage('game_version')
-
-        cache = {}
-        if game_version_storage.get('version') == Game.version:
-            cache = games.copy()
-
-        games.clear()
+        new_games = []
+        game_queries = self.scraper_chain.query_games_information(added)
 
-        self.game_manager.remove_games(host)
-
-        i = 1
-        for nvapp in game_list:
+        for i, (nvapp, game_query) in enumerate(game_queries, 1):
             if not silent:
-                progress_dialog.update(bar_movement * i, 'Processing: %s' % nvapp.title, '')
-            game = Game(nvapp.title, host.uuid)
+                progress_dialog.update(bar_movement * i, 'Processing: %s' % nvapp.title,
+                                       'Getting Information from Online Sources')
             self.logger.info("Processing: %s" % nvapp.title)
-
-            if nvapp.id in cache:
-                if not games.get(nvapp.id):
-                    if not silent:
-                        progress_dialog.update(bar_movement * i, line2='Restoring information from cache')
-                    games[nvapp.id] = cache.get(nvapp.id)
-                    self.logger.info("Restored information from cache")
-            else:
-                try:
-                    if not silent:
-                        progress_dialog.update(bar_movement * i, line2='Getting Information from Online Sources')
-                    games[nvapp.id] = self.scraper_chain.query_game_information(nvapp)
-                    self.logger.info("Loaded information from online sources")
-                except KeyError:
-                    self.logger.info(
-                        'Key Error thrown while getting information for game {0}: {1}'
-                        .format(nvapp.title,
-                                KeyError.message))
-                    games[nvapp.id] = game
-            i += 1
-
-        game_version_storage.clear()
-        game_version_storage['version'] = Game.version
-
-        for id, game in games.iteritems():
-            self.game_manager.add_game(host, game)
-        game_version_storage.sync()
+            # scrapers of the following games keep running while this one is waited for
+            try:
+                game = game_query()
+                self.logger.info("Loaded information from online sources")
+            except KeyError:
+                self.logger.info(
+                    'Key Error thrown while getting information for game {0}: {1}'
+                    .format(nvapp.title,
+                            KeyError.message))
+                game = Game(nvapp.title, host.uuid, nvapp.id)
+            new_games.append(game)
+
+        game_queries.close()
+
+        refreshed_games = []
+        for id, paths in self.scraper_chain.refresh_images(unchanged).iteritems():
+            game = games[id]
+            for old_path, new_path in paths.iteritems():
+                game.replace_poster(old_path, new_path)
+            refreshed_games.append(game)
+        if refreshed_games:
+            self.logger.info("Images of %s games changed on host %s" % (len(refreshed_games), host.name))
+
+        with self.game_manager.batch():
+            self.game_manager.remove_games_by_id(host, removed)
+            self.game_manager.add_games(host, new_games + refreshed_games)
+        self.game_manager.set_synced_gamelist_id(host, gamelist_id)
+
+        for id in removed:
+            del games[id]
+        for nvapp, game in zip(added, new_games):
+            games[nvapp.id] = game
+
+        if not silent and added:
+            progress_dialog.close()
 
         return games
 
@@ -119,6 +119,7 @@ class MoonlightHelper:
     def launch_game(self, game_id):
         self.config_helper.configure()
         host = self.host_context_service.get_current_context()
+        host_ip = self.request_service.get_host_ip()
 
         (pre_script, post_script) = self.core.prepare_init_scripts()
 
@@ -128,7 +129,7 @@ class MoonlightHelper:
             self.internal_path + '/resources/lib/launchscripts/osmc/launch-helper-osmc.sh',
             self.internal_path + '/resources/lib/launchscripts/osmc/launch.sh',
             self.internal_path + '/resources/lib/launchscripts/osmc/moonlight-heartbeat.sh',
-            host.local_ip,
+            host_ip,
             host.key_dir,
             game_id,
             self.config_helper.get_config_path(),
@@ -136,6 +137,20 @@ class MoonlightHelper:
             pre_script,
             post_script
         ])
+        # the host is in a different state (current game) after a session
+        self.request_service.invalidate_server_info(host_ip)
 
     def list_games(self):
         return self.request_service.get_app_list()
+
+    def get_gamelist_id(self):
+        """
+        Asks the current host for the id of its game list, which changes whenever apps are added or removed
+        :rtype: str
+        :return: the gamelistid or None if the host didn't send one or couldn't be reached
+        """
+        try:
+            return self.request_service.get_computer_details().gamelist_id or None
+        except Exception as e:
+            self.logger.warning("Getting game list id failed: %s" % e)
+            return None
@@ -2,7 +2,7 @@
 #
 # NOTE: This dynamically typed stub was automatically generated by stubgen.
 
-from typing import Any, List
+from typing import Any, List, Union
 
 from resources.lib.core.corefunctions import Core
 from resources.lib.core.logger import Logger
@@ -33,3 +33,4 @@ class MoonlightHelper:
     def pair_host(self, dialog: DialogProgress) -> (str, str): ...
     def launch_game(self, game_id: str) -> None: ...
     def list_games(self) -> List[NvApp]: ...
+    def get_gamelist_id(self) -> Union[str, None]: ...
@@ -0,0 +1,28 @@
+_pool = {}
+
+
+def intern_string(value):
+    """
+    Returns a shared instance of value, so equal strings like genres or art directories are held in memory once.
+    Unlike the intern builtin this accepts unicode as well.
+    """
+    if value is None:
+        return None
+    return _pool.setdefault(value, value)
+
+
+def split_path(path):
+    """
+    Splits a path or url after its last slash into a shared prefix and the file name
+    :rtype: (str, str)
+    """
+    if path is None:
+        return None, None
+    index = path.rfind('/') + 1
+    return intern_string(path[:index]), path[index:]
+
+
+def join_path(prefix, name):
+    if prefix is None:
+        return None
+    return prefix + name
@@ -45,5 +45,5 @@ class GameInfo(WindowXMLDialog):
 
         self.connect(xbmcgui.ACTION_NAV_BACK, self.close)
         self.connect(self.play_btn, lambda: self.controller.render("game_launch", {'game': self.game}))
-        self.connect(self.select_poster_btn, lambda: self.controller.select_cover_art(self.game, item))
-        self.connect(self.select_fanart_btn, lambda: self.controller.select_fanart(self.game, item))
+        self.connect(self.select_poster_btn, lambda: self.controller.select_cover_art(self.host, self.game, item))
+        self.connect(self.select_fanart_btn, lambda: self.controller.select_fanart(self.host, self.game, item))
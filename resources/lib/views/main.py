@@ -1,4 +1,6 @@
 import os
+import threading
+
 import xbmcaddon
 import xbmcgui
 
@@ -10,12 +12,14 @@ class Main(WindowXML):
     def __new__(cls, *args, **kwargs):
         return super(Main, cls).__new__(cls, 'main.xml', xbmcaddon.Addon().getAddonInfo('path'))
 
-    def __init__(self, controller, hosts):
+    def __init__(self, controller, hosts, host_states=None):
         super(Main, self).__init__('main.xml', xbmcaddon.Addon().getAddonInfo('path'))
         self.controller = controller
         self.hosts = hosts
+        self.host_states = host_states or {}
         self.list = None
         self.host_index_key_map = {}
+        self.host_lock = threading.Lock()
         self.options_list = None
         self.settings_item = None
         self.add_host_item = None
@@ -36,19 +40,20 @@ class Main(WindowXML):
     def build_list(self):
         items = []
         i = 0
-        for key, host in self.hosts.iteritems():
-            item = xbmcgui.ListItem()
-            item.setLabel(host.name)
-            item.setProperty('state', str(host.state))
-            item.setProperty('uuid', host.uuid)
-            item.setThumbnailImage(
-                os.path.join(xbmcaddon.Addon().getAddonInfo('path'), 'resources/icons/host.png'))
+        with self.host_lock:
+            for key, host in self.hosts.iteritems():
+                item = xbmcgui.ListItem()
+                item.setLabel(host.name)
+                item.setProperty('state', str(self.host_states.get(host.uuid, host.state)))
+                item.setProperty('uuid', host.uuid)
+                item.setThumbnailImage(
+                    os.path.join(xbmcaddon.Addon().getAddonInfo('path'), 'resources/icons/host.png'))
 
-            items.append(item)
-            self.host_index_key_map[host.uuid] = i
-            i += 1
+                items.append(item)
+                self.host_index_key_map[host.uuid] = i
+                i += 1
 
-        self.list.addItems(items)
+            self.list.addItems(items)
 
         self.settings_item = xbmcgui.ListItem('Settings')
 
@@ -74,20 +79,20 @@ class Main(WindowXML):
         self.hosts = self.controller.get_hosts()
         self.list.reset()
         self.options_list.reset()
-        self.host_index_key_map.clear()
+        with self.host_lock:
+            self.host_index_key_map.clear()
         self.build_list()
 
-    def update_host_status(self, hosts):
-        while len(hosts) != len(self.host_index_key_map):
-            import xbmc
-            xbmc.sleep(500)
-
-        for key, host in hosts.iteritems():
-            index = self.host_index_key_map[key]
-            list_item = self.list.getListItem(index)
-            list_item.setProperty('state', str(host[0].state))
-
-        return
+    def update_host_state(self, uuid, state):
+        """
+        Shows the state of a host as soon as it is known. States which arrive before the list is built are applied
+        by build_list.
+        """
+        with self.host_lock:
+            self.host_states[uuid] = state
+            index = self.host_index_key_map.get(uuid)
+            if index is not None:
+                self.list.getListItem(index).setProperty('state', str(state))
 
     def onAction(self, action):
         if action == xbmcgui.ACTION_NAV_BACK:
@@ -1,9 +1,33 @@
+import xbmc
 import xbmcaddon
 
 __addon__ = xbmcaddon.Addon()
 
+
+def run_discovery_registry():
+    """Keeps the mDNS discovery registry running until Kodi shuts down"""
+    from resources.lib.di import featurebroker
+    from resources.lib.di.featurebroker import FeatureBroker
+    from resources.lib.di.requiredfeature import RequiredFeature
+
+    featurebroker.features = FeatureBroker()
+    featurebroker.features._parse_config()
+    featurebroker.features.execute_calls()
+
+    discovery_registry = RequiredFeature('discovery-registry').request()
+    if not discovery_registry.start():
+        return
+
+    monitor = xbmc.Monitor()
+    try:
+        while not monitor.waitForAbort(10):
+            pass
+    finally:
+        discovery_registry.stop()
+
+
 if __name__ == '__main__':
-    pass
+    run_discovery_registry()
     # if __addon__.getSetting("luna_widget_enable") == 'true':
     #     import xbmcgui
     #     from resources.lib.di.requiredfeature import RequiredFeature
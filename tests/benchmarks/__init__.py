@@ -0,0 +1,50 @@
+import os
+import resource
+from datetime import timedelta
+
+from resources.lib.model.fanart import Fanart
+from resources.lib.model.game import Game
+from resources.lib.storageengine.storagemigration import open_storage
+
+
+class BenchmarkCore(object):
+    """Provides the parts of Core the storage layer needs, without Kodi"""
+    def __init__(self, storage_path, journal=True, backend='pickle', lazy=True):
+        self.storage_path = storage_path
+        self.journal = journal
+        self.backend = backend
+        self.lazy = lazy
+
+    def get_setting(self, setting_id, return_type=None):
+        return {'game_storage_backend': self.backend}.get(setting_id, '')
+
+    def get_storage(self, name='game_storage', file_format='pickle', TTL=None, journal=False, backend='pickle',
+                    lazy=False):
+        if TTL:
+            TTL = timedelta(minutes=TTL)
+        return open_storage(os.path.join(self.storage_path, name), BenchmarkLogger(), file_format, TTL,
+                            journal and self.journal, backend, lazy and self.lazy)
+
+
+class BenchmarkLogger(object):
+    def info(self, text):
+        pass
+
+
+def build_game(host, i):
+    game = Game('Game %s' % i, host.uuid, str(i), '2016', ['Action', 'Adventure'], 'Plot ' * 40)
+    game.posters = ['/storage/art/poster/%s/%s.png' % (i, i)]
+    for j in range(5):
+        art = Fanart('http://thegamesdb.net/banners/fanart/original/%s-%s.jpg' % (i, j),
+                     '/storage/art/fanart/%s/%s-%s.jpg' % (i, i, j))
+        game.fanarts[os.path.basename(art.get_thumb())] = art
+    return game
+
+
+def resident_kib():
+    """Current resident set size of this process"""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
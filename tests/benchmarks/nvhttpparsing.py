@@ -0,0 +1,129 @@
+"""
+Compares reading NvHTTP responses the previous way (trial decodes with info logging on every parse, the raw string
+re-encoded to UTF-16 and parsed again for every field) against the response objects which are parsed once, on a
+recorded serverinfo, a pair step and applists of 10 and 500 apps.
+
+Usage: python -m tests.benchmarks.nvhttpparsing [repetitions]
+"""
+import re
+import sys
+import timeit
+import xml.etree.ElementTree as ETree
+
+from resources.lib.model.nvapp import NvApp
+from resources.lib.nvhttp.response.applistresponse import AppListResponse
+from resources.lib.nvhttp.response.pairresponse import PairResponse
+from resources.lib.nvhttp.response.serverinforesponse import ServerInfoResponse
+from tests.testnvhttpresponse import SERVER_INFO
+
+SERVER_INFO_FIELDS = ('hostname', 'uniqueid', 'mac', 'LocalIP', 'ExternalIP', 'PairStatus', 'gputype', 'gamelistid',
+                      'appversion')
+PAIR = ('<?xml version="1.0" encoding="UTF-16"?><root protocol_version="0.1" query="pair" status_code="200" '
+        'status_message="OK"><challengeresponse>%s</challengeresponse><isBusy>0</isBusy><paired>1</paired>'
+        '<pairingsecret>%s</pairingsecret></root>' % ('A0' * 48, 'B1' * 272))
+APP = ('<App><AppInstallPath>C:\\Games\\Game %s\\</AppInstallPath><AppTitle>Game %s</AppTitle>'
+       '<Distributor>Steam</Distributor><ID>%s</ID><MaxControllersForSingleSession>4</MaxControllersForSingleSession>'
+       '<ShortName>game%s</ShortName></App>')
+
+
+def build_app_list(number_of_apps):
+    return ('<?xml version="1.0" encoding="UTF-16"?><root protocol_version="0.1" query="applist" status_code="200" '
+            'status_message="OK">%s</root>' % ''.join(APP % (i, i, i, i) for i in range(number_of_apps)))
+
+
+class LegacyLogger(object):
+    def info(self, text):
+        pass
+
+
+def legacy_re_encode_string(logger, xml_string):
+    specified_encoding = re.compile('UTF-\d{1,2}').search(xml_string)
+    logger.info("Trying to decode as: %s" % 'ASCII')
+    try:
+        xml_string = xml_string.decode(encoding='ascii')
+    except UnicodeDecodeError:
+        logger.info("Decoding as %s failed, trying as %s" % ('ASCII', 'UTF-8'))
+        try:
+            xml_string = xml_string.decode(encoding='UTF-8')
+        except UnicodeDecodeError:
+            logger.info("Decoding as %s failed, trying as %s" % ('UTF-8', 'UTF-16'))
+            xml_string = xml_string.decode(encoding='UTF-16')
+    if specified_encoding is not None:
+        logger.info("Trying to encode as specified in XML: %s" % specified_encoding.group(0))
+        return xml_string.encode(encoding=specified_encoding.group(0))
+    logger.info("Trying to encode as: UTF-8")
+    return xml_string.encode(encoding='UTF-8')
+
+
+def legacy_get_xml_string(server_info, tag):
+    if isinstance(server_info, str):
+        server_info = ETree.ElementTree(ETree.fromstring(server_info.encode('utf-16'))).getroot()
+    element = server_info.find(tag)
+    return element.text if element is not None else ''
+
+
+def legacy_server_info(xml_string):
+    root = ETree.fromstring(legacy_re_encode_string(LegacyLogger(), xml_string))
+    fields = [legacy_get_xml_string(root, tag) for tag in SERVER_INFO_FIELDS]
+    # pair state and current game were read from the raw string
+    fields.append(legacy_get_xml_string(xml_string, 'PairStatus'))
+    fields.append(legacy_get_xml_string(xml_string, 'state'))
+    return fields
+
+
+def legacy_pair(xml_string):
+    return [legacy_get_xml_string(xml_string, tag) for tag in ('paired', 'paired', 'challengeresponse')]
+
+
+def legacy_app_list(xml_string):
+    applist = []
+    for app in ETree.fromstring(legacy_re_encode_string(LegacyLogger(), xml_string)).findall('App'):
+        nvapp = NvApp()
+        if app.find('AppInstallPath') is not None:
+            nvapp.install_path = app.find('AppInstallPath').text
+        if app.find('AppTitle') is not None:
+            nvapp.title = app.find('AppTitle').text.encode('UTF-8')
+        if app.find('Distributor') is not None:
+            nvapp.distributor = app.find('Distributor').text
+        if app.find('ID') is not None:
+            nvapp.id = app.find('ID').text
+        if app.find('MaxControllersForSingleSession') is not None:
+            nvapp.max_controllers = app.find('MaxControllersForSingleSession').text
+        if app.find('ShortName') is not None:
+            nvapp.short_name = app.find('ShortName').text
+        applist.append(nvapp)
+    return applist
+
+
+def server_info(xml_string):
+    response = ServerInfoResponse.parse(xml_string)
+    return [response.hostname, response.unique_id, response.mac_address, response.local_ip, response.external_ip,
+            response.pair_status, response.gpu_type, response.gamelist_id, response.server_version,
+            response.pair_status, response.current_game]
+
+
+def pair(xml_string):
+    response = PairResponse.parse(xml_string)
+    return [response.paired, response.paired, response.challenge_response]
+
+
+def app_list(xml_string):
+    return AppListResponse.parse(xml_string).apps
+
+
+def main(repetitions=200):
+    payloads = [
+        ('serverinfo', SERVER_INFO, legacy_server_info, server_info, repetitions),
+        ('pair step', PAIR, legacy_pair, pair, repetitions),
+        ('applist 10', build_app_list(10), legacy_app_list, app_list, repetitions),
+        ('applist 500', build_app_list(500), legacy_app_list, app_list, max(1, repetitions / 10)),
+    ]
+    print '%-12s %8s %12s %12s %8s' % ('payload', 'bytes', 'before (ms)', 'after (ms)', 'speedup')
+    for name, payload, legacy, current, number in payloads:
+        before = min(timeit.repeat(lambda: legacy(payload), number=number, repeat=3)) / number * 1000
+        after = min(timeit.repeat(lambda: current(payload), number=number, repeat=3)) / number * 1000
+        print '%-12s %8s %12.3f %12.3f %7.1fx' % (name, len(payload), before, after, before / after)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
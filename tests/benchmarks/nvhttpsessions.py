@@ -0,0 +1,58 @@
+"""
+Sends rounds of serverinfo, applist and appasset requests from RequestService to a local NvHTTP stand-in over TLS,
+once like before (a new connection and handshake per request, HTTPS tried first on every serverinfo) and once with
+the per host session pool and scheme memory, for a paired and an unpaired host.
+
+Usage: python -m tests.benchmarks.nvhttpsessions [rounds] [latency in ms]
+"""
+import shutil
+import sys
+import tempfile
+import time
+
+import requests
+
+from tests.nvhttpstandin import NvHttpStandIn
+
+
+def run(standin, rounds, pooled):
+    request_service = standin.build_request_service(server_info_ttl=0)
+    if not pooled:
+        # module level requests.get, and no scheme memory
+        request_service._get_session = lambda host, cert=None: requests
+        request_service.SCHEME_TTL = -1
+    handshakes = standin.handshakes
+    number_of_requests = len(standin.requests)
+
+    start = time.time()
+    for _ in range(rounds):
+        request_service.get_computer_details()
+        if standin.paired:
+            request_service.get_app_list()
+            request_service.get_box_art('1')
+    elapsed = time.time() - start
+
+    return elapsed, standin.handshakes - handshakes, len(standin.requests) - number_of_requests
+
+
+def main(rounds=50, latency=2):
+    requests.packages.urllib3.disable_warnings()
+    path = tempfile.mkdtemp()
+    try:
+        print '%s rounds, %s ms server latency' % (rounds, latency)
+        for paired in (True, False):
+            standin = NvHttpStandIn(path, paired=paired, latency=latency / 1000.0)
+            try:
+                for label, pooled in (('before', False), ('after', True)):
+                    elapsed, handshakes, number_of_requests = run(standin, rounds, pooled)
+                    print '%-8s %-6s %8.3f s %6.2f ms/round %5s TLS handshakes %5s requests' % (
+                        'paired' if paired else 'unpaired', label, elapsed, elapsed * 1000 / rounds, handshakes,
+                        number_of_requests)
+            finally:
+                standin.shutdown()
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,113 @@
+"""
+Scrapes a synthetic library through ScraperChain against local stand-in APIs which answer after a fixed latency, once
+with a single worker (the previous one call after another behaviour) and once with the default worker pool.
+
+Usage: python -m tests.benchmarks.scraperchain [number of games] [latency in ms]
+"""
+import BaseHTTPServer
+import SocketServer
+import json
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib2
+
+from resources.lib.model.apiresponse import ApiResponse
+from resources.lib.model.nvapp import NvApp
+from resources.lib.scraper.abcscraper import AbstractScraper
+from resources.lib.scraper.scraperchain import ScraperChain
+from tests.benchmarks import BenchmarkCore, BenchmarkLogger
+
+
+class LatencyServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency):
+        self.latency = latency
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), LatencyHandler)
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+
+class LatencyHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        body = json.dumps({'plot': 'Plot of %s' % self.path[1:], 'genre': ['Action']})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInScraper(AbstractScraper):
+    def __init__(self, core, scraper_name, server, max_concurrency):
+        AbstractScraper.__init__(self, core)
+        self.scraper_name = scraper_name
+        self.url = 'http://127.0.0.1:%s/%%s' % server.server_address[1]
+        self.max_concurrency = max_concurrency
+
+    def name(self):
+        return self.scraper_name
+
+    def get_game_information(self, nvapp):
+        response = json.load(urllib2.urlopen(self.url % nvapp.id))
+        # like the real scrapers, genres are handed out as str
+        return ApiResponse(nvapp.title, plot=response['plot'], genre=[str(genre) for genre in response['genre']])
+
+    def return_paths(self):
+        return []
+
+    def is_enabled(self):
+        return True
+
+
+class BenchmarkChainLogger(BenchmarkLogger):
+    def warning(self, text):
+        print text
+
+
+def run(core, servers, nvapps, max_workers):
+    chain = ScraperChain(core, None, None, BenchmarkChainLogger())
+    chain.max_workers = max_workers
+    chain.append([StandInScraper(core, name, server, max_concurrency)
+                  for name, max_concurrency, server in servers])
+
+    start = time.time()
+    games = [game_query() for _, game_query in chain.query_games_information(nvapps)]
+    elapsed = time.time() - start
+
+    assert [game.id for game in games] == [nvapp.id for nvapp in nvapps]
+    return elapsed, chain.report['requests']
+
+
+def main(number_of_games=100, latency=20):
+    path = tempfile.mkdtemp()
+    try:
+        core = BenchmarkCore(path)
+        servers = [(name, max_concurrency, LatencyServer(latency / 1000.0))
+                   for name, max_concurrency in (('NvHTTP', 2), ('TGDB', 4), ('OMDB', 2), ('IGDB', 2))]
+        nvapps = []
+        for i in range(number_of_games):
+            nvapp = NvApp()
+            nvapp.id = str(i)
+            nvapp.title = 'Game %s' % i
+            nvapps.append(nvapp)
+
+        print '%s games, %s scrapers, %s ms latency per request' % (number_of_games, len(servers), latency)
+        for label, max_workers in (('sequential', 1), ('pool', 8)):
+            elapsed, requests = run(core, servers, nvapps, max_workers)
+            print '%-10s %2s workers %8.2f s %8.1f games/s %6s requests' % (
+                label, max_workers, elapsed, number_of_games / elapsed, requests)
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,54 @@
+"""
+Compares the pickle and sqlite game storage backends: N incremental add_game calls, a cold
+get_game_by_id (open storage + one lookup) and a full get_games.
+
+Usage: python -m tests.benchmarks.storagebackends [number of games ...]
+"""
+import shutil
+import sys
+import tempfile
+import time
+
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.repository.gamerepository import GameRepository
+from tests.benchmarks import BenchmarkCore, BenchmarkLogger, build_game
+
+
+def run(number_of_games, backend):
+    path = tempfile.mkdtemp()
+    try:
+        host = HostDetails()
+        host.uuid = 'benchmark-host'
+        games = [build_game(host, i) for i in range(number_of_games)]
+
+        repository = GameRepository(BenchmarkCore(path, backend=backend), BenchmarkLogger())
+        start = time.time()
+        for game in games:
+            repository.add_game(host, game)
+        repository._get_shard(host.uuid).close()
+        add_time = time.time() - start
+
+        start = time.time()
+        repository = GameRepository(BenchmarkCore(path, backend=backend), BenchmarkLogger())
+        repository.get_game_by_id(host, str(number_of_games / 2))
+        lookup_time = time.time() - start
+
+        start = time.time()
+        repository.get_games(host)
+        list_time = time.time() - start
+
+        return add_time, lookup_time, list_time
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main(*sizes):
+    print '%8s %8s %12s %14s %12s' % ('games', 'backend', 'add_game', 'cold lookup', 'get_games')
+    for number_of_games in sizes or (100, 1000, 10000):
+        for backend in ('pickle', 'sqlite'):
+            add_time, lookup_time, list_time = run(number_of_games, backend)
+            print '%8s %8s %11.3fs %13.4fs %11.3fs' % (number_of_games, backend, add_time, lookup_time, list_time)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
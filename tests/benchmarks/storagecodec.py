@@ -0,0 +1,95 @@
+"""
+Compares on-disk size, load time and resident memory of a synthetic game library stored with the previous record
+types (classic classes with an instance dict, headerless pickle) against the slotted records with a format header.
+Every load runs in a fresh interpreter.
+
+Usage: python -m tests.benchmarks.storagecodec [number of games]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.storageengine.storage import TimedStorage
+from tests.benchmarks import build_game, resident_kib
+
+
+class LegacyFanart:
+    def __init__(self, original, thumb):
+        self.original = original
+        self.thumb = thumb
+
+
+class LegacyGame:
+    def __init__(self, game):
+        self.name = game.name
+        self.host_uuid = game.host_uuid
+        self.id = game.id
+        self.year = game.year
+        self.genre = list(game.genre)
+        self.plot = game.plot
+        self.posters = list(game.posters)
+        self.fanarts = dict((key, LegacyFanart(art.get_original(), art.get_thumb()))
+                            for key, art in game.fanarts.iteritems())
+        self.selected_fanart = LegacyFanart(game.selected_fanart.get_original(), game.selected_fanart.get_thumb())
+        self.selected_poster = game.selected_poster
+
+
+def build_library(path, number_of_games):
+    host = HostDetails()
+    host.uuid = 'benchmark-host'
+    games = [build_game(host, i) for i in range(number_of_games)]
+
+    legacy_filename = os.path.join(path, 'legacy')
+    legacy = dict((game.id, (LegacyGame(game), time.time())) for game in games)
+    with open(legacy_filename, 'wb') as fileobj:
+        pickle.dump(legacy, fileobj, 2)
+
+    filename = os.path.join(path, 'slotted')
+    storage = TimedStorage(filename)
+    for game in games:
+        storage[game.id] = game
+    storage.sync()
+
+    return legacy_filename, filename
+
+
+def measure(filename):
+    baseline = resident_kib()
+    start = time.time()
+    storage = TimedStorage(filename)
+    elapsed = time.time() - start
+    resident = resident_kib() - baseline
+    print '%s %s %s' % (elapsed, resident, len(storage))
+
+
+def main(number_of_games=5000):
+    path = tempfile.mkdtemp()
+    try:
+        filenames = build_library(path, number_of_games)
+
+        print 'Library: %s games' % number_of_games
+        for label, filename in zip(('legacy', 'slotted'), filenames):
+            output = subprocess.check_output(
+                [sys.executable, '-m', 'tests.benchmarks.storagecodec', '--measure', filename])
+            elapsed, resident, count = output.split()
+            assert int(count) == number_of_games
+            print '%-8s %8.1f KiB on disk %8.3f s load %8.1f MiB resident' % (
+                label, os.path.getsize(filename) / 1024.0, float(elapsed), int(resident) / 1024.0)
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--measure']:
+        measure(sys.argv[2])
+    else:
+        main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,43 @@
+"""
+Compares bytes written and wall time of N incremental GameRepository.add_game calls
+with full-file syncs against the journaled storage mode.
+
+Usage: python -m tests.benchmarks.storagejournal [number of games]
+"""
+import shutil
+import sys
+import tempfile
+import time
+
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.repository.gamerepository import GameRepository
+from tests.benchmarks import BenchmarkCore, BenchmarkLogger, build_game
+
+
+def run(number_of_games, journal):
+    path = tempfile.mkdtemp()
+    try:
+        host = HostDetails()
+        host.uuid = 'benchmark-host'
+        repository = GameRepository(BenchmarkCore(path, journal), BenchmarkLogger())
+        games = [build_game(host, i) for i in range(number_of_games)]
+
+        start = time.time()
+        for game in games:
+            repository.add_game(host, game)
+        elapsed = time.time() - start
+
+        return repository._get_shard(host.uuid).bytes_written, elapsed
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main(number_of_games=400):
+    print 'Incremental add_game calls: %s' % number_of_games
+    for label, journal in (('full sync', False), ('journal', True)):
+        bytes_written, elapsed = run(number_of_games, journal)
+        print '%-10s %12.1f KiB written %8.3f s' % (label, bytes_written / 1024.0, elapsed)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
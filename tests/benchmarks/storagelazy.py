@@ -0,0 +1,71 @@
+"""
+Compares resident memory and time of opening a game shard, counting its games and loading one game by id for the eager
+TimedStorage against the index-only LazyTimedStorage. Every measurement runs in a fresh interpreter.
+
+Usage: python -m tests.benchmarks.storagelazy [number of games]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from resources.lib.model.game import Game
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.repository.gamerepository import GameRepository
+from resources.lib.storageengine.storage import LazyTimedStorage, TimedStorage
+from tests.benchmarks import BenchmarkCore, BenchmarkLogger, build_game, resident_kib
+
+
+def build_library(path, number_of_games):
+    host = HostDetails()
+    host.uuid = 'benchmark-host'
+    filename = os.path.join(path, GameRepository.SHARD_PREFIX + host.uuid)
+    storage = TimedStorage(filename)
+    for i in range(number_of_games):
+        storage[str(i)] = build_game(host, i)
+    storage.sync()
+    versions = TimedStorage(os.path.join(path, GameRepository.VERSION_STORAGE))
+    versions[host.uuid] = Game.version
+    versions.sync()
+    return filename
+
+
+def measure(path, lazy, number_of_games):
+    host = HostDetails()
+    host.uuid = 'benchmark-host'
+    baseline = resident_kib()
+    start = time.time()
+    repository = GameRepository(BenchmarkCore(path, lazy=lazy), BenchmarkLogger())
+    repository.count_games(host)
+    repository.get_game_by_id(host, str(number_of_games / 2))
+    elapsed = time.time() - start
+    resident = resident_kib() - baseline
+    print '%s %s' % (elapsed, resident)
+
+
+def main(number_of_games=5000):
+    path = tempfile.mkdtemp()
+    try:
+        filename = build_library(path, number_of_games)
+
+        print 'Library: %s games' % number_of_games
+        for label, lazy in (('eager', False), ('lazy', True)):
+            if lazy:
+                LazyTimedStorage(filename).compact()
+            output = subprocess.check_output(
+                [sys.executable, '-m', 'tests.benchmarks.storagelazy', '--measure', path, str(int(lazy)),
+                 str(number_of_games)])
+            elapsed, resident = output.split()
+            print '%-6s %8.1f KiB on disk %8.3f s open + lookup %8.1f MiB resident' % (
+                label, os.path.getsize(filename) / 1024.0, float(elapsed), int(resident) / 1024.0)
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--measure']:
+        measure(sys.argv[2], bool(int(sys.argv[3])), int(sys.argv[4]))
+    else:
+        main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,176 @@
+"""
+A local stand-in for the NvHTTP server of a GameStream host, serving HTTPS (with a self-signed certificate) and HTTP
+on two random ports, plus the collaborators RequestService needs to talk to it.
+"""
+import BaseHTTPServer
+import SocketServer
+import os
+import ssl
+import subprocess
+import threading
+import time
+import urlparse
+
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.nvhttp.reachability.reachabilityresolver import ReachabilityResolver
+from resources.lib.nvhttp.request.requestservice import RequestService
+from tests.standins import StandInLogger
+
+SERVER_INFO = ('<?xml version="1.0" encoding="utf-8" standalone="yes"?>'
+               '<root status_code="200"><hostname>Stand-In</hostname><appversion>7.1.431.0</appversion>'
+               '<uniqueid>0123456789ABCDEF</uniqueid><mac>00:11:22:33:44:55</mac><LocalIP>127.0.0.1</LocalIP>'
+               '<ExternalIP>127.0.0.1</ExternalIP><PairStatus>%s</PairStatus><gputype>GTX 1080</gputype>'
+               '<gamelistid>%s</gamelistid><state>SUNSHINE_SERVER_AVAILABLE</state></root>')
+APP = ('<App><AppTitle>Game %s</AppTitle><ID>%s</ID><IsHdrSupported>0</IsHdrSupported>'
+       '<MaxControllersForSingleSession>4</MaxControllersForSingleSession></App>')
+
+
+def has_openssl():
+    try:
+        subprocess.check_output(['openssl', 'version'])
+        return True
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+
+def make_certificate(path, name):
+    """Creates a self-signed certificate and key as <path>/<name>.crt and <path>/<name>.key"""
+    cert = os.path.join(path, name + '.crt')
+    key = os.path.join(path, name + '.key')
+    with open(os.devnull, 'w') as devnull:
+        subprocess.check_call(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                               '-subj', '/CN=%s' % name, '-keyout', key, '-out', cert], stdout=devnull, stderr=devnull)
+    return cert, key
+
+
+class NvHttpServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, standin, certificate=None):
+        self.standin = standin
+        self.secure = certificate is not None
+        self.connections = 0
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), NvHttpHandler)
+        if certificate is not None:
+            self.socket = ssl.wrap_socket(self.socket, certfile=certificate[0], keyfile=certificate[1],
+                                          server_side=True)
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def get_request(self):
+        request = BaseHTTPServer.HTTPServer.get_request(self)
+        self.connections += 1
+        return request
+
+    def handle_error(self, request, client_address):
+        # clients drop kept-alive connections without a TLS close_notify
+        pass
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class NvHttpHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        standin = self.server.standin
+        path = self.path.split('?')[0]
+        standin.requests.append((self.server.secure, path))
+        standin.clients.append((self.headers.getheader('Host').split(':')[0],
+                                urlparse.parse_qs(urlparse.urlsplit(self.path).query).get('uniqueid', [None])[0]))
+        time.sleep(standin.latency)
+
+        if self.server.secure and not standin.paired:
+            self._send(401, '<root status_code="401" status_message="The client is not authorized."/>')
+        elif path == '/serverinfo':
+            server_info = SERVER_INFO % (1 if standin.paired else 0, standin.gamelist_id)
+            if standin.gamelist_id is None:
+                server_info = server_info.replace('<gamelistid>None</gamelistid>', '')
+            self._send(200, server_info)
+        elif path == '/applist':
+            self._send(200, '<?xml version="1.0" encoding="utf-8"?><root status_code="200">%s</root>' %
+                       ''.join(APP % (i, i) for i in range(standin.number_of_apps)))
+        elif path == '/appasset':
+            self._send(200, standin.box_art, 'image/png')
+        elif path in ('/pair', '/unpair'):
+            self._send(200, '<root status_code="200"><paired>1</paired></root>')
+        else:
+            self._send(404, '<root status_code="404"/>')
+
+    def _send(self, status, body, content_type='application/xml'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class NvHttpStandIn(object):
+    def __init__(self, path, paired=True, latency=0.0, number_of_apps=10):
+        self.path = path
+        self.paired = paired
+        self.latency = latency
+        self.number_of_apps = number_of_apps
+        self.gamelist_id = '1'
+        self.box_art = '\x89PNG' + '\0' * 1024
+        self.requests = []
+        # (address the request was sent to, uniqueid it was sent with)
+        self.clients = []
+        self.server_certificate = make_certificate(path, 'server')
+        self.client_certificate = make_certificate(path, 'client')
+        self.https = NvHttpServer(self, self.server_certificate)
+        self.http = NvHttpServer(self)
+
+    @property
+    def handshakes(self):
+        return self.https.connections
+
+    def build_request_service(self, **kwargs):
+        """Returns a RequestService for the stand-in, as the current host context"""
+        host = HostDetails()
+        host.local_ip = '127.0.0.1'
+        host.key_dir = os.path.join(self.path, 'keys')
+        request_service = RequestService(None, StandInCryptoProvider(*self.client_certificate), StandInConfigHelper(),
+                                         StandInHostContextService(host),
+                                         ReachabilityResolver(StandInLogger(), port=self.http.port), StandInLogger(),
+                                         **kwargs)
+        request_service.HTTPS_PORT = self.https.port
+        request_service.HTTP_PORT = self.http.port
+        return request_service
+
+    def shutdown(self):
+        for server in (self.https, self.http):
+            server.shutdown()
+            server.server_close()
+
+
+class StandInCryptoProvider(object):
+    def __init__(self, cert, key):
+        self.cert = cert
+        self.key = key
+
+    def get_cert_path(self):
+        return self.cert
+
+    def get_key_path(self):
+        return self.key
+
+
+class StandInConfigHelper(object):
+    def configure(self, dump=True):
+        pass
+
+
+class StandInHostContextService(object):
+    def __init__(self, host):
+        self.host = host
+
+    def get_current_context(self):
+        return self.host
+
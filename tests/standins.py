@@ -0,0 +1,46 @@
+"""
+Stand-ins for the collaborators most services get injected (logger, core and response cache), shared by the tests
+which run those services without Kodi.
+"""
+import os
+from datetime import timedelta
+
+from resources.lib.storageengine.storage import TimedStorage
+
+
+class StandInLogger(object):
+    def debug(self, text):
+        pass
+
+    def info(self, text):
+        pass
+
+    def warning(self, text):
+        pass
+
+    def error(self, text):
+        pass
+
+
+class StandInCore(object):
+    """Provides settings and pickle storages in storage_path"""
+    def __init__(self, storage_path, scraper_workers=''):
+        self.storage_path = storage_path
+        self.internal_path = storage_path
+        self.scraper_workers = scraper_workers
+
+    def get_setting(self, setting_id, return_type=None):
+        return {'scraper_workers': self.scraper_workers}.get(setting_id, '')
+
+    def get_storage(self, name, TTL=None, journal=False):
+        if TTL:
+            TTL = timedelta(minutes=TTL)
+        return TimedStorage(os.path.join(self.storage_path, name), TTL=TTL, journal=journal)
+
+
+class StandInResponseCache(object):
+    def invalidate(self, scraper=None, game_id=None):
+        return 0
+
+    def get_statistics(self):
+        return {'hits': 0}
@@ -0,0 +1,127 @@
+import BaseHTTPServer
+import SocketServer
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from resources.lib.service.downloadservice import DownloadService
+from resources.lib.service.httpclientservice import HttpClientService
+from tests.standins import StandInLogger
+
+IMAGE = 'PNG' * 1000
+
+
+class ImageServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        self.requests = []
+        self.broken = True
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), ImageHandler)
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def url(self, path):
+        return 'http://127.0.0.1:%s%s' % (self.server_address[1], path)
+
+
+class ImageHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('Range')))
+        if self.path == '/missing.png':
+            self.send_error(404)
+        elif self.path == '/page.png':
+            self._send(200, 'text/html', '<html></html>')
+        elif self.path == '/slow.png':
+            time.sleep(0.1)
+            self._send(200, 'image/png', IMAGE)
+        elif self.path == '/broken.png' and self.server.broken:
+            self.server.broken = False
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/png')
+            self.send_header('Content-Length', str(len(IMAGE)))
+            self.end_headers()
+            self.wfile.write(IMAGE[:1000])
+        elif self.headers.get('Range'):
+            start = int(self.headers.get('Range')[len('bytes='):-1])
+            self._send(206, 'image/png', IMAGE[start:])
+        else:
+            self._send(200, 'image/png', IMAGE)
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownloadService(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.server = ImageServer()
+        self.service = DownloadService(HttpClientService(StandInLogger()), StandInLogger())
+
+    def testDownload(self):
+        file_path = os.path.join(self.path, 'poster', '1', 'image.png')
+
+        self.assertEqual(self.service.download(self.server.url('/image.png'), file_path), file_path)
+        self.assertEqual(open(file_path, 'rb').read(), IMAGE)
+        self.assertEqual(os.listdir(os.path.dirname(file_path)), ['image.png'])
+
+        # existing files are complete and not requested again
+        self.service.download(self.server.url('/image.png'), file_path)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def testInvalidResponsesAreNotCached(self):
+        for path in ('/missing.png', '/page.png'):
+            file_path = os.path.join(self.path, os.path.basename(path))
+            self.assertEqual(self.service.download(self.server.url(path), file_path), None)
+            self.assertEqual(os.path.exists(file_path), False)
+
+    def testBrokenDownloadIsResumed(self):
+        file_path = os.path.join(self.path, 'broken.png')
+
+        self.assertEqual(self.service.download(self.server.url('/broken.png'), file_path), None)
+        self.assertEqual(os.path.exists(file_path), False)
+        self.assertEqual(os.path.getsize(file_path + DownloadService.PART_SUFFIX), 1000)
+
+        self.assertEqual(self.service.download(self.server.url('/broken.png'), file_path), file_path)
+        self.assertEqual(open(file_path, 'rb').read(), IMAGE)
+        self.assertEqual(self.server.requests[-1], ('/broken.png', 'bytes=1000-'))
+
+    def testConcurrentDownloadsOfOneUrlAreMerged(self):
+        file_paths = [os.path.join(self.path, str(i), 'slow.png') for i in range(3)]
+
+        results = self.service.download_all([(self.server.url('/slow.png'), file_path) for file_path in file_paths])
+
+        self.assertEqual(results, file_paths)
+        self.assertEqual(len(self.server.requests), 1)
+        for file_path in file_paths:
+            self.assertEqual(open(file_path, 'rb').read(), IMAGE)
+
+    def testFailedCopyOnlyFailsItsFollower(self):
+        # a file where the follower needs a directory makes its copy fail
+        blocker = os.path.join(self.path, 'blocker')
+        open(blocker, 'w').close()
+        file_paths = [os.path.join(self.path, '0', 'slow.png'), os.path.join(blocker, 'slow.png'),
+                      os.path.join(self.path, '2', 'slow.png')]
+
+        results = self.service.download_all([(self.server.url('/slow.png'), file_path) for file_path in file_paths])
+
+        self.assertEqual(results, [file_paths[0], None, file_paths[2]])
+        # the worker is still running
+        file_path = os.path.join(self.path, 'image.png')
+        self.assertEqual(self.service.download(self.server.url('/image.png'), file_path), file_path)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.path, ignore_errors=True)
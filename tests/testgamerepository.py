@@ -0,0 +1,272 @@
+import collections
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.repository.gamerepository import GameRepository
+from resources.lib.storageengine.storage import TimedStorage
+from resources.lib.storageengine.storagemigration import get_storage_files
+from tests.benchmarks import BenchmarkCore, BenchmarkLogger, build_game
+
+# a Game pickled while it was still a classic class
+LEGACY_GAME = ("(iresources.lib.model.game\nGame\n(dS'name'\nS'%s'\nsS'host_uuid'\nS'%s'\nsS'id'\nS'%s'\n"
+               "sS'genre'\n(lS'Action'\nasb")
+
+
+def write_legacy_storage(filename, game_ids):
+    """
+    Writes game_storage as it was before it was sharded: one headerless pickle of
+    {host uuid: ({game id: Game}, timestamp)}
+    """
+    entries = ''
+    for host_uuid, ids in sorted(game_ids.items()):
+        games = ''.join("S'%s'\n%ss" % (id, LEGACY_GAME % ('Game %s' % id, host_uuid, id)) for id in ids)
+        entries += "S'%s'\n((d%sF%r\nts" % (host_uuid, games, time.time())
+    with open(filename, 'wb') as legacy_file:
+        legacy_file.write('(d%s.' % entries)
+
+
+class SyncCountingCore(BenchmarkCore):
+    """Counts the syncs of every storage it hands out by name"""
+    def __init__(self, storage_path):
+        BenchmarkCore.__init__(self, storage_path)
+        self.syncs = collections.Counter()
+
+    def get_storage(self, name='game_storage', *args, **kwargs):
+        storage = BenchmarkCore.get_storage(self, name, *args, **kwargs)
+        sync = storage.sync
+
+        def counting_sync():
+            self.syncs[name] += 1
+            sync()
+
+        storage.sync = counting_sync
+        return storage
+
+
+def build_host(uuid):
+    host = HostDetails()
+    host.uuid = uuid
+    return host
+
+
+class TestGameRepository(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.core = BenchmarkCore(self.path)
+        self.repository = GameRepository(self.core, BenchmarkLogger())
+        self.host = HostDetails()
+        self.host.uuid = 'host'
+        self.repository.add_games(self.host, [build_game(self.host, i) for i in range(3)])
+
+    def testSyncedGamelistIdIsPersisted(self):
+        self.repository.set_synced_gamelist_id(self.host, '42')
+
+        repository = GameRepository(self.core, BenchmarkLogger())
+        self.assertEqual(repository.get_synced_gamelist_id(self.host), '42')
+
+    def testSyncedGamelistIdIsForgottenWhenGamesAreRemoved(self):
+        self.repository.set_synced_gamelist_id(self.host, '42')
+        self.repository.add_game(self.host, build_game(self.host, 3))
+        self.assertEqual(self.repository.get_synced_gamelist_id(self.host), '42')
+
+        self.repository.remove_game_by_id(self.host, '0')
+        self.assertEqual(self.repository.get_synced_gamelist_id(self.host), None)
+
+        self.repository.set_synced_gamelist_id(self.host, '43')
+        self.repository.clear()
+        self.assertEqual(self.repository.get_synced_gamelist_id(self.host), None)
+
+    def testEmptyGamelistIdIsNotRemembered(self):
+        self.repository.set_synced_gamelist_id(self.host, '42')
+        self.repository.set_synced_gamelist_id(self.host, '')
+
+        self.assertEqual(self.repository.get_synced_gamelist_id(self.host), None)
+
+    def testSyncDiffLeavesUnchangedGamesUntouched(self):
+        unchanged = self.repository.get_game_by_id(self.host, '1')
+
+        with self.repository.batch():
+            self.repository.remove_games_by_id(self.host, ['0'])
+            self.repository.add_games(self.host, [build_game(self.host, 3)])
+        self.repository.set_synced_gamelist_id(self.host, '43')
+
+        self.assertEqual(sorted(self.repository.get_games(self.host)), ['1', '2', '3'])
+        self.assertIs(self.repository.get_game_by_id(self.host, '1'), unchanged)
+        self.assertEqual(self.repository.get_synced_gamelist_id(self.host), '43')
+
+    def testGamesFollowSwitchedBackend(self):
+        for backend in ('sqlite', 'pickle', 'sqlite'):
+            self.repository.flush()
+            self.core.backend = backend
+            repository = GameRepository(self.core, BenchmarkLogger())
+
+            self.assertEqual(sorted(repository.get_games(self.host)), ['0', '1', '2'])
+            self.assertEqual(repository.get_game_by_id(self.host, '1').name, 'Game 1')
+            # nothing of the previous backend is left behind
+            shard_filename = os.path.join(self.path, GameRepository.SHARD_PREFIX + self.host.uuid)
+            kept = get_storage_files(shard_filename, backend)
+            self.assertEqual([name for name in os.listdir(self.path)
+                              if name.startswith(os.path.basename(shard_filename))
+                              and os.path.join(self.path, name) not in kept], [])
+            self.repository = repository
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class TestShardedGameStorage(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.core = BenchmarkCore(self.path)
+        self.legacy_filename = os.path.join(self.path, GameRepository.LEGACY_STORAGE)
+
+    def testLegacyStorageIsSplitIntoShards(self):
+        write_legacy_storage(self.legacy_filename, {'a': ['1', '2'], 'b': ['3']})
+        # changes synced after the journal was introduced are still in the journal
+        legacy_storage = TimedStorage(self.legacy_filename, journal=True)
+        legacy_storage['c'] = {'4': build_game(build_host('c'), 4)}
+        legacy_storage.sync()
+        self.assertEqual(os.path.exists(self.legacy_filename + TimedStorage.JOURNAL_SUFFIX), True)
+
+        repository = GameRepository(self.core, BenchmarkLogger())
+
+        self.assertEqual(sorted(repository.get_games(build_host('a'))), ['1', '2'])
+        self.assertEqual(repository.get_game_by_id(build_host('a'), '2').name, 'Game 2')
+        self.assertEqual(repository.get_game_by_id(build_host('b'), '3').genre, ['Action'])
+        self.assertEqual(repository.get_game_by_id(build_host('c'), '4').name, 'Game 4')
+        self.assertEqual(os.path.exists(self.legacy_filename), False)
+        self.assertEqual(os.path.exists(self.legacy_filename + TimedStorage.JOURNAL_SUFFIX), False)
+        for host_uuid in ('a', 'b', 'c'):
+            self.assertEqual(os.path.exists(os.path.join(self.path, GameRepository.SHARD_PREFIX + host_uuid)), True)
+
+        # the shards are read from their own files from now on
+        repository = GameRepository(self.core, BenchmarkLogger())
+        self.assertEqual(sorted(repository.get_games(build_host('a'))), ['1', '2'])
+
+    def testCorruptedLegacyStorageIsKept(self):
+        with open(self.legacy_filename, 'wb') as legacy_file:
+            legacy_file.write('not a pickle')
+
+        repository = GameRepository(self.core, BenchmarkLogger())
+
+        self.assertEqual(repository.shards, {})
+        self.assertEqual(repository.get_games(build_host('a')), {})
+        self.assertEqual(open(self.legacy_filename, 'rb').read(), 'not a pickle')
+
+    def testShardIsLoadedOnFirstUse(self):
+        repository = GameRepository(self.core, BenchmarkLogger())
+        for host_uuid in ('a', 'b'):
+            repository.add_games(build_host(host_uuid), [build_game(build_host(host_uuid), 1)])
+
+        repository = GameRepository(self.core, BenchmarkLogger())
+        self.assertEqual(repository.shards, {})
+
+        repository.get_games(build_host('a'))
+        self.assertEqual(sorted(repository.shards), ['a'])
+
+    def testSyncLeavesOtherShardsUntouched(self):
+        repository = GameRepository(self.core, BenchmarkLogger())
+        for host_uuid in ('a', 'b'):
+            repository.add_games(build_host(host_uuid), [build_game(build_host(host_uuid), i) for i in range(3)])
+        shard_b = self.stat_shard('b')
+
+        time.sleep(0.01)
+        repository.add_game(build_host('a'), build_game(build_host('a'), 3))
+        repository.remove_game_by_id(build_host('a'), '0')
+
+        self.assertEqual(self.stat_shard('b'), shard_b)
+        self.assertEqual(sorted(GameRepository(self.core, BenchmarkLogger()).get_games(build_host('a'))),
+                         ['1', '2', '3'])
+
+    def stat_shard(self, host_uuid):
+        prefix = GameRepository.SHARD_PREFIX + host_uuid
+        return dict((name, (os.stat(os.path.join(self.path, name)).st_ino,
+                            os.stat(os.path.join(self.path, name)).st_size,
+                            os.stat(os.path.join(self.path, name)).st_mtime))
+                    for name in os.listdir(self.path) if name == prefix or name.startswith(prefix + '.'))
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class TestGameRepositoryWrites(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.core = SyncCountingCore(self.path)
+        self.repository = GameRepository(self.core, BenchmarkLogger())
+        self.host_a = build_host('a')
+        self.host_b = build_host('b')
+        self.repository.add_games(self.host_a, [build_game(self.host_a, i) for i in range(3)])
+        self.core.syncs.clear()
+
+    def testBatchSyncsEveryTouchedShardOnce(self):
+        with self.repository.batch():
+            for i in range(3, 6):
+                self.repository.add_game(self.host_a, build_game(self.host_a, i))
+            self.repository.remove_game_by_id(self.host_a, '0')
+            self.repository.add_games(self.host_b, [build_game(self.host_b, i) for i in range(2)])
+            self.assertEqual(self.shard_syncs(), {})
+
+        self.assertEqual(self.shard_syncs(), {'a': 1, 'b': 1})
+
+    def testAbortedBatchIsRolledBackWithoutSync(self):
+        with self.assertRaises(ValueError):
+            with self.repository.batch():
+                self.repository.add_game(self.host_a, build_game(self.host_a, 3))
+                self.repository.remove_games_by_id(self.host_a, ['0', '1'])
+                raise ValueError('scraping failed')
+
+        self.assertEqual(self.shard_syncs(), {})
+        self.assertEqual(sorted(self.repository.get_games(self.host_a)), ['0', '1', '2'])
+        self.assertEqual(sorted(GameRepository(BenchmarkCore(self.path), BenchmarkLogger()).get_games(self.host_a)),
+                         ['0', '1', '2'])
+
+    def testNestedBatchIsTransparent(self):
+        with self.repository.batch():
+            with self.repository.batch():
+                self.repository.add_game(self.host_a, build_game(self.host_a, 3))
+            self.assertEqual(self.shard_syncs(), {})
+            self.repository.add_game(self.host_a, build_game(self.host_a, 4))
+
+        self.assertEqual(self.shard_syncs(), {'a': 1})
+
+        # an error leaving the inner batch rolls back the outer one
+        with self.assertRaises(ValueError):
+            with self.repository.batch():
+                self.repository.add_game(self.host_a, build_game(self.host_a, 5))
+                with self.repository.batch():
+                    raise ValueError('scraping failed')
+        self.assertEqual(sorted(self.repository.get_games(self.host_a)), ['0', '1', '2', '3', '4'])
+
+    def testDelayedFlushesAreCoalesced(self):
+        self.repository.flush_delay = 0.1
+        for i in range(3, 6):
+            self.repository.add_game(self.host_a, build_game(self.host_a, i))
+        self.repository.add_game(self.host_b, build_game(self.host_b, 0))
+        self.assertEqual(self.shard_syncs(), {})
+
+        time.sleep(0.3)
+        self.assertEqual(self.shard_syncs(), {'a': 1, 'b': 1})
+        self.assertEqual(self.repository._flush_timer, None)
+
+    def testFlushCancelsTheTimer(self):
+        self.repository.flush_delay = 0.1
+        self.repository.add_game(self.host_a, build_game(self.host_a, 3))
+
+        self.repository.flush()
+        self.assertEqual(self.shard_syncs(), {'a': 1})
+
+        time.sleep(0.2)
+        self.assertEqual(self.shard_syncs(), {'a': 1})
+
+    def shard_syncs(self):
+        return dict((name[len(GameRepository.SHARD_PREFIX):], count) for name, count in self.core.syncs.items()
+                    if name.startswith(GameRepository.SHARD_PREFIX))
+
+    def tearDown(self):
+        self.repository.flush()
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,79 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.service.hoststatusservice import HostStatusService
+from tests.standins import StandInCore, StandInLogger
+
+
+class DelayedHostStatusService(HostStatusService):
+    """Answers probes after the delay set per host name, hosts without one never answer"""
+    def __init__(self, core, delays, deadline):
+        HostStatusService.__init__(self, core, None, StandInLogger(), deadline)
+        self.delays = delays
+        self.asleep = threading.Event()
+
+    def probe(self, host):
+        if host.name not in self.delays:
+            self.asleep.wait()
+        time.sleep(self.delays.get(host.name, 0))
+        return HostDetails.STATE_ONLINE
+
+
+def build_host(name):
+    host = HostDetails()
+    host.name = name
+    host.uuid = name + '-uuid'
+    return host
+
+
+class TestHostStatusService(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def testHostsAreProbedInParallelWithinDeadline(self):
+        service = DelayedHostStatusService(StandInCore(self.path), {'fast': 0, 'slow': 0.3}, deadline=0.6)
+        hosts = [build_host(name) for name in ('asleep', 'slow', 'fast', 'also asleep')]
+        reported = []
+
+        start = time.time()
+        states = service.probe_all(hosts, lambda host, state: reported.append((host.name, state, time.time())))
+        elapsed = time.time() - start
+        service.asleep.set()
+
+        self.assertLess(elapsed, 1)
+        self.assertEqual([(name, state) for name, state, _ in reported], [
+            ('fast', HostDetails.STATE_ONLINE), ('slow', HostDetails.STATE_ONLINE),
+            ('asleep', HostDetails.STATE_OFFLINE), ('also asleep', HostDetails.STATE_OFFLINE)])
+        # results are reported as they arrive, not all at the deadline
+        self.assertLess(reported[0][2] - start, 0.2)
+        self.assertEqual(states['asleep-uuid'], HostDetails.STATE_OFFLINE)
+        self.assertEqual(hosts[1].state, HostDetails.STATE_ONLINE)
+
+    def testStatesAreRemembered(self):
+        service = DelayedHostStatusService(StandInCore(self.path), {'fast': 0}, deadline=0.1)
+        service.probe_all([build_host('fast'), build_host('asleep')])
+        service.asleep.set()
+
+        cached = DelayedHostStatusService(StandInCore(self.path), {}, deadline=0.1).get_cached_states()
+        self.assertEqual(cached['fast-uuid'][0], HostDetails.STATE_ONLINE)
+        self.assertEqual(cached['asleep-uuid'][0], HostDetails.STATE_OFFLINE)
+        self.assertAlmostEqual(cached['fast-uuid'][1], time.time(), delta=5)
+
+    def testExpiredStatesAreSkipped(self):
+        service = DelayedHostStatusService(StandInCore(self.path), {'fast': 0}, deadline=0.1)
+        service.probe_all([build_host('fast')])
+        expired_at = time.time() - HostStatusService.STATUS_TTL * 60 - 1
+        service.status.__setitem__('expired-uuid', ({'state': HostDetails.STATE_ONLINE, 'checked_at': expired_at},
+                                                    expired_at), raw=True)
+
+        cached = service.get_cached_states()
+
+        self.assertEqual(sorted(cached), ['fast-uuid'])
+        self.assertNotIn('expired-uuid', service.status.raw_dict())
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
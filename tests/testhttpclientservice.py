@@ -0,0 +1,100 @@
+import BaseHTTPServer
+import SocketServer
+import threading
+import time
+import unittest
+
+import requests
+
+from resources.lib.service.httpclientservice import HttpClientService
+from tests.standins import StandInLogger
+
+
+class ApiServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        self.requests = []
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), ApiHandler)
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def url(self, path):
+        return 'http://127.0.0.1:%s%s' % (self.server_address[1], path)
+
+
+class ApiHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.path == '/slow':
+            time.sleep(0.2)
+        if self.path == '/missing':
+            body = 'Not Found'
+            self.send_response(404)
+        else:
+            body = '{"path": "%s"}' % self.path
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpClientService(unittest.TestCase):
+    def setUp(self):
+        self.server = ApiServer()
+        self.client = HttpClientService(StandInLogger())
+
+    def testConnectionsAreKeptAlive(self):
+        for path in ('/first', '/second', '/missing', '/third'):
+            self.client.get(self.server.url(path))
+
+        statistics = self.client.get_statistics()
+        self.assertEqual(statistics['new_connections'], 1)
+        self.assertEqual(statistics['reused_connections'], 3)
+
+    def testConcurrentIdenticalRequestsAreCoalesced(self):
+        responses = []
+
+        def get():
+            responses.append(self.client.get(self.server.url('/slow')))
+
+        threads = [threading.Thread(target=get) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.server.requests, ['/slow'])
+        self.assertEqual([response.json() for response in responses], [{'path': '/slow'}] * 5)
+        self.assertEqual(self.client.get_statistics()['coalesced_requests'], 4)
+
+        # once finished, the same request is sent again
+        self.client.get(self.server.url('/slow'))
+        self.assertEqual(self.server.requests, ['/slow', '/slow'])
+
+    def testRequestsWithDifferentHeadersAreNotCoalesced(self):
+        threads = [threading.Thread(target=self.client.get, args=(self.server.url('/slow'),),
+                                    kwargs={'headers': {'Authorization': 'Token %s' % i}}) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.server.requests, ['/slow', '/slow'])
+
+    def testConnectionErrorsAreRaised(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+        self.assertRaises(requests.ConnectionError, self.client.get, self.server.url('/slow'))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
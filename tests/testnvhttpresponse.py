@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from resources.lib.nvhttp.response.applistresponse import AppListResponse
+from resources.lib.nvhttp.response.nvhttpresponse import decode_xml
+from resources.lib.nvhttp.response.pairresponse import PairResponse
+from resources.lib.nvhttp.response.serverinforesponse import ServerInfoResponse
+
+# recorded from GFE 2.10, which declares UTF-16 but sends UTF-8
+SERVER_INFO = ('<?xml version="1.0" encoding="UTF-16"?><root protocol_version="0.1" query="serverinfo" '
+               'status_code="200" status_message="OK"><ExternalIP>217.240.86.143</ExternalIP>'
+               '<GfeVersion>2.10.2.40</GfeVersion><LocalIP>192.168.2.105</LocalIP><PairStatus>1</PairStatus>'
+               '<appversion>5.1.270.0</appversion><currentgame>0</currentgame>'
+               '<gamelistid>ed06f6cab409adbe6fd9908ff29035f4</gamelistid><gputype>GeForce GTX 970</gputype>'
+               '<hostname>BLACKBOX</hostname><mac>54:27:1E:97:A3:50</mac>'
+               '<state>MJOLNIR_STATE_SERVER_AVAILABLE</state><uniqueid>69d0a49a-9bc2-4c92-b8d1-23dfe8db6569</uniqueid>'
+               '</root>')
+APP_LIST = ('<?xml version="1.0" encoding="UTF-16"?><root status_code="200"><App><AppTitle>Pokémon</AppTitle>'
+            '<ID>12</ID><MaxControllersForSingleSession>4</MaxControllersForSingleSession></App>'
+            '<App><AppTitle>Steam</AppTitle><ID>13</ID><Distributor>Valve</Distributor></App></root>')
+
+
+class TestNvHttpResponse(unittest.TestCase):
+    def testServerInfo(self):
+        server_info = ServerInfoResponse.parse(SERVER_INFO)
+
+        self.assertEqual(server_info.hostname, 'BLACKBOX')
+        self.assertEqual(server_info.pair_status, 1)
+        self.assertEqual(server_info.server_major_version, 5)
+        self.assertEqual(server_info.current_game, 0)
+        self.assertEqual(server_info.gamelist_id, 'ed06f6cab409adbe6fd9908ff29035f4')
+        self.assertEqual(server_info.get('missing'), '')
+
+    def testCurrentGame(self):
+        server_info = ServerInfoResponse.parse(SERVER_INFO.replace('<currentgame>0', '<currentgame>12').replace(
+            'SERVER_AVAILABLE', 'SERVER_BUSY'))
+
+        self.assertEqual(server_info.current_game, 12)
+
+    def testEncodings(self):
+        for content in (APP_LIST, APP_LIST.decode('utf-8').encode('utf-16'), APP_LIST.decode('utf-8').encode('utf-16-le'),
+                        '\xef\xbb\xbf' + APP_LIST):
+            apps = AppListResponse.parse(content).apps
+
+            self.assertEqual([app.title for app in apps], ['Pokémon', 'Steam'])
+            self.assertEqual([app.id for app in apps], ['12', '13'])
+            self.assertEqual(apps[1].distributor, 'Valve')
+
+    def testAppListIsStreamed(self):
+        content = APP_LIST.replace('</root>', ''.join('<App><AppTitle>Game %s</AppTitle><ID>%s</ID></App>' % (i, i)
+                                                      for i in range(100, 600)) + '</root>')
+        response = AppListResponse.parse(content)
+
+        self.assertEqual(len(response.apps), 502)
+        self.assertEqual(response.apps[-1].id, '599')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.root), 0)
+        self.assertRaises(ValueError, AppListResponse.parse, APP_LIST[:-10])
+
+    def testInvalidBytesAreReplaced(self):
+        self.assertEqual(decode_xml('<root>\xff</root>'), u'<root>�</root>')
+
+    def testStatus(self):
+        pair = PairResponse.parse('<root status_code="400" status_message="Bad Request"><paired>0</paired></root>')
+
+        self.assertEqual(pair.paired, False)
+        self.assertRaises(AssertionError, pair.verify_status)
+        self.assertRaises(ValueError, PairResponse.parse, '<html>')
+        self.assertRaises(ValueError, PairResponse.parse, None)
@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from resources.lib.manager.gamemanager import GameManager
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.model.nvapp import NvApp
+from resources.lib.repository.gamerepository import GameRepository
+from resources.lib.scraper.nvhttpscraper import NvHTTPScraper
+from resources.lib.scraper.scraperchain import ScraperChain
+from resources.lib.util.gamehelper import GameHelper
+from tests.benchmarks import BenchmarkCore
+from tests.nvhttpstandin import NvHttpStandIn, has_openssl
+from tests.standins import StandInCore, StandInLogger, StandInResponseCache
+
+
+class StandInMoonlightHelper(object):
+    """Offers the game list parts of MoonlightHelper over a RequestService"""
+    def __init__(self, request_service):
+        self.request_service = request_service
+
+    def get_gamelist_id(self):
+        return self.request_service.get_server_info().gamelist_id
+
+    def list_games(self):
+        return self.request_service.get_app_list()
+
+
+@unittest.skipIf(not has_openssl(), 'needs openssl to create certificates')
+class TestNvHTTPScraper(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.standin = NvHttpStandIn(self.path)
+        self.scraper = NvHTTPScraper(StandInCore(self.path), self.standin.build_request_service(server_info_ttl=0))
+        self.nvapp = NvApp()
+        self.nvapp.id = '1'
+        self.nvapp.title = 'Game 1'
+
+    def testBoxArtIsStreamedToDisk(self):
+        posters = self.scraper.get_game_information(self.nvapp).posters
+
+        self.assertEqual(len(posters), 1)
+        self.assertEqual(open(posters[0], 'rb').read(), self.standin.box_art)
+        self.assertEqual(os.listdir(os.path.dirname(posters[0])), [os.path.basename(posters[0])])
+
+    def testUnchangedGameListIsNotFetchedAgain(self):
+        self.scraper.get_game_information(self.nvapp)
+        self.scraper.get_game_information(self.nvapp)
+
+        self.assertEqual(self.count_asset_requests(), 1)
+
+    def testChangedBoxArtIsReplaced(self):
+        poster = self.scraper.get_game_information(self.nvapp).posters[0]
+        os.utime(poster, (1000, 1000))
+
+        # same image under a new game list is kept as is
+        self.standin.gamelist_id = '2'
+        self.scraper.get_game_information(self.nvapp)
+        self.assertEqual(self.count_asset_requests(), 2)
+        self.assertEqual(os.path.getmtime(poster), 1000)
+
+        self.standin.gamelist_id = '3'
+        self.standin.box_art = '\x89PNG' + '\1' * 2048
+        self.assertEqual(self.scraper.refresh_images(self.nvapp), {poster: self.scraper._fetch_box_art(self.nvapp)})
+        new_poster = self.scraper._fetch_box_art(self.nvapp)
+        self.assertEqual(open(new_poster, 'rb').read(), self.standin.box_art)
+        self.assertEqual(os.path.exists(poster), False)
+
+    def testChangedBoxArtReachesStoredGames(self):
+        core = BenchmarkCore(self.path)
+        game_helper = self.build_game_helper(core)
+        host = self.build_host()
+        self.standin.number_of_apps = 2
+
+        old_poster = game_helper.get_games(host, silent=True)['1'].get_selected_poster()
+
+        # an app is added, which changes the gamelistid, and the host has a new image for an existing one
+        self.standin.number_of_apps = 3
+        self.standin.gamelist_id = '2'
+        self.standin.box_art = '\x89PNG' + '\1' * 2048
+        games = game_helper.get_games(host, silent=True)
+
+        new_poster = games['1'].get_selected_poster()
+        self.assertNotEqual(new_poster, old_poster)
+        self.assertEqual(games['1'].posters, [new_poster])
+        self.assertEqual(open(new_poster, 'rb').read(), self.standin.box_art)
+        self.assertEqual(os.path.exists(old_poster), False)
+        stored = GameManager(GameRepository(core, StandInLogger())).get_game_by_id(host, '1')
+        self.assertEqual(stored.get_selected_poster(), new_poster)
+
+    def testGameListWithoutIdIsFetchedEveryTime(self):
+        core = BenchmarkCore(self.path)
+        game_helper = self.build_game_helper(core)
+        host = self.build_host()
+        self.standin.gamelist_id = None
+
+        self.assertEqual(sorted(game_helper.get_games(host, silent=True)), sorted(str(i) for i in range(10)))
+        self.standin.number_of_apps = 11
+        self.assertEqual(sorted(game_helper.get_games(host, silent=True)), sorted(str(i) for i in range(11)))
+
+        self.assertEqual([path for _, path in self.standin.requests].count('/applist'), 2)
+        self.assertEqual(GameManager(GameRepository(core, StandInLogger())).get_synced_gamelist_id(host), None)
+
+    def build_game_helper(self, core):
+        game_manager = GameManager(GameRepository(core, StandInLogger()))
+        chain = ScraperChain(core, game_manager, StandInResponseCache(), StandInLogger())
+        chain.append([self.scraper])
+        return GameHelper(core, game_manager, StandInMoonlightHelper(self.scraper.request_service), chain,
+                          StandInLogger())
+
+    @staticmethod
+    def build_host():
+        host = HostDetails()
+        host.uuid = 'standin-uuid'
+        host.name = 'Stand-In'
+        return host
+
+    def count_asset_requests(self):
+        return [path for _, path in self.standin.requests].count('/appasset')
+
+    def tearDown(self):
+        self.standin.shutdown()
+        shutil.rmtree(self.path, ignore_errors=True)
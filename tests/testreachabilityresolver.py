@@ -0,0 +1,127 @@
+import shutil
+import socket
+import tempfile
+import time
+import unittest
+
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.nvhttp.reachability.reachabilityresolver import ReachabilityResolver
+from tests.nvhttpstandin import NvHttpStandIn, StandInLogger, has_openssl
+
+
+class DelayedReachabilityResolver(ReachabilityResolver):
+    """Connects to an address after the delay set for it, addresses without one fail right away"""
+    def __init__(self, delays, **kwargs):
+        ReachabilityResolver.__init__(self, StandInLogger(), **kwargs)
+        self.delays = delays
+        self.probed = []
+
+    def probe(self, address):
+        self.probed.append(address)
+        if address not in self.delays:
+            return False
+        time.sleep(self.delays[address])
+        return True
+
+
+def build_host(local_ip='192.168.1.20', remote_ip='203.0.113.7'):
+    host = HostDetails()
+    host.name = 'Roaming'
+    host.uuid = 'roaming-uuid'
+    host.local_ip = local_ip
+    host.remote_ip = remote_ip
+    return host
+
+
+class TestReachabilityResolver(unittest.TestCase):
+    def testLocalWinsWithinHeadStart(self):
+        resolver = DelayedReachabilityResolver({'192.168.1.20': 0.05, '203.0.113.7': 0})
+        host = build_host()
+
+        self.assertEqual(resolver.resolve(host), '192.168.1.20')
+        self.assertEqual(host.reachability, HostDetails.REACH_LOCAL)
+        # the remote address is never probed if the local one answers within its head start
+        self.assertEqual(resolver.probed, ['192.168.1.20'])
+
+    def testStalledLocalLosesToRemote(self):
+        resolver = DelayedReachabilityResolver({'192.168.1.20': 1, '203.0.113.7': 0.05}, head_start=0.25)
+        host = build_host()
+
+        start = time.time()
+        self.assertEqual(resolver.resolve(host), '203.0.113.7')
+        elapsed = time.time() - start
+
+        self.assertEqual(host.reachability, HostDetails.REACH_REMOTE)
+        self.assertAlmostEqual(elapsed, 0.3, delta=0.1)
+        self.assertAlmostEqual(resolver.timings['roaming-uuid'], elapsed, delta=0.05)
+
+    def testUnreachableHostIsOffline(self):
+        resolver = DelayedReachabilityResolver({})
+        host = build_host()
+
+        self.assertEqual(resolver.resolve(host), '192.168.1.20')
+        self.assertEqual(host.reachability, HostDetails.REACH_OFFLINE)
+        self.assertEqual(resolver.get_statistics()['offline'], 1)
+
+    def testFailedLocalStartsRemoteRightAway(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(5)
+        resolver = ReachabilityResolver(StandInLogger(), head_start=1, port=listener.getsockname()[1])
+        host = build_host('127.0.0.2', '127.0.0.1')
+
+        try:
+            start = time.time()
+            self.assertEqual(resolver.resolve(host), '127.0.0.1')
+            self.assertLess(time.time() - start, 0.5)
+        finally:
+            listener.close()
+        self.assertEqual(host.reachability, HostDetails.REACH_REMOTE)
+
+    def testResultIsKeptForTtl(self):
+        resolver = DelayedReachabilityResolver({'192.168.1.20': 0, '203.0.113.7': 0}, ttl=60)
+        host = build_host()
+
+        for _ in range(3):
+            resolver.resolve(host)
+        self.assertEqual(resolver.get_statistics(), {'hits': 2, 'races': 1, 'local': 1, 'remote': 0, 'offline': 0})
+
+        resolver.resolve(host, force=True)
+        resolver.invalidate('192.168.1.20')
+        resolver.resolve(host)
+        self.assertEqual(resolver.get_statistics()['races'], 3)
+
+        resolver.ttl = 0
+        resolver.resolve(host, force=True)
+        resolver.resolve(host)
+        self.assertEqual(resolver.get_statistics()['races'], 5)
+
+    def testHostWithoutRemoteAddressIsNotProbed(self):
+        resolver = DelayedReachabilityResolver({})
+
+        for remote_ip in (None, '192.168.1.20'):
+            self.assertEqual(resolver.resolve(build_host(remote_ip=remote_ip)), '192.168.1.20')
+        self.assertEqual(resolver.probed, [])
+
+
+@unittest.skipUnless(has_openssl(), 'needs openssl to create certificates')
+class TestReachabilityOfRequestService(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.standin = NvHttpStandIn(self.path)
+
+    def testRequestsGoToTheReachableAddress(self):
+        request_service = self.standin.build_request_service()
+        host = request_service.host_context_service.get_current_context()
+        host.uuid = 'standin-uuid'
+        host.local_ip = '127.0.0.2'
+        host.remote_ip = '127.0.0.1'
+
+        self.assertEqual(request_service.get_server_info().hostname, 'Stand-In')
+        self.assertEqual(request_service.get_host_ip(), '127.0.0.1')
+        self.assertEqual(host.reachability, HostDetails.REACH_REMOTE)
+        self.assertEqual(request_service.reachability_resolver.get_statistics()['races'], 1)
+
+    def tearDown(self):
+        self.standin.shutdown()
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,162 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from resources.lib.model.hostdetails import HostDetails
+from tests.nvhttpstandin import NvHttpStandIn, has_openssl
+
+
+class ThreadHostContextService(object):
+    """Gives every thread its own current host"""
+    def __init__(self):
+        self._local = threading.local()
+
+    def set_current_context(self, host):
+        self._local.host = host
+
+    def get_current_context(self):
+        return self._local.host
+
+
+@unittest.skipIf(not has_openssl(), 'needs openssl to create certificates')
+class TestRequestService(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def testConnectionsAreReusedAcrossCalls(self):
+        standin = self.start(paired=True)
+        request_service = standin.build_request_service(server_info_ttl=0)
+
+        request_service.get_computer_details()
+        request_service.get_app_list()
+        request_service.get_box_art('1')
+        request_service.get_server_info()
+
+        self.assertEqual(standin.handshakes, 1)
+        self.assertEqual(request_service.get_connection_statistics(),
+                         {'new_connections': 1, 'reused_connections': 3})
+
+    def testUnpairedHostIsAskedOverHttpOnceKnown(self):
+        standin = self.start(paired=False)
+        request_service = standin.build_request_service(server_info_ttl=0)
+
+        for _ in range(3):
+            self.assertEqual(request_service.get_computer_details().pair_state, 0)
+
+        self.assertEqual(standin.requests, [(True, '/serverinfo'), (False, '/serverinfo'), (False, '/serverinfo'),
+                                            (False, '/serverinfo')])
+
+    def testPairingForgetsScheme(self):
+        standin = self.start(paired=False)
+        request_service = standin.build_request_service(server_info_ttl=0)
+        request_service.get_server_info()
+
+        standin.paired = True
+        request_service.open_http_connection(request_service.base_url_http + '/pair?uniqueid=1', True)
+        self.assertEqual(request_service.get_computer_details().pair_state, 1)
+        self.assertEqual(standin.requests[-1], (True, '/serverinfo'))
+
+    def testServerInfoIsCached(self):
+        standin = self.start(paired=True)
+        request_service = standin.build_request_service()
+
+        for _ in range(3):
+            request_service.get_server_info()
+        self.assertEqual(len(standin.requests), 1)
+
+        request_service.invalidate_server_info(request_service.host_ip)
+        request_service.get_server_info()
+        self.assertEqual(len(standin.requests), 2)
+        self.assertEqual(request_service.get_server_info_statistics(), {'hits': 2, 'misses': 2})
+
+    def testConcurrentServerInfoCallsShareOneFetch(self):
+        standin = self.start(paired=True, latency=0.2)
+        request_service = standin.build_request_service()
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(request_service.get_server_info()))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(standin.requests), 1)
+        self.assertEqual(len(set(results)), 1)
+        self.assertEqual(request_service.get_server_info_statistics(), {'hits': 3, 'misses': 1})
+
+    def testPairingInvalidatesServerInfo(self):
+        standin = self.start(paired=False)
+        request_service = standin.build_request_service()
+        self.assertEqual(request_service.get_computer_details().pair_state, 0)
+
+        standin.paired = True
+        request_service.open_http_connection(request_service.base_url_http + '/pair?uniqueid=1', True)
+        self.assertEqual(request_service.get_computer_details().pair_state, 1)
+
+    def testAppsAreLookedUpByIdUntilGameListChanges(self):
+        standin = self.start(paired=True, number_of_apps=500)
+        request_service = standin.build_request_service(server_info_ttl=0)
+
+        self.assertEqual(request_service.get_app_by_id(499).title, 'Game 499')
+        self.assertEqual(request_service.get_app_by_id('7').title, 'Game 7')
+        self.assertEqual(request_service.get_app_by_id(500), None)
+        self.assertEqual([path for _, path in standin.requests].count('/applist'), 1)
+
+        standin.gamelist_id = '2'
+        request_service.get_app_by_id(1)
+        self.assertEqual([path for _, path in standin.requests].count('/applist'), 2)
+
+    def testUidIsReadOnce(self):
+        standin = self.start(paired=True)
+        request_service = standin.build_request_service()
+        uid = request_service.build_uid_uuid_string().split('&')[0]
+
+        os.remove(os.path.join(request_service.key_dir, 'uniqueid.dat'))
+        self.assertEqual(request_service.build_uid_uuid_string().split('&')[0], uid)
+
+    def testConcurrentCallsKeepTheirHost(self):
+        standin = self.start(paired=True)
+        request_service = standin.build_request_service(server_info_ttl=0)
+        request_service.host_context_service = ThreadHostContextService()
+        # both names reach the stand-in, the Host header tells which one a request was built for
+        hosts = []
+        for address in ('127.0.0.1', 'localhost'):
+            host = HostDetails()
+            host.local_ip = address
+            host.key_dir = os.path.join(self.path, 'keys', address)
+            hosts.append(host)
+        errors = []
+
+        def alternate(host):
+            request_service.host_context_service.set_current_context(host)
+            try:
+                for _ in range(20):
+                    request_service.get_server_info()
+                    request_service.get_app_list()
+                    request_service.get_box_art('1')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=alternate, args=(hosts[i % 2],)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        uids = dict((host.local_ip, open(os.path.join(host.key_dir, 'uniqueid.dat')).read()) for host in hosts)
+        self.assertEqual(errors, [])
+        self.assertNotEqual(uids['127.0.0.1'], uids['localhost'])
+        # serverinfo calls of threads for the same host may share one fetch
+        self.assertGreaterEqual(len(standin.clients), 4 * 20 * 2)
+        self.assertEqual([(address, uid) for address, uid in standin.clients if uids[address] != uid], [])
+
+    def start(self, **kwargs):
+        self.standin = NvHttpStandIn(self.path, **kwargs)
+        return self.standin
+
+    def tearDown(self):
+        self.standin.shutdown()
+        shutil.rmtree(self.path, ignore_errors=True)
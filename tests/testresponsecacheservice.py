@@ -0,0 +1,140 @@
+import BaseHTTPServer
+import SocketServer
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import requests
+
+from resources.lib.service.httpclientservice import HttpClientService
+from resources.lib.service.responsecacheservice import ResponseCacheService
+from tests.standins import StandInCore, StandInLogger
+
+
+class ApiServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        self.requests = []
+        self.etag = '"1"'
+        self.cache_control = 'max-age=0'
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), ApiHandler)
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def url(self, path):
+        return 'http://127.0.0.1:%s%s' % (self.server_address[1], path)
+
+
+class ApiHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('If-None-Match')))
+        if self.headers.get('If-None-Match') == self.server.etag:
+            self.send_response(304)
+            self.send_header('ETag', self.server.etag)
+            self.send_header('Cache-Control', self.server.cache_control)
+            self.end_headers()
+            return
+
+        body = '{"etag": %s}' % self.server.etag
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', self.server.etag)
+        self.send_header('Cache-Control', self.server.cache_control)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestResponseCacheService(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.server = ApiServer()
+        self.cache = ResponseCacheService(StandInCore(self.path), HttpClientService(StandInLogger()), StandInLogger())
+
+    def testFreshResponseIsServedFromCache(self):
+        self.server.cache_control = 'max-age=3600'
+
+        first = self.cache.get(self.server.url('/game?b=2&a=1'), scraper='TGDB', game_id='1')
+        second = self.cache.get(self.server.url('/game?a=1&b=2#plot'), scraper='TGDB', game_id='1')
+
+        self.assertEqual(first.from_cache, False)
+        self.assertEqual(second.from_cache, True)
+        self.assertEqual(second.json(), {'etag': '1'})
+        self.assertEqual(len(self.server.requests), 1)
+
+    def testStaleResponseIsRevalidated(self):
+        self.cache.get(self.server.url('/game'))
+        response = self.cache.get(self.server.url('/game'))
+
+        self.assertEqual(response.from_cache, True)
+        self.assertEqual(response.json(), {'etag': '1'})
+        self.assertEqual(self.server.requests, [('/game', None), ('/game', '"1"')])
+        self.assertEqual(self.cache.get_statistics(), {'hits': 0, 'revalidations': 1, 'misses': 1})
+
+        self.server.etag = '"2"'
+        self.assertEqual(self.cache.get(self.server.url('/game')).json(), {'etag': '2'})
+
+    def testStaleResponseIsServedWhileOffline(self):
+        self.cache.get(self.server.url('/game'))
+        url = self.server.url('/game')
+        self.server.shutdown()
+        self.server.server_close()
+
+        self.assertEqual(self.cache.get(url).json(), {'etag': '1'})
+        self.assertRaises(requests.ConnectionError, self.cache.get, self.server.url('/other'))
+
+    def testBodiesAreStoredCompressed(self):
+        self.cache.get(self.server.url('/game'))
+
+        key = self.cache.get_key(self.server.url('/game'))
+        with open(os.path.join(self.path, ResponseCacheService.CACHE_DIR, key), 'rb') as cache_file:
+            self.assertNotEqual(cache_file.read(), '{"etag": "1"}')
+
+    def testSelectiveInvalidation(self):
+        self.server.cache_control = 'max-age=3600'
+        for scraper, game_id in (('TGDB', '1'), ('TGDB', '2'), ('OMDB', '1')):
+            self.cache.get(self.server.url('/%s/%s' % (scraper, game_id)), scraper=scraper, game_id=game_id)
+
+        self.assertEqual(self.cache.invalidate(scraper='TGDB', game_id='1'), 1)
+        self.assertEqual(self.cache.invalidate(game_id='1'), 1)
+        self.assertEqual(self.cache.invalidate(scraper='TGDB'), 1)
+        self.assertEqual(self.cache.invalidate(), 0)
+        self.assertEqual(os.listdir(os.path.join(self.path, ResponseCacheService.CACHE_DIR)), [])
+
+    def testLegacyCacheIsRemoved(self):
+        legacy_path = os.path.join(self.path, ResponseCacheService.LEGACY_CACHE_DIR, '1')
+        os.makedirs(legacy_path)
+
+        ResponseCacheService(StandInCore(self.path), HttpClientService(StandInLogger()), StandInLogger())
+
+        self.assertEqual(os.path.exists(os.path.dirname(legacy_path)), False)
+
+    def testExpiredAndOrphanedBodiesArePruned(self):
+        self.server.cache_control = 'max-age=3600'
+        for path in ('/kept', '/expired'):
+            self.cache.get(self.server.url(path))
+        expired_key = self.cache.get_key(self.server.url('/expired'))
+        stored_at = time.time() - ResponseCacheService.INDEX_TTL * 60 - 1
+        self.cache.index.__setitem__(expired_key, (self.cache.index.raw_dict()[expired_key][0], stored_at), raw=True)
+        cache_path = os.path.join(self.path, ResponseCacheService.CACHE_DIR)
+        with open(os.path.join(cache_path, 'orphan'), 'wb') as orphan:
+            orphan.write('orphan')
+
+        self.assertEqual(self.cache.prune(), 2)
+
+        self.assertEqual(os.listdir(cache_path), [self.cache.get_key(self.server.url('/kept'))])
+        self.assertEqual(self.cache.index.keys(), [self.cache.get_key(self.server.url('/kept'))])
+        self.assertEqual(self.cache.get(self.server.url('/kept')).from_cache, True)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,177 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from resources.lib.model.apiresponse import ApiResponse
+from resources.lib.model.fanart import Fanart
+from resources.lib.model.nvapp import NvApp
+from resources.lib.scraper.abcscraper import AbstractScraper
+from resources.lib.scraper.scraperchain import ScraperChain
+from tests.standins import StandInCore, StandInLogger, StandInResponseCache
+
+
+class FakeScraper(AbstractScraper):
+    def __init__(self, core, scraper_name, delay, max_concurrency, fail=False, complete=False, empty=False):
+        AbstractScraper.__init__(self, core)
+        self.scraper_name = scraper_name
+        self.delay = delay
+        self.max_concurrency = max_concurrency
+        self.fail = fail
+        self.complete = complete
+        self.empty = empty
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def name(self):
+        return self.scraper_name
+
+    def get_game_information(self, nvapp):
+        self.work()
+        if self.fail:
+            raise ValueError('%s is offline' % self.scraper_name)
+        if self.empty:
+            return ApiResponse(nvapp.title, year='N/A', plot='N/A')
+        if self.complete:
+            return ApiResponse(nvapp.title, '2016', [self.scraper_name], 'Plot', ['poster.png'],
+                               {'fanart.png': Fanart('fanart.png', 'fanart.png')})
+        return ApiResponse(nvapp.title, plot='%s plot of %s' % (self.scraper_name, nvapp.title),
+                           genre=[self.scraper_name])
+
+    def refresh_images(self, nvapp):
+        self.work()
+        if self.fail:
+            raise ValueError('%s is offline' % self.scraper_name)
+        return {'%s.png' % nvapp.id: '%s-new.png' % nvapp.id}
+
+    def work(self):
+        with self.lock:
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+
+    def return_paths(self):
+        return []
+
+    def is_enabled(self):
+        return True
+
+
+class TestScraperPool(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.core = StandInCore(self.path, '4')
+        self.chain = ScraperChain(self.core, None, StandInResponseCache(), StandInLogger())
+        self.nvapps = []
+        for i in range(12):
+            nvapp = NvApp()
+            nvapp.id = str(i)
+            nvapp.title = 'Game %s' % i
+            self.nvapps.append(nvapp)
+
+    def testResultsKeepOrderAndMergeInChainOrder(self):
+        slow = FakeScraper(self.core, 'Slow', 0.02, 2)
+        fast = FakeScraper(self.core, 'Fast', 0.0, 2)
+        self.chain.append([slow, fast])
+
+        results = [(nvapp, game_query()) for nvapp, game_query in self.chain.query_games_information(self.nvapps)]
+
+        self.assertEqual([nvapp.id for nvapp, _ in results], [nvapp.id for nvapp in self.nvapps])
+        for nvapp, game in results:
+            self.assertEqual(game.id, nvapp.id)
+            # the longer plot wins, on a tie the first scraper of the chain
+            self.assertEqual(game.plot, 'Slow plot of %s' % nvapp.title)
+            self.assertEqual(game.genre, ['Fast', 'Slow'])
+
+    def testConcurrencyIsCapped(self):
+        first = FakeScraper(self.core, 'First', 0.01, 3)
+        second = FakeScraper(self.core, 'Second', 0.01, 1)
+        self.chain.append([first, second])
+
+        start = time.time()
+        for _, game_query in self.chain.query_games_information(self.nvapps):
+            game_query()
+        elapsed = time.time() - start
+
+        self.assertEqual(first.max_running, 3)
+        self.assertEqual(second.max_running, 1)
+        self.assertLess(elapsed, 12 * 2 * 0.01)
+
+    def testFailingScraperIsSkipped(self):
+        self.chain.append([FakeScraper(self.core, 'Offline', 0.0, 2, fail=True),
+                           FakeScraper(self.core, 'Online', 0.0, 2)])
+
+        game = self.chain.query_game_information(self.nvapps[0])
+
+        self.assertEqual(game.genre, ['Online'])
+
+    def testCompleteGameSkipsRemainingScrapers(self):
+        complete = FakeScraper(self.core, 'Complete', 0.0, 2, complete=True)
+        never = FakeScraper(self.core, 'Never', 0.0, 2)
+        self.chain.append([complete, never])
+
+        games = [game_query() for _, game_query in self.chain.query_games_information(self.nvapps)]
+
+        self.assertEqual([game.year for game in games], ['2016'] * 12)
+        self.assertEqual(never.calls, 0)
+        self.assertEqual(self.chain.report['requests'], 12)
+        self.assertEqual(self.chain.report['complete'], 12)
+
+    def testMissesAreRemembered(self):
+        empty = FakeScraper(self.core, 'Empty', 0.0, 2, empty=True)
+        self.chain.append([empty, FakeScraper(self.core, 'Online', 0.0, 2)])
+
+        self.chain.query_game_information(self.nvapps[0])
+        game = self.chain.query_game_information(self.nvapps[0])
+
+        self.assertEqual(empty.calls, 1)
+        self.assertEqual(game.genre, ['Online'])
+        self.assertEqual(self.chain.report['known_misses'], 1)
+
+        # remembered for the normalized title and across chains
+        chain = ScraperChain(self.core, None, StandInResponseCache(), StandInLogger())
+        chain.append([empty])
+        renamed = NvApp()
+        renamed.id = '0'
+        renamed.title = ' game  0!'
+        self.assertEqual(chain.query_game_information(renamed).name, ' game  0!')
+        self.assertEqual(empty.calls, 1)
+
+        self.chain.reset_cache(scraper_name='Empty')
+        self.chain.query_game_information(self.nvapps[0])
+        self.assertEqual(empty.calls, 2)
+
+    def testImageRefreshesRunOnThePool(self):
+        refreshing = FakeScraper(self.core, 'Refreshing', 0.05, 3)
+        self.chain.append([refreshing, FakeScraper(self.core, 'Offline', 0.0, 2, fail=True)])
+
+        start = time.time()
+        changed = self.chain.refresh_images(self.nvapps)
+        elapsed = time.time() - start
+
+        self.assertEqual(changed, dict((nvapp.id, {'%s.png' % nvapp.id: '%s-new.png' % nvapp.id})
+                                       for nvapp in self.nvapps))
+        self.assertEqual(refreshing.calls, 12)
+        self.assertEqual(refreshing.max_running, 3)
+        self.assertLess(elapsed, 12 * 0.05 / 2)
+
+    def testFailuresAreNotRemembered(self):
+        offline = FakeScraper(self.core, 'Offline', 0.0, 2, fail=True)
+        empty = FakeScraper(self.core, 'Empty', 0.0, 2, empty=True)
+        self.chain.append([offline, empty])
+
+        self.chain.query_game_information(self.nvapps[0])
+        self.chain.query_game_information(self.nvapps[0])
+
+        self.assertEqual(offline.calls, 2)
+        self.assertEqual(empty.calls, 1)
+        self.assertEqual(self.chain.report['known_misses'], 1)
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,258 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import timedelta
+
+from resources.lib.storageengine.sqlitestorage import SqliteStorage
+from resources.lib.storageengine.storage import LazyTimedStorage, TimedStorage
+
+
+class TestStorage(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.filename = os.path.join(self.path, 'game_storage')
+
+    def testJournalReplay(self):
+        storage = TimedStorage(self.filename, journal=True)
+        storage['host'] = {}
+        storage['host']['1'] = 'Game 1'
+        storage.touch('host', '1')
+        storage.sync()
+        storage['host']['2'] = 'Game 2'
+        storage.touch('host', '2')
+        storage.sync()
+        del storage['host']['1']
+        storage.touch('host', '1')
+        storage.sync()
+
+        self.assertEqual(os.path.isfile(self.filename), False)
+        self.assertEqual(os.path.isfile(storage.journal_filename), True)
+
+        reloaded = TimedStorage(self.filename, journal=True)
+        self.assertEqual(reloaded['host'], {'2': 'Game 2'})
+
+    def testJournalTornTail(self):
+        storage = TimedStorage(self.filename, journal=True)
+        storage['a'] = 1
+        storage.sync()
+        intact_size = os.path.getsize(storage.journal_filename)
+        storage['b'] = 2
+        storage.sync()
+
+        with open(storage.journal_filename, 'r+b') as journal:
+            journal.truncate(os.path.getsize(storage.journal_filename) - 3)
+
+        reloaded = TimedStorage(self.filename, journal=True)
+        self.assertEqual(reloaded['a'], 1)
+        self.assertEqual('b' in reloaded, False)
+        self.assertEqual(os.path.getsize(storage.journal_filename), intact_size)
+
+    def testJournalCompaction(self):
+        storage = TimedStorage(self.filename, journal=True)
+        storage['a'] = 1
+        storage.sync()
+        storage.close()
+
+        self.assertEqual(os.path.isfile(storage.journal_filename), False)
+        self.assertEqual(TimedStorage(self.filename)['a'], 1)
+
+    def testSqliteImportAndTTL(self):
+        pickle_storage = TimedStorage(self.filename)
+        pickle_storage['fresh'] = 'value'
+        pickle_storage.__setitem__('expired', ('value', 0), raw=True)
+
+        storage = SqliteStorage(self.filename + SqliteStorage.FILE_SUFFIX, timedelta(minutes=1))
+        storage.import_storage(pickle_storage)
+
+        self.assertEqual(storage['fresh'], 'value')
+        self.assertEqual('expired' in storage, False)
+        self.assertEqual(list(storage), ['fresh'])
+        storage.close()
+
+        # expired rows are purged when the storage is loaded with a TTL
+        SqliteStorage(self.filename + SqliteStorage.FILE_SUFFIX, timedelta(minutes=1)).close()
+        storage = SqliteStorage(self.filename + SqliteStorage.FILE_SUFFIX)
+        self.assertEqual(len(storage), 1)
+        storage.close()
+
+    def testSqliteWritesDontLockOutOtherConnections(self):
+        first = SqliteStorage(self.filename + SqliteStorage.FILE_SUFFIX)
+        second = SqliteStorage(self.filename + SqliteStorage.FILE_SUFFIX)
+
+        first['a'] = 1
+        second['b'] = 2
+        del first['b']
+
+        self.assertEqual(second.items(), [('a', 1)])
+        first.close()
+        second.close()
+
+    def testLazyStorage(self):
+        storage = TimedStorage(self.filename)
+        for i in range(10):
+            storage[str(i)] = {'name': 'Game %s' % i}
+        storage.sync()
+
+        # plain pickle snapshots are rewritten in the indexed format
+        storage = LazyTimedStorage(self.filename, journal=True, cache_size=2)
+        storage.compact()
+
+        storage = LazyTimedStorage(self.filename, journal=True, cache_size=2)
+        self.assertEqual(len(storage), 10)
+        self.assertEqual(len(storage._cache), 0)
+        self.assertEqual(storage['3'], {'name': 'Game 3'})
+        for key in ('4', '5', '6'):
+            storage[key]
+        self.assertEqual(len(storage._cache), 2)
+
+        storage['7']['name'] = 'Changed'
+        storage.touch('7')
+        del storage['8']
+        storage.sync()
+        storage.close()
+
+        storage = LazyTimedStorage(self.filename)
+        self.assertEqual(storage['7'], {'name': 'Changed'})
+        self.assertEqual('8' in storage, False)
+        self.assertEqual(sorted(storage.raw_dict().keys()), ['0', '1', '2', '3', '4', '5', '6', '7', '9'])
+
+    def testVacuum(self):
+        storage = TimedStorage(self.filename, TTL=timedelta(minutes=1))
+        storage['fresh'] = 'value'
+        storage.__setitem__('expired', ('value', 0), raw=True)
+        storage.__setitem__('renewed', ('value', 0), raw=True)
+        storage['renewed'] = 'value'
+
+        self.assertEqual(storage.vacuum(), 1)
+        self.assertEqual(sorted(storage.raw_dict().keys()), ['fresh', 'renewed'])
+        self.assertEqual(storage.vacuum(), 0)
+        storage.sync()
+
+        storage = SqliteStorage(self.filename + SqliteStorage.FILE_SUFFIX, timedelta(minutes=1))
+        storage.import_storage(TimedStorage(self.filename))
+        storage._connection.execute('UPDATE storage SET timestamp = 0 WHERE key = ?', ('fresh',))
+        self.assertEqual(storage.vacuum(), 1)
+        self.assertEqual(storage.raw_dict().keys(), ['renewed'])
+        storage.close()
+
+    def testConcurrentWriters(self):
+        for storage_class, journal in ((TimedStorage, False), (TimedStorage, True), (LazyTimedStorage, True)):
+            filename = os.path.join(self.path, '%s-%s' % (storage_class.__name__, journal))
+            first = storage_class(filename, journal=journal)
+            second = storage_class(filename, journal=journal)
+            second.CHANGE_CHECK_INTERVAL = 0
+
+            first['a'] = 1
+            first.sync()
+            self.assertEqual(second['a'], 1)
+
+            first['b'] = 2
+            second['c'] = 3
+            first.sync()
+            second.sync()
+            first.refresh()
+
+            for storage in (first, second):
+                self.assertEqual(sorted(storage.raw_dict().keys()), ['a', 'b', 'c'])
+            self.assertEqual(sorted(storage_class(filename, journal=journal).raw_dict().keys()), ['a', 'b', 'c'])
+
+    def testSetAfterOtherInstanceSynced(self):
+        for storage_class in (TimedStorage, LazyTimedStorage):
+            filename = os.path.join(self.path, storage_class.__name__)
+            first = storage_class(filename, TTL=timedelta(minutes=1))
+            second = storage_class(filename, TTL=timedelta(minutes=1))
+            second.CHANGE_CHECK_INTERVAL = 0
+
+            first['x'] = 1
+            first.sync()
+            # setting a key used to refresh while holding the expiry lock, which the reload takes again
+            setter = threading.Thread(target=second.__setitem__, args=('y', 2))
+            setter.daemon = True
+            setter.start()
+            setter.join(2)
+
+            self.assertEqual(setter.is_alive(), False)
+            self.assertEqual(sorted(second.keys()), ['x', 'y'])
+
+    def testVacuumWhileWriting(self):
+        storage = TimedStorage(self.filename, TTL=timedelta(minutes=1), journal=True)
+        writing = threading.Event()
+        errors = []
+
+        def vacuum():
+            while writing.is_set():
+                try:
+                    storage.vacuum()
+                    storage.sync()
+                except Exception as e:
+                    errors.append(e)
+
+        writing.set()
+        vacuum_thread = threading.Thread(target=vacuum)
+        vacuum_thread.start()
+        for i in range(2000):
+            storage['%s' % i] = i
+            storage.__setitem__('expired-%s' % i, (i, 0), raw=True)
+        writing.clear()
+        vacuum_thread.join()
+        # entries written after the last pass of the thread
+        storage.vacuum()
+        storage.close()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(TimedStorage(self.filename, journal=True)), 2000)
+
+    def testConcurrentProcesses(self):
+        def write(name):
+            storage = LazyTimedStorage(self.filename, journal=True)
+            for i in range(50):
+                storage['%s-%s' % (name, i)] = i
+                storage.sync()
+            storage.close()
+
+        processes = [multiprocessing.Process(target=write, args=(name,)) for name in ('addon', 'service')]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        self.assertEqual(len(LazyTimedStorage(self.filename)), 100)
+
+    def testReloadDropsEntriesRemovedElsewhere(self):
+        for storage_class in (TimedStorage, LazyTimedStorage):
+            filename = os.path.join(self.path, storage_class.__name__)
+            first = storage_class(filename, TTL=timedelta(minutes=1))
+            first['a'] = 1
+            first['b'] = 2
+            first.sync()
+            second = storage_class(filename, TTL=timedelta(minutes=1))
+            self.assertEqual(sorted(second.keys()), ['a', 'b'])
+
+            del first['a']
+            first.sync()
+
+            self.assertEqual(second.refresh(), True)
+            self.assertEqual(sorted(second.raw_dict().keys()), ['b'])
+            self.assertEqual(second.vacuum(), 0)
+
+    def testRefreshReplaysJournalTail(self):
+        first = TimedStorage(self.filename, journal=True)
+        second = TimedStorage(self.filename, journal=True)
+        first['a'] = 1
+        first.sync()
+        self.assertEqual(second.refresh(), True)
+        offset = second._journal_offset
+
+        first['b'] = 2
+        first.sync()
+        second._reset = None  # a full reload would fail
+        self.assertEqual(second.refresh(), True)
+        self.assertEqual(second['b'], 2)
+        self.assertEqual(second._journal_offset > offset, True)
+        self.assertEqual(second.refresh(), False)
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,86 @@
+import BaseHTTPServer
+import SocketServer
+import socket
+import threading
+import time
+import unittest
+
+from resources.lib.nvhttp.scan.subnetscanner import SubnetScanner
+from tests.nvhttpstandin import SERVER_INFO, StandInLogger
+
+
+class ListenerServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, port, body):
+        self.body = body
+        BaseHTTPServer.HTTPServer.__init__(self, (address, port), ListenerHandler)
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+
+class ListenerHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(self.server.body)))
+        self.end_headers()
+        self.wfile.write(self.server.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def game_stream_host(name, uuid):
+    return SERVER_INFO.replace('Stand-In', name).replace('0123456789ABCDEF', uuid) % (1, 1)
+
+
+class TestSubnetScanner(unittest.TestCase):
+    def setUp(self):
+        self.listeners = [ListenerServer('127.0.0.1', 0, game_stream_host('First', 'uuid-1'))]
+        self.port = self.listeners[0].server_address[1]
+        self.listeners.append(ListenerServer('127.0.0.200', self.port, game_stream_host('Second', 'uuid-2')))
+        # a web server which happens to use the port
+        self.listeners.append(ListenerServer('127.0.0.7', self.port, '<html></html>'))
+        # accepts connections, but never answers
+        self.silent = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.silent.bind(('127.0.0.9', self.port))
+        self.silent.listen(5)
+
+    def testNetworkIsScanned(self):
+        scanner = SubnetScanner(StandInLogger(), max_sockets=32, deadline=2, probe_timeout=0.3, port=self.port)
+
+        start = time.time()
+        hosts = scanner.scan('127.0.0.0/24')
+
+        self.assertLess(time.time() - start, 2.5)
+        self.assertEqual(sorted(hosts.keys()), ['uuid-1', 'uuid-2'])
+        self.assertEqual(hosts['uuid-2'].name, 'Second')
+        self.assertEqual(sorted(computer.address for computer in scanner.available_hosts.values()),
+                         ['127.0.0.1', '127.0.0.200'])
+
+    def testScanEndsAtDeadline(self):
+        scanner = SubnetScanner(StandInLogger(), max_sockets=1, deadline=0.5, probe_timeout=0.3, port=self.port)
+
+        start = time.time()
+        scanner.scan('127.0.0.8/29')
+
+        self.assertLess(time.time() - start, 0.8)
+
+    def testFirstOnly(self):
+        scanner = SubnetScanner(StandInLogger(), max_sockets=1, deadline=2, probe_timeout=0.3, port=self.port)
+
+        self.assertEqual(scanner.scan('127.0.0.0/24', first_only=True).keys(), ['uuid-1'])
+
+    def testAddresses(self):
+        self.assertEqual(len(SubnetScanner.get_addresses('192.168.1.77/24')), 254)
+        self.assertEqual(SubnetScanner.get_addresses('10.0.0.5/30'), ['10.0.0.5', '10.0.0.6'])
+        self.assertEqual(SubnetScanner.get_addresses('10.0.0.5'), ['10.0.0.5'])
+        self.assertRaises(ValueError, SubnetScanner.get_addresses, '10.0.0/33')
+        self.assertRaises(ValueError, SubnetScanner.get_addresses, '10.0.0.0/8')
+
+    def tearDown(self):
+        for listener in self.listeners:
+            listener.shutdown()
+            listener.server_close()
+        self.silent.close()
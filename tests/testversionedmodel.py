@@ -0,0 +1,78 @@
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from resources.lib.model.game import Game
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.model.versionedmodel import migrate, pop_migration_report
+from resources.lib.repository.gamerepository import GameRepository
+from tests.benchmarks import BenchmarkCore, BenchmarkLogger, build_game
+
+
+class TestVersionedModel(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        pop_migration_report(Game)
+        pop_migration_report(HostDetails)
+
+    def testRoundTripIsNotMigrated(self):
+        game = pickle.loads(pickle.dumps(Game('Name', 'host'), 2))
+
+        self.assertEqual(game.name, 'Name')
+        self.assertEqual('_schema_version' in game.get_fields(), False)
+        self.assertEqual(pop_migration_report(Game)[0], 0)
+
+    def testOldStyleGameIsMigrated(self):
+        # Game and Fanart were classic classes before they got slotted
+        legacy = ("(iresources.lib.model.game\nGame\n(dS'name'\nS'Old'\nsS'genre'\n(lS'Action'\nasS'fanarts'\n"
+                  "(dS'1.jpg'\n(iresources.lib.model.fanart\nFanart\n(dS'original'\nS'http://host/1.jpg'\n"
+                  "sS'thumb'\nS'/art/1.jpg'\nsbssb.")
+
+        game = pickle.loads(legacy)
+
+        self.assertEqual(game.name, 'Old')
+        self.assertEqual(game.genre, ['Action'])
+        self.assertEqual(game.selected_poster, '')
+        self.assertEqual(game.fanarts['1.jpg'].get_original(), 'http://host/1.jpg')
+        self.assertEqual(game.fanarts['1.jpg'].get_thumb(), '/art/1.jpg')
+        self.assertEqual(pop_migration_report(Game)[0], 1)
+
+    def testUnversionedHostIsMigrated(self):
+        state = HostDetails().get_fields()
+        del state['reachability']
+        state['name'] = 'Host'
+
+        state = migrate(HostDetails, state)
+
+        self.assertEqual(state['name'], 'Host')
+        self.assertEqual(state['reachability'], HostDetails.REACH_UNKNOWN)
+        self.assertEqual(pop_migration_report(HostDetails)[0], 1)
+
+    def testShardIsMigratedOnLoad(self):
+        host = HostDetails()
+        host.uuid = 'host'
+        repository = GameRepository(BenchmarkCore(self.path), BenchmarkLogger())
+
+        current_version = Game.version
+        Game.version = Game.unversioned
+        try:
+            for i in range(3):
+                game = build_game(host, i)
+                del game.selected_poster
+                repository.add_game(host, game)
+            repository.version_storage[host.uuid] = Game.unversioned
+            repository.version_storage.sync()
+        finally:
+            Game.version = current_version
+
+        repository = GameRepository(BenchmarkCore(self.path), BenchmarkLogger())
+        game = repository.get_game_by_id(host, '1')
+
+        self.assertEqual(game.selected_poster, '')
+        self.assertEqual(game.plot, 'Plot ' * 40)
+        self.assertEqual(repository.version_storage[host.uuid], Game.version)
+        self.assertEqual(game.__getstate__()[0], Game.version)
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,127 @@
+import shutil
+import socket
+import tempfile
+import time
+import unittest
+
+from resources.lib.model.hostdetails import HostDetails
+from resources.lib.nvhttp.reachability.reachabilityresolver import ReachabilityResolver
+from resources.lib.service.wakeservice import WakeService
+from tests.nvhttpstandin import NvHttpStandIn, StandInLogger, has_openssl
+
+
+class SleepingWakeService(WakeService):
+    """Reports the host ready once it was asleep for the given seconds, counting the polls"""
+    def __init__(self, asleep_for, deadline, **kwargs):
+        WakeService.__init__(self, None, StandInLogger(), deadline=deadline, **kwargs)
+        self.asleep_for = asleep_for
+        self.polls = []
+        self.started = time.time()
+
+    def is_ready(self, host):
+        self.polls.append(time.time() - self.started)
+        return time.time() - self.started >= self.asleep_for
+
+
+def build_host():
+    host = HostDetails()
+    host.name = 'Sleeper'
+    host.mac_address = '00:11:22:33:44:55'
+    host.local_ip = '127.0.0.1'
+    return host
+
+
+class TestWakeService(unittest.TestCase):
+    def testMagicPacket(self):
+        packet = WakeService.build_magic_packet('00:11:22:aa:BB:55')
+
+        self.assertEqual(len(packet), 102)
+        self.assertEqual(packet[:6], '\xff' * 6)
+        self.assertEqual(packet[6:], '\x00\x11\x22\xaa\xbb\x55' * 16)
+        self.assertEqual(WakeService.build_magic_packet('00-11-22-aa-bb-55'), packet)
+        for mac_address in (None, '', '00:11:22:33:44', '00:11:22:33:44:5G'):
+            self.assertRaises(ValueError, WakeService.build_magic_packet, mac_address)
+
+    def testWakeAddresses(self):
+        host = build_host()
+        host.local_ip = '192.168.1.20'
+        self.assertEqual(WakeService.get_wake_addresses(host), ['255.255.255.255', '192.168.1.255', '192.168.1.20'])
+        host.local_ip = None
+        self.assertEqual(WakeService.get_wake_addresses(host), ['255.255.255.255'])
+
+    def testPacketIsSentWithRetries(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.settimeout(1)
+        service = WakeService(None, StandInLogger(), ports=(listener.getsockname()[1],), retries=3)
+
+        try:
+            service.send_magic_packet(build_host())
+            packets = [listener.recvfrom(1024)[0] for _ in range(3)]
+        finally:
+            listener.close()
+
+        self.assertEqual(packets, [WakeService.build_magic_packet('00:11:22:33:44:55')] * 3)
+
+    def testPollingBacksOffUntilReady(self):
+        service = SleepingWakeService(1.2, deadline=5)
+        reports = []
+
+        ready_after = service.wait_until_ready(build_host(), lambda elapsed, deadline: reports.append(elapsed),
+                                               service.started)
+
+        # polls at 0, 0.5, 1.5 (ready): the second interval is twice the first
+        self.assertEqual(len(service.polls), 3)
+        self.assertAlmostEqual(service.polls[1] - service.polls[0], 0.5, delta=0.1)
+        self.assertAlmostEqual(service.polls[2] - service.polls[1], 1, delta=0.1)
+        self.assertAlmostEqual(ready_after, 1.5, delta=0.15)
+        self.assertGreaterEqual(len(reports), 3)
+
+    def testPollingEndsAtDeadline(self):
+        service = SleepingWakeService(10, deadline=1)
+
+        start = time.time()
+        self.assertEqual(service.wait_until_ready(build_host(), start=service.started), None)
+
+        self.assertLess(time.time() - start, 1.2)
+        # the last poll is made at the deadline
+        self.assertAlmostEqual(service.polls[-1], 1, delta=0.1)
+
+    def testWaitCanBeCancelled(self):
+        service = SleepingWakeService(10, deadline=5)
+
+        start = time.time()
+        self.assertEqual(service.wait_until_ready(build_host(), lambda elapsed, deadline: elapsed < 0.5), None)
+        self.assertLess(time.time() - start, 1.2)
+
+
+@unittest.skipUnless(has_openssl(), 'needs openssl to create certificates')
+class TestWakeServiceReadiness(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.standin = NvHttpStandIn(self.path)
+        port = self.standin.http.port
+        self.service = WakeService(ReachabilityResolver(StandInLogger(), port=port), StandInLogger(), http_port=port)
+
+    def testHostReachedOnlyRemotelyIsReady(self):
+        host = build_host()
+        host.uuid = 'sleeper-uuid'
+        host.local_ip = '127.0.0.2'
+        host.remote_ip = '127.0.0.1'
+
+        self.assertEqual(self.service.is_ready(host), True)
+        self.assertEqual(host.reachability, HostDetails.REACH_REMOTE)
+
+    def testHostReachedOnNoAddressIsNotReady(self):
+        host = build_host()
+        host.uuid = 'sleeper-uuid'
+        host.local_ip = '127.0.0.2'
+        host.remote_ip = '127.0.0.3'
+
+        self.assertEqual(self.service.is_ready(host), False)
+        self.assertEqual(host.reachability, HostDetails.REACH_OFFLINE)
+        self.assertEqual(self.standin.requests, [])
+
+    def tearDown(self):
+        self.standin.shutdown()
+        shutil.rmtree(self.path, ignore_errors=True)